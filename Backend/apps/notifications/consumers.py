@@ -1,17 +1,34 @@
 
+import asyncio
 import json
+from urllib.parse import parse_qs
+
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
+from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
 
+from .payloads import dumps, notification_payloads
+
+# Frame types whose only payload is the latest unread count
+UNREAD_COUNT_FRAMES = ('unread_count_update',)
+
 
 class NotificationConsumer(AsyncWebsocketConsumer):
     """
     WebSocket consumer for real-time notifications
     Now relies on JWT middleware for authentication
+    
+    Clients that connect with `?batch=1` get pushed events coalesced: frames
+    produced within NOTIFICATION_PUSH_BATCH_WINDOW seconds are sent as one
+    `batch` frame, with redundant unread count updates collapsed.
     """
     
     async def connect(self):
+        self.batch_window = self.get_batch_window()
+        self.pending_frames = []
+        self.flush_task = None
+        
         # User is now set by JWT middleware
         self.user = self.scope.get("user")
         
@@ -33,6 +50,8 @@ class NotificationConsumer(AsyncWebsocketConsumer):
             await self.close(code=4001)
     
     async def disconnect(self, close_code):
+        if self.flush_task:
+            self.flush_task.cancel()
         if hasattr(self, 'group_name'):
             await self.channel_layer.group_discard(
                 self.group_name,
@@ -57,45 +76,84 @@ class NotificationConsumer(AsyncWebsocketConsumer):
                 await self.send_unread_count_update()
             
             elif action == 'get_notifications':
-                page = data.get('page', 1)
-                await self.send_notifications(page)
+                cursor = data.get('cursor')
+                await self.send_notifications(cursor)
             
             elif action == 'ping':
-                await self.send(text_data=json.dumps({'type': 'pong'}))
+                await self.send(text_data=dumps({'type': 'pong'}))
                 
         except json.JSONDecodeError:
-            await self.send(text_data=json.dumps({
+            await self.send(text_data=dumps({
                 'type': 'error',
                 'message': 'Invalid JSON'
             }))
         except Exception as e:
-            await self.send(text_data=json.dumps({
+            await self.send(text_data=dumps({
                 'type': 'error',
                 'message': 'Internal error occurred'
             }))
     
+    # Batched push
+    def get_batch_window(self):
+        """Coalescing window in seconds for this connection, 0 when batching is off"""
+        query_params = parse_qs(self.scope.get('query_string', b'').decode())
+        if query_params.get('batch', [''])[0].lower() not in ('1', 'true'):
+            return 0
+        return getattr(settings, 'NOTIFICATION_PUSH_BATCH_WINDOW', 0.05)
+    
+    async def push(self, frame):
+        """Send a server-initiated frame, or queue it for the next batch"""
+        if not self.batch_window:
+            await self.send(text_data=dumps(frame))
+            return
+        
+        self.pending_frames.append(frame)
+        if len(self.pending_frames) >= getattr(settings, 'NOTIFICATION_PUSH_BATCH_SIZE', 200):
+            await self.flush_pending()
+        elif self.flush_task is None:
+            self.flush_task = asyncio.ensure_future(self.flush_after_window())
+    
+    async def flush_after_window(self):
+        await asyncio.sleep(self.batch_window)
+        self.flush_task = None
+        await self.flush_pending()
+    
+    async def flush_pending(self):
+        """Send queued frames: as-is if there is one, else as a `batch` frame"""
+        if self.flush_task:
+            self.flush_task.cancel()
+            self.flush_task = None
+        frames, self.pending_frames = collapse_frames(self.pending_frames), []
+        if len(frames) == 1:
+            await self.send(text_data=dumps(frames[0]))
+        elif frames:
+            await self.send(text_data=dumps({
+                'type': 'batch',
+                'events': frames
+            }))
+    
     # Message handlers for group sends
     async def notification_message(self, event):
         """Handle new notification message"""
-        await self.send(text_data=json.dumps({
+        await self.push({
             'type': 'new_notification',
             'notification': event['notification']
-        }))
+        })
     
     async def notifications_read(self, event):
         """Handle all notifications marked as read"""
-        await self.send(text_data=json.dumps({
+        await self.push({
             'type': 'notifications_read',
             'unread_count': event['unread_count']
-        }))
+        })
     
     async def notification_read(self, event):
         """Handle single notification marked as read"""
-        await self.send(text_data=json.dumps({
+        await self.push({
             'type': 'notification_read',
             'notification_id': event['notification_id'],
             'unread_count': event['unread_count']
-        }))
+        })
     
     # Database operations
     @database_sync_to_async
@@ -111,23 +169,7 @@ class NotificationConsumer(AsyncWebsocketConsumer):
             recipient=self.user
         ).select_related('sender').order_by('-created_at')[:20]
         
-        notifications_data = []
-        for notification in notifications:
-            notifications_data.append({
-                'id': notification.id,
-                'type': notification.notification_type,
-                'title': notification.title,
-                'message': notification.message,
-                'sender': {
-                    'id': notification.sender.id if notification.sender else None,
-                    'name': getattr(notification.sender, 'full_name', 'System') if notification.sender else 'System',
-                    'email': notification.sender.email if notification.sender else None
-                },
-                'is_read': notification.is_read,
-                'created_at': notification.created_at.isoformat(),
-                'time_since': getattr(notification, 'time_since', ''),
-                'extra_data': notification.extra_data
-            })
+        notifications_data = notification_payloads(notifications)
         
         return {
             'unread_count': unread_count,
@@ -147,34 +189,19 @@ class NotificationConsumer(AsyncWebsocketConsumer):
         NotificationManager.mark_all_as_read(self.user)
     
     @database_sync_to_async
-    def get_notifications_page(self, page=1, per_page=20):
-        """Get paginated notifications"""
+    def get_notifications_page(self, cursor=None, per_page=20):
+        """Get a page of notifications after `cursor` (keyset pagination)"""
+        from core.pagination import paginate_keyset
         from .models import Notification
         
-        offset = (page - 1) * per_page
-        notifications = Notification.objects.filter(
-            recipient=self.user
-        ).select_related('sender').order_by('-created_at')[offset:offset + per_page]
-        
-        notifications_data = []
-        for notification in notifications:
-            notifications_data.append({
-                'id': notification.id,
-                'type': notification.notification_type,
-                'title': notification.title,
-                'message': notification.message,
-                'sender': {
-                    'id': notification.sender.id if notification.sender else None,
-                    'name': getattr(notification.sender, 'full_name', 'System') if notification.sender else 'System',
-                    'email': notification.sender.email if notification.sender else None
-                },
-                'is_read': notification.is_read,
-                'created_at': notification.created_at.isoformat(),
-                'time_since': getattr(notification, 'time_since', ''),
-                'extra_data': notification.extra_data
-            })
+        notifications, next_cursor = paginate_keyset(
+            Notification.objects.filter(recipient=self.user).select_related('sender'),
+            ('-created_at', '-id'),
+            per_page,
+            cursor
+        )
         
-        return notifications_data
+        return notification_payloads(notifications), next_cursor
     
     @database_sync_to_async
     def get_unread_count(self):
@@ -185,26 +212,54 @@ class NotificationConsumer(AsyncWebsocketConsumer):
     async def send_initial_data(self):
         """Send initial notification data to client"""
         data = await self.get_initial_data()
-        await self.send(text_data=json.dumps({
+        await self.send(text_data=dumps({
             'type': 'initial_data',
             'unread_count': data['unread_count'],
             'notifications': data['notifications']
         }))
     
-    async def send_notifications(self, page=1):
+    async def send_notifications(self, cursor=None):
         """Send paginated notifications"""
-        notifications = await self.get_notifications_page(page)
-        await self.send(text_data=json.dumps({
+        try:
+            notifications, next_cursor = await self.get_notifications_page(cursor)
+        except ValueError:
+            await self.send(text_data=dumps({
+                'type': 'error',
+                'message': 'Invalid cursor'
+            }))
+            return
+        await self.send(text_data=dumps({
             'type': 'notifications_page',
-            'page': page,
+            'cursor': cursor,
+            'next_cursor': next_cursor,
             'notifications': notifications
         }))
     
     async def send_unread_count_update(self):
         """Send updated unread count"""
         unread_count = await self.get_unread_count()
-        await self.send(text_data=json.dumps({
+        await self.push({
             'type': 'unread_count_update',
             'unread_count': unread_count
-        }))
+        })
+
 
+def collapse_frames(frames):
+    """
+    Drop frames made redundant by later ones in the same batch: only the last
+    unread count survives, as a standalone update if it came from one or on
+    the last frame carrying it otherwise.
+    """
+    last_count_index = None
+    for index, frame in enumerate(frames):
+        if 'unread_count' in frame:
+            last_count_index = index
+    
+    collapsed = []
+    for index, frame in enumerate(frames):
+        if 'unread_count' in frame and index != last_count_index:
+            if frame['type'] in UNREAD_COUNT_FRAMES:
+                continue
+            frame = {key: value for key, value in frame.items() if key != 'unread_count'}
+        collapsed.append(frame)
+    return collapsed
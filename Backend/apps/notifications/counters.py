@@ -0,0 +1,108 @@
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+
+
+def increment_unread(recipient_ids):
+    """
+    Add one unread notification per occurrence of a user id in `recipient_ids`.
+
+    Users without a counter row are skipped; their counter is initialised
+    from the table on the next read, which already includes these rows.
+    """
+    from .models import UnreadNotificationCounter
+
+    by_amount = defaultdict(list)
+    for user_id, amount in Counter(recipient_ids).items():
+        by_amount[amount].append(user_id)
+    for amount, user_ids in by_amount.items():
+        UnreadNotificationCounter.objects.filter(user_id__in=user_ids).update(
+            unread_count=F('unread_count') + amount
+        )
+
+
+def decrement_unread(user_id, amount=1):
+    """Subtract `amount` from a user's unread counter, never going below zero"""
+    from .models import UnreadNotificationCounter
+
+    if amount <= 0:
+        return
+    UnreadNotificationCounter.objects.filter(user_id=user_id).update(
+        unread_count=Greatest(F('unread_count') - amount, 0)
+    )
+
+
+def decrement_unread_many(recipient_ids):
+    """Subtract one unread notification per occurrence of a user id in `recipient_ids`"""
+    from .models import UnreadNotificationCounter
+
+    by_amount = defaultdict(list)
+    for user_id, amount in Counter(recipient_ids).items():
+        by_amount[amount].append(user_id)
+    for amount, user_ids in by_amount.items():
+        UnreadNotificationCounter.objects.filter(user_id__in=user_ids).update(
+            unread_count=Greatest(F('unread_count') - amount, 0)
+        )
+
+
+def get_unread_count(user_id):
+    """
+    Read a user's unread count from the counter row (a primary key lookup),
+    creating it with a one-off COUNT(*) the first time.
+    """
+    from .models import Notification, UnreadNotificationCounter
+
+    count = (
+        UnreadNotificationCounter.objects.filter(user_id=user_id)
+        .values_list('unread_count', flat=True)
+        .first()
+    )
+    if count is None:
+        count = Notification.objects.filter(recipient_id=user_id, is_read=False).count()
+        UnreadNotificationCounter.objects.bulk_create(
+            [UnreadNotificationCounter(user_id=user_id, unread_count=count)],
+            ignore_conflicts=True,
+        )
+    return count
+
+
+def reconcile_unread_counts(batch_size=1000):
+    """
+    Recount every counter against the Notification table, in batches of
+    `batch_size` users. Counter rows are locked while their batch is
+    recounted so concurrent increments wait instead of being lost.
+    Returns the number of counters that were corrected.
+    """
+    from .models import Notification, UnreadNotificationCounter
+
+    corrected = 0
+    last_user_id = 0
+    while True:
+        with transaction.atomic():
+            counters = list(
+                UnreadNotificationCounter.objects.filter(user_id__gt=last_user_id)
+                .select_for_update()
+                .order_by('user_id')[:batch_size]
+            )
+            if not counters:
+                break
+            actual = dict(
+                Notification.objects.filter(
+                    recipient_id__in=[counter.user_id for counter in counters], is_read=False
+                )
+                .values('recipient_id')
+                .annotate(unread=Count('id'))
+                .values_list('recipient_id', 'unread')
+            )
+            stale = []
+            for counter in counters:
+                unread = actual.get(counter.user_id, 0)
+                if counter.unread_count != unread:
+                    counter.unread_count = unread
+                    stale.append(counter)
+            UnreadNotificationCounter.objects.bulk_update(stale, ['unread_count'])
+        corrected += len(stale)
+        last_user_id = counters[-1].user_id
+    return corrected
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from django.utils import timezone
+
+from apps.notifications.models import Notification
+from apps.notifications.retention import (
+    NDJSONArchiver, TableArchiver, archive_expired_notifications, expired_condition,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Move notifications older than their NOTIFICATION_RETENTION_DAYS TTL out of the "
+        "notifications table into the compressed archive table (or an NDJSON file). Run daily."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help="Notifications archived per transaction")
+        parser.add_argument('--ndjson', metavar='PATH',
+                            help="Append to this gzip-compressed NDJSON file instead of the archive table")
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Only report how many notifications of each type are due")
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            due = (
+                Notification.objects.filter(expired_condition(timezone.now()))
+                .order_by()
+                .values_list('notification_type')
+                .annotate(count=Count('id'))
+            )
+            for notification_type, count in due:
+                self.stdout.write(f"{notification_type}: {count}")
+            return
+
+        archiver = NDJSONArchiver(options['ndjson']) if options['ndjson'] else TableArchiver()
+        archived = archive_expired_notifications(archiver, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Archived {archived} notifications."))
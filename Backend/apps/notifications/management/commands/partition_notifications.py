@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError
+from django.utils import timezone
+
+from apps.notifications import partitions
+
+
+class Command(BaseCommand):
+    help = (
+        "Manage monthly partitions of the notifications table (PostgreSQL). "
+        "Run with --convert once, then regularly (e.g. weekly cron) to create upcoming months."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--convert', action='store_true',
+                            help="Rebuild the table as a partitioned table (locks it while copying)")
+        parser.add_argument('--months-ahead', type=int, default=3,
+                            help="Months after the current one to create partitions for")
+
+    def handle(self, *args, **options):
+        if not partitions.supports_partitioning():
+            raise CommandError("Notification partitioning needs PostgreSQL.")
+
+        now = timezone.now()
+        if options['convert']:
+            if partitions.is_partitioned():
+                raise CommandError("The notifications table is already partitioned.")
+            partitions.convert_to_partitioned(now, months_ahead=options['months_ahead'])
+            self.stdout.write(self.style.SUCCESS("Notifications table is now partitioned by month."))
+            return
+
+        if not partitions.is_partitioned():
+            raise CommandError("The notifications table is not partitioned; run with --convert first.")
+        try:
+            created = partitions.create_upcoming_partitions(now, options['months_ahead'])
+        except DatabaseError as e:
+            raise CommandError(f"Could not create the upcoming partitions: {e}") from e
+        self.stdout.write(self.style.SUCCESS(f"Created {len(created)} partitions."))
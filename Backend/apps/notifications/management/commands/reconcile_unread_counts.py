@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from apps.notifications.counters import reconcile_unread_counts
+
+
+class Command(BaseCommand):
+    help = "Recount cached unread notification counters and fix any that drifted. Run periodically (e.g. hourly cron)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help="Counters recounted per transaction")
+
+    def handle(self, *args, **options):
+        corrected = reconcile_unread_counts(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Corrected {corrected} unread counters."))
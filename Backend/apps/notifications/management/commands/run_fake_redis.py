@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Run an in-process Redis-protocol server (fakeredis) for local development, "
+        "so several ASGI workers can share one channel layer via CHANNEL_REDIS_URL."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=6379)
+
+    def handle(self, *args, **options):
+        try:
+            from fakeredis import TcpFakeServer
+        except ImportError:
+            raise CommandError("fakeredis is not installed (pip install 'fakeredis[lua]').")
+
+        server = TcpFakeServer((options['host'], options['port']))
+        host, port = server.server_address[:2]
+        self.stdout.write(self.style.SUCCESS(
+            f"Fake Redis listening; set CHANNEL_REDIS_URL=redis://{host}:{port}/0"
+        ))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
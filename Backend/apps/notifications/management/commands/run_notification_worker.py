@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+from apps.notifications.outbox import process_batch
+
+
+class Command(BaseCommand):
+    help = "Drain the notification outbox: comment fan-out and WebSocket delivery."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100,
+                            help="Entries claimed per transaction")
+        parser.add_argument('--max-attempts', type=int, default=5,
+                            help="Attempts before an entry is marked failed")
+        parser.add_argument('--poll-interval', type=float, default=0.5,
+                            help="Seconds to sleep when the outbox is empty")
+        parser.add_argument('--once', action='store_true',
+                            help="Drain what is due and exit")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        processed = 0
+        try:
+            while True:
+                claimed = process_batch(batch_size=batch_size, max_attempts=options['max_attempts'])
+                processed += claimed
+                if claimed == 0:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} outbox entries."))
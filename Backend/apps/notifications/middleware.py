@@ -1,6 +1,6 @@
 import jwt
 from django.contrib.auth.models import AnonymousUser
-from apps.users.models import User
+from apps.users.auth_cache import get_cached_user, user_from_claims
 from django.conf import settings
 from channels.middleware import BaseMiddleware
 from channels.db import database_sync_to_async
@@ -65,18 +65,23 @@ class JWTAuthMiddleware(BaseMiddleware):
             # Validate the access token
             access_token = AccessToken(token)
             
-            # Get user ID from token
-            user_id = access_token.get('user_id')
+            if getattr(settings, 'WEBSOCKET_AUTH_FROM_CLAIMS', False):
+                # Trust the signed claims, no lookup at all
+                user = user_from_claims(access_token)
+            else:
+                # Cached snapshot; only a cache miss queries the database
+                user = get_cached_user(access_token.get('user_id'))
             
-            # Fetch user from database
-            user = User.objects.select_related().get(id=user_id)
+            if user is None or not user.is_active:
+                logger.warning("WebSocket authentication failed: unknown or inactive user")
+                return None
             
-            logger.info(f"WebSocket authenticated user: {user.email}")
+            logger.debug("WebSocket authenticated user %s", user.id)
             return user
             
-        except (InvalidToken, TokenError, User.DoesNotExist) as e:
+        except (InvalidToken, TokenError) as e:
             logger.warning(f"WebSocket authentication failed: {str(e)}")
             return None
         except Exception as e:
             logger.error(f"Unexpected error in WebSocket auth: {str(e)}")
-            return None
\ No newline at end of file
+            return None
@@ -1,5 +1,8 @@
 # models.py - Add these models to your existing models
 
+import json
+import zlib
+
 from django.db import models
 from apps.users.models import User
 from django.utils import timezone
@@ -38,30 +41,94 @@ class Notification(models.Model):
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['recipient', '-created_at']),
-            models.Index(fields=['recipient', 'is_read']),
+            # Unread rows only: counts and mark-all-read never touch the
+            # (much larger) set of read notifications
+            models.Index(fields=['recipient'], condition=models.Q(is_read=False), name='notification_unread_idx'),
         ]
 
     def __str__(self):
         return f"{self.title} - {self.recipient.email}"
 
     def mark_as_read(self):
-        if not self.is_read:
-            self.is_read = True
-            self.read_at = timezone.now()
-            self.save()
+        """Mark as read; returns True if this call changed it"""
+        from .counters import decrement_unread
+        
+        if self.is_read:
+            return False
+        read_at = timezone.now()
+        # Conditional update so two concurrent reads only decrement once
+        updated = Notification.objects.filter(pk=self.pk, is_read=False).update(
+            is_read=True, read_at=read_at
+        )
+        self.is_read = True
+        self.read_at = read_at
+        if updated:
+            decrement_unread(self.recipient_id)
+        return bool(updated)
 
     @property
     def time_since(self):
-        now = timezone.now()
-        diff = now - self.created_at
-        
-        if diff.days > 0:
-            return f"{diff.days} days ago"
-        elif diff.seconds > 3600:
-            hours = diff.seconds // 3600
-            return f"{hours} hours ago"
-        elif diff.seconds > 60:
-            minutes = diff.seconds // 60
-            return f"{minutes} minutes ago"
-        else:
-            return "Just now"
\ No newline at end of file
+        from .payloads import time_since
+        return time_since(self.created_at)
+
+
+class NotificationOutbox(models.Model):
+    """
+    Deferred notification work (fan-out, WebSocket delivery) written in the
+    same transaction as the change that caused it and processed by the
+    `run_notification_worker` management command.
+    """
+    kind = models.CharField(max_length=50)
+    payload = models.JSONField(default=dict)
+    attempts = models.PositiveIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now)
+    failed = models.BooleanField(default=False)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['failed', 'available_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.id}"
+
+
+class UnreadNotificationCounter(models.Model):
+    """
+    Denormalized per-user unread count, kept in step with Notification by
+    atomic increments/decrements (see counters.py) so reading it never has to
+    COUNT(*) a user's notifications. `reconcile_unread_counts` repairs drift.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='unread_notification_counter')
+    unread_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user_id}: {self.unread_count} unread"
+
+
+class NotificationArchive(models.Model):
+    """
+    Notifications removed by the retention job (see retention.py). Each row is
+    one archived chunk: `data` holds the notifications as zlib-compressed
+    NDJSON, so the archive costs a fraction of the live table and no indexes.
+    """
+    first_id = models.BigIntegerField()
+    last_id = models.BigIntegerField()
+    row_count = models.PositiveIntegerField()
+    oldest_created_at = models.DateTimeField()
+    newest_created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+    data = models.BinaryField()
+
+    class Meta:
+        ordering = ['id']
+
+    def __str__(self):
+        return f"Notifications {self.first_id}-{self.last_id} ({self.row_count})"
+
+    def rows(self):
+        """The archived notifications as dicts"""
+        return [json.loads(line) for line in zlib.decompress(bytes(self.data)).splitlines()]
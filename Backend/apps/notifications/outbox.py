@@ -0,0 +1,153 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+_handlers = {}
+
+# Handlers run in-process (NOTIFICATION_ASYNC_DELIVERY off) get this many
+# attempts, waiting IN_PROCESS_RETRY_DELAY seconds, doubled each time, between.
+IN_PROCESS_ATTEMPTS = 3
+IN_PROCESS_RETRY_DELAY = 0.5
+
+_executor = None
+_executor_slots = None
+_executor_lock = threading.Lock()
+
+
+def outbox_handler(kind):
+    """Register the function that processes outbox entries of `kind`"""
+    def register(func):
+        _handlers[kind] = func
+        return func
+    return register
+
+
+def enqueue(kind, **payload):
+    """
+    Queue work for the notification worker.
+
+    With NOTIFICATION_ASYNC_DELIVERY on, the row is written in the caller's
+    transaction, so the worker only sees it once that transaction commits.
+    Otherwise (the default) the handler is handed to an in-process thread
+    pool right after commit (see run_in_background).
+    """
+    from .models import NotificationOutbox
+
+    if not getattr(settings, 'NOTIFICATION_ASYNC_DELIVERY', False):
+        transaction.on_commit(lambda: run_in_background(kind, payload), robust=True)
+        return None
+    return NotificationOutbox.objects.create(kind=kind, payload=payload)
+
+
+def run_in_background(kind, payload):
+    """
+    Run the handler for `kind` on the in-process delivery pool
+    (NOTIFICATION_DELIVERY_THREADS threads), so the request that committed
+    the work does not wait for it.
+
+    The handler runs on the calling thread instead when the pool is
+    disabled (0 threads) or its NOTIFICATION_DELIVERY_QUEUE_SIZE backlog is
+    full, or when a transaction is still open here: another thread's
+    connection could not see the rows it was queued for.
+    """
+    executor, slots = _get_executor()
+    if executor is None or transaction.get_connection().in_atomic_block:
+        return run_handler(kind, payload)
+    if not slots.acquire(blocking=False):
+        logger.warning(f"Notification delivery backlog is full; running '{kind}' inline")
+        return run_handler(kind, payload)
+
+    def run():
+        close_old_connections()
+        try:
+            run_handler(kind, payload)
+        finally:
+            close_old_connections()
+            slots.release()
+
+    executor.submit(run)
+
+
+def _get_executor():
+    global _executor, _executor_slots
+    with _executor_lock:
+        threads = getattr(settings, 'NOTIFICATION_DELIVERY_THREADS', 4)
+        if threads and _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='notification-delivery')
+            _executor_slots = threading.BoundedSemaphore(
+                getattr(settings, 'NOTIFICATION_DELIVERY_QUEUE_SIZE', 1000)
+            )
+        return (_executor, _executor_slots) if threads else (None, None)
+
+
+def run_handler(kind, payload):
+    """
+    Run the handler for `kind`, retrying failures (e.g. a full channel layer)
+    up to IN_PROCESS_ATTEMPTS times. The last failure is logged, not raised:
+    the work it belongs to has already been committed.
+    Returns True if the handler succeeded.
+    """
+    for attempt in range(1, IN_PROCESS_ATTEMPTS + 1):
+        try:
+            _handlers[kind](**payload)
+            return True
+        except Exception as e:
+            if attempt == IN_PROCESS_ATTEMPTS:
+                logger.exception(f"Notification handler '{kind}' failed after {attempt} attempts: {e}")
+                return False
+            logger.warning(f"Notification handler '{kind}' failed (attempt {attempt}): {e}")
+            time.sleep(IN_PROCESS_RETRY_DELAY * 2 ** (attempt - 1))
+
+
+def retry_delay(attempts):
+    """Exponential backoff: 2, 4, 8 ... seconds, capped at 5 minutes"""
+    return timedelta(seconds=min(2 ** attempts, 300))
+
+
+def process_batch(batch_size=100, max_attempts=5):
+    """
+    Claim up to `batch_size` due entries and run their handlers.
+
+    Rows are locked with SKIP LOCKED so several workers can drain the outbox
+    side by side. Successful entries are deleted; failures (including a full
+    channel layer) are retried with backoff until `max_attempts`, after which
+    they are kept with failed=True for inspection. Returns the number of
+    entries claimed.
+    """
+    from .models import NotificationOutbox
+
+    now = timezone.now()
+    with transaction.atomic():
+        entries = list(
+            NotificationOutbox.objects.select_for_update(skip_locked=True)
+            .filter(failed=False, available_at__lte=now)
+            .order_by('id')[:batch_size]
+        )
+        done = []
+        for entry in entries:
+            handler = _handlers.get(entry.kind)
+            try:
+                if handler is None:
+                    raise LookupError(f"No outbox handler for '{entry.kind}'")
+                with transaction.atomic():
+                    handler(**entry.payload)
+            except Exception as e:
+                entry.attempts += 1
+                entry.last_error = str(e)
+                entry.failed = entry.attempts >= max_attempts
+                entry.available_at = now + retry_delay(entry.attempts)
+                entry.save(update_fields=['attempts', 'last_error', 'failed', 'available_at'])
+                logger.warning(f"Outbox entry {entry} failed (attempt {entry.attempts}): {e}")
+            else:
+                done.append(entry.id)
+
+        NotificationOutbox.objects.filter(id__in=done).delete()
+    return len(entries)
@@ -0,0 +1,185 @@
+"""
+Optional monthly RANGE partitioning of the notifications table on
+`created_at` (PostgreSQL only), managed by the `partition_notifications`
+management command. Once partitioned, the retention job drops whole expired
+months instead of deleting their rows one chunk at a time.
+"""
+import re
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import connection, transaction
+
+from .models import Notification
+
+
+TABLE = Notification._meta.db_table
+DEFAULT_PARTITION = f'{TABLE}_default'
+PARTITION_NAME = re.compile(rf'^{TABLE}_y(\d{{4}})m(\d{{2}})$')
+
+
+def month_start(value):
+    return datetime(value.year, value.month, 1, tzinfo=dt_timezone.utc)
+
+
+def next_month(start):
+    return datetime(start.year + start.month // 12, start.month % 12 + 1, 1, tzinfo=dt_timezone.utc)
+
+
+def partition_name(start):
+    return f'{TABLE}_y{start.year}m{start.month:02d}'
+
+
+def supports_partitioning():
+    return connection.vendor == 'postgresql'
+
+
+def is_partitioned():
+    if not supports_partitioning():
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_partitioned_table WHERE partrelid = %s::regclass", [TABLE])
+        return cursor.fetchone() is not None
+
+
+def list_partitions():
+    """(name, start, end) of the monthly partitions, oldest first"""
+    if not is_partitioned():
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = %s::regclass",
+            [TABLE]
+        )
+        names = [name for name, in cursor.fetchall()]
+
+    partitions = []
+    for name in names:
+        match = PARTITION_NAME.match(name)
+        if match:
+            start = datetime(int(match[1]), int(match[2]), 1, tzinfo=dt_timezone.utc)
+            partitions.append((name, start, next_month(start)))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+
+def has_default_partition():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [DEFAULT_PARTITION])
+        return cursor.fetchone()[0]
+
+
+def _create_from_default(cursor, name, start, end):
+    """
+    Create the [start, end) partition when rows for it may already sit in the
+    DEFAULT partition (the cron lapsed). PostgreSQL refuses a plain
+    CREATE ... PARTITION OF then, so the rows are moved into a standalone
+    table first, which is then attached.
+    """
+    qn = connection.ops.quote_name
+    cursor.execute(f"CREATE TABLE {qn(name)} (LIKE {qn(TABLE)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+    cursor.execute(
+        f"WITH moved AS (DELETE FROM {qn(DEFAULT_PARTITION)} "
+        f"WHERE created_at >= %s AND created_at < %s RETURNING *) "
+        f"INSERT INTO {qn(name)} SELECT * FROM moved",
+        [start, end]
+    )
+    cursor.execute(
+        f"ALTER TABLE {qn(TABLE)} ATTACH PARTITION {qn(name)} "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    )
+
+
+def create_partitions(start, end):
+    """Create any missing monthly partitions covering [start, end); returns their names"""
+    qn = connection.ops.quote_name
+    existing = {name for name, _, _ in list_partitions()}
+    created = []
+    month = month_start(start)
+    with transaction.atomic(), connection.cursor() as cursor:
+        from_default = has_default_partition()
+        while month < end:
+            following = next_month(month)
+            name = partition_name(month)
+            if name not in existing:
+                if from_default:
+                    _create_from_default(cursor, name, month, following)
+                else:
+                    cursor.execute(
+                        f"CREATE TABLE {qn(name)} PARTITION OF {qn(TABLE)} "
+                        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{following.isoformat()}')"
+                    )
+                created.append(name)
+            month = following
+    return created
+
+
+def create_upcoming_partitions(now, months_ahead=3, start=None):
+    """Create partitions from `start` (default: this month) through `months_ahead` months ahead"""
+    end = month_start(now)
+    for _ in range(months_ahead + 1):
+        end = next_month(end)
+    return create_partitions(start or now, end)
+
+
+def drop_partition(name):
+    qn = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE {qn(TABLE)} DETACH PARTITION {qn(name)}")
+        cursor.execute(f"DROP TABLE {qn(name)}")
+
+
+def convert_to_partitioned(now, months_ahead=3):
+    """
+    Rebuild the notifications table as a partitioned table, keeping its rows,
+    ids, indexes and foreign keys. Holds an exclusive lock on the table for
+    the whole copy, so run it in a maintenance window.
+
+    Partitioned tables need the partition key in every unique index, so the
+    primary key becomes (id, created_at); ids still come from one sequence.
+    """
+    qn = connection.ops.quote_name
+    old = f'{TABLE}_unpartitioned'
+    sequence = f'{TABLE}_partitioned_id_seq'
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"LOCK TABLE {qn(TABLE)} IN ACCESS EXCLUSIVE MODE")
+        cursor.execute(f"ALTER TABLE {qn(TABLE)} RENAME TO {qn(old)}")
+
+        cursor.execute(
+            "SELECT indexdef FROM pg_indexes WHERE tablename = %s AND indexname NOT IN "
+            "(SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'p')",
+            [old, old]
+        )
+        index_definitions = [definition for definition, in cursor.fetchall()]
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = %s::regclass AND contype = 'f'",
+            [old]
+        )
+        foreign_keys = cursor.fetchall()
+        cursor.execute(f"SELECT MIN(created_at), MAX(id) FROM {qn(old)}")
+        oldest, max_id = cursor.fetchone()
+
+        cursor.execute(
+            f"CREATE TABLE {qn(TABLE)} (LIKE {qn(old)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+            f"PARTITION BY RANGE (created_at)"
+        )
+        cursor.execute(f"CREATE SEQUENCE {qn(sequence)} OWNED BY {qn(TABLE)}.id")
+        cursor.execute("SELECT setval(%s, %s, false)", [sequence, (max_id or 0) + 1])
+        cursor.execute(f"ALTER TABLE {qn(TABLE)} ALTER COLUMN id SET DEFAULT nextval('{sequence}')")
+
+        create_upcoming_partitions(now, months_ahead, start=oldest)
+        # Catches rows outside the created months instead of failing inserts
+        cursor.execute(f"CREATE TABLE {qn(DEFAULT_PARTITION)} PARTITION OF {qn(TABLE)} DEFAULT")
+
+        cursor.execute(f"INSERT INTO {qn(TABLE)} SELECT * FROM {qn(old)}")
+        cursor.execute(f"DROP TABLE {qn(old)}")
+
+        # Added once the old table (and its constraint names) are gone
+        cursor.execute(f"ALTER TABLE {qn(TABLE)} ADD PRIMARY KEY (id, created_at)")
+        table_reference = re.compile(rf' ON (\S+\.)?"?{old}"? ')
+        for definition in index_definitions:
+            cursor.execute(table_reference.sub(f' ON {qn(TABLE)} ', definition, count=1))
+        for name, definition in foreign_keys:
+            cursor.execute(f"ALTER TABLE {qn(TABLE)} ADD CONSTRAINT {qn(name)} {definition}")
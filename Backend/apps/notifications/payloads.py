@@ -0,0 +1,79 @@
+import json
+
+from django.utils import timezone
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(data):
+    """Encode `data` as a compact JSON string, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(data).decode()
+    return json.dumps(data, separators=(',', ':'))
+
+
+def isoformat(value, tz=None):
+    """ISO 8601 in `tz` (default: the current time zone), 'Z' for UTC, as DRF renders it"""
+    if value is None:
+        return None
+    value = value.astimezone(tz or timezone.get_current_timezone()).isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+def time_since(created_at, now=None):
+    diff = (now or timezone.now()) - created_at
+
+    if diff.days > 0:
+        return f"{diff.days} days ago"
+    elif diff.seconds > 3600:
+        hours = diff.seconds // 3600
+        return f"{hours} hours ago"
+    elif diff.seconds > 60:
+        minutes = diff.seconds // 60
+        return f"{minutes} minutes ago"
+    else:
+        return "Just now"
+
+
+def notification_payload(notification, now=None, tz=None):
+    """
+    The notification dict sent over WebSocket (group sends, initial data and
+    pages). NotificationSerializer returns the same dict with `type` renamed
+    to `notification_type`. Built directly from the instance, so callers
+    should select_related('sender').
+    """
+    now = now or timezone.now()
+    tz = tz or timezone.get_current_timezone()
+    sender = notification.sender
+    return {
+        'id': notification.id,
+        'type': notification.notification_type,
+        'title': notification.title,
+        'message': notification.message,
+        'sender': {
+            'id': sender.id,
+            'name': sender.full_name,
+            'email': sender.email
+        } if sender else {
+            'id': None,
+            'name': 'System',
+            'email': None
+        },
+        'is_read': notification.is_read,
+        'created_at': isoformat(notification.created_at, tz),
+        'read_at': isoformat(notification.read_at, tz),
+        'time_since': time_since(notification.created_at, now),
+        'extra_data': notification.extra_data
+    }
+
+
+def notification_payloads(notifications):
+    """Payloads for many notifications, sharing one clock and time zone lookup"""
+    now = timezone.now()
+    tz = timezone.get_current_timezone()
+    return [notification_payload(notification, now, tz) for notification in notifications]
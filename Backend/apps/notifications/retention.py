@@ -0,0 +1,158 @@
+"""
+Notification retention: moves notifications past their type's TTL
+(NOTIFICATION_RETENTION_DAYS) out of the live table into an archive, in
+chunks, keeping the unread counters in step. Run by the
+`archive_notifications` management command.
+
+Archiving is at-least-once: a chunk is written to the archive before its
+rows are deleted, so a crash in between can archive it twice but never
+loses it.
+"""
+import gzip
+import zlib
+from datetime import timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import partitions
+from .counters import decrement_unread_many
+from .models import Notification, NotificationArchive
+from .payloads import dumps, isoformat
+
+
+ARCHIVE_FIELDS = [field.attname for field in Notification._meta.concrete_fields]
+
+
+def retention_days():
+    """TTL in days per notification type, with the 'default' entry for the others"""
+    days = {'default': 90}
+    days.update(getattr(settings, 'NOTIFICATION_RETENTION_DAYS', {}))
+    return days
+
+
+def expired_condition(now):
+    """Q matching the notifications due for archiving at `now`"""
+    days = retention_days()
+    default = days.pop('default')
+    expired = Q(~Q(notification_type__in=list(days)), created_at__lt=now - timedelta(days=default))
+    for notification_type, ttl in days.items():
+        expired |= Q(notification_type=notification_type, created_at__lt=now - timedelta(days=ttl))
+
+    unread_days = getattr(settings, 'NOTIFICATION_UNREAD_RETENTION_DAYS', None)
+    if unread_days is None:
+        return expired & Q(is_read=True)
+    return expired & (Q(is_read=True) | Q(created_at__lt=now - timedelta(days=unread_days)))
+
+
+def partition_cutoff(now):
+    """
+    Partitions ending before this hold nothing but expired notifications, so
+    they can be dropped whole. None if unread notifications are kept forever.
+    """
+    unread_days = getattr(settings, 'NOTIFICATION_UNREAD_RETENTION_DAYS', None)
+    if unread_days is None:
+        return None
+    return now - timedelta(days=max(unread_days, *retention_days().values()))
+
+
+def to_ndjson(rows):
+    lines = []
+    for row in rows:
+        row = dict(row)
+        row['created_at'] = isoformat(row['created_at'], dt_timezone.utc)
+        row['read_at'] = isoformat(row['read_at'], dt_timezone.utc)
+        lines.append(dumps(row))
+    return ('\n'.join(lines) + '\n').encode()
+
+
+class TableArchiver:
+    """Stores each chunk as one compressed NotificationArchive row"""
+
+    def write(self, rows):
+        NotificationArchive.objects.create(
+            first_id=rows[0]['id'],
+            last_id=rows[-1]['id'],
+            row_count=len(rows),
+            oldest_created_at=min(row['created_at'] for row in rows),
+            newest_created_at=max(row['created_at'] for row in rows),
+            data=zlib.compress(to_ndjson(rows)),
+        )
+
+
+class NDJSONArchiver:
+    """Appends each chunk to a gzip-compressed NDJSON file as its own gzip member"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def write(self, rows):
+        with gzip.open(self.path, 'ab') as archive:
+            archive.write(to_ndjson(rows))
+
+
+def _release(rows):
+    """Delete archived rows and take their unread ones off the counters"""
+    Notification.objects.filter(id__in=[row['id'] for row in rows]).delete()
+    decrement_unread_many(row['recipient_id'] for row in rows if not row['is_read'])
+
+
+def archive_partition(name, start, end, archiver, batch_size=1000):
+    """
+    Archive every notification in a monthly partition and drop it. The
+    partition is locked against writes first, so a notification marked read
+    meanwhile cannot be taken off its counter twice.
+    """
+    archived = 0
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(f"LOCK TABLE {connection.ops.quote_name(name)} IN EXCLUSIVE MODE")
+        queryset = Notification.objects.filter(created_at__gte=start, created_at__lt=end)
+        unread = []
+        last_id = 0
+        while True:
+            rows = list(queryset.filter(id__gt=last_id).order_by('id').values(*ARCHIVE_FIELDS)[:batch_size])
+            if not rows:
+                break
+            archiver.write(rows)
+            unread.extend(row['recipient_id'] for row in rows if not row['is_read'])
+            archived += len(rows)
+            last_id = rows[-1]['id']
+        decrement_unread_many(unread)
+        partitions.drop_partition(name)
+    return archived
+
+
+def archive_expired_notifications(archiver, now=None, batch_size=1000):
+    """
+    Archive and delete every expired notification, `batch_size` rows per
+    transaction, walking the table in id order so each chunk resumes where
+    the previous one stopped. Returns the number archived.
+    """
+    now = now or timezone.now()
+    archived = 0
+
+    cutoff = partition_cutoff(now)
+    if cutoff is not None:
+        for name, start, end in partitions.list_partitions():
+            if end <= cutoff:
+                archived += archive_partition(name, start, end, archiver, batch_size)
+
+    expired = Notification.objects.filter(expired_condition(now))
+    last_id = 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                expired.filter(id__gt=last_id).order_by('id')
+                .select_for_update(skip_locked=True)
+                .values(*ARCHIVE_FIELDS)[:batch_size]
+            )
+            if not rows:
+                break
+            archiver.write(rows)
+            _release(rows)
+        archived += len(rows)
+        last_id = rows[-1]['id']
+    return archived
@@ -2,27 +2,33 @@
 
 from rest_framework import serializers
 from .models import Notification
+from .payloads import notification_payload, notification_payloads
+
+def rest_representation(payload):
+    """The REST field names for a notification payload"""
+    return {
+        'notification_type' if key == 'type' else key: value
+        for key, value in payload.items()
+    }
+
+class NotificationListSerializer(serializers.ListSerializer):
+    
+    def to_representation(self, data):
+        iterable = data.all() if hasattr(data, 'all') else data
+        return [rest_representation(payload) for payload in notification_payloads(iterable)]
 
 class NotificationSerializer(serializers.ModelSerializer):
-    sender = serializers.SerializerMethodField()
+    # Filled in by notification_payload
+    sender = serializers.DictField(read_only=True)
     time_since = serializers.ReadOnlyField()
     
     class Meta:
         model = Notification
+        list_serializer_class = NotificationListSerializer
         fields = [
             'id', 'notification_type', 'title', 'message', 'sender',
             'is_read', 'created_at', 'read_at', 'time_since', 'extra_data'
         ]
     
-    def get_sender(self, obj):
-        if obj.sender:
-            return {
-                'id': obj.sender.id,
-                'name': obj.sender.full_name,
-                'email': obj.sender.email
-            }
-        return {
-            'id': None,
-            'name': 'System',
-            'email': None
-        }
\ No newline at end of file
+    def to_representation(self, instance):
+        return rest_representation(notification_payload(instance))
@@ -1,12 +1,13 @@
 # signals.py - Create this new file in your app
 
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_save
 from django.dispatch import receiver
 from apps.tasks.models import Task, Comment
 from apps.organizations.models import OrganizationInvite
 from apps.users.models import User
 from .models import Notification
-from .utils import NotificationManager
+from .outbox import enqueue, outbox_handler
+from .utils import NotificationManager, task_assigned_notification, task_status_notifications
 
 @receiver(post_save, sender=Task)
 def task_notification_handler(sender, instance, created, **kwargs):
@@ -14,106 +15,68 @@ def task_notification_handler(sender, instance, created, **kwargs):
     
     if created:
         # Task created/assigned notification
-        if instance.assigned_to and instance.assigned_to != instance.created_by:
-            NotificationManager.create_notification(
-                recipient=instance.assigned_to,
-                sender=instance.created_by,
-                notification_type='task_assigned',
-                title=f'New task assigned: {instance.title}',
-                message=f'You have been assigned a new task "{instance.title}" in project {instance.project.name}',
-                content_object=instance,
-                extra_data={
-                    'project_id': instance.project.id,
-                    'project_name': instance.project.name,
-                    'task_id': instance.id,
-                    'priority': instance.priority,
-                    'due_date': instance.due_date.isoformat() if instance.due_date else None
-                }
-            )
+        if instance.assigned_to_id and instance.assigned_to_id != instance.created_by_id:
+            NotificationManager.create_notifications([
+                task_assigned_notification(instance, instance.project.name, sender=instance.created_by)
+            ])
     else:
-        # Check if status changed
-        try:
-            old_instance = Task.objects.get(pk=instance.pk)
-            if hasattr(instance, '_old_status') and instance._old_status != instance.status:
-                # Notify task creator and assigned user about status change
-                recipients = []
-                if instance.created_by and instance.created_by != instance.assigned_to:
-                    recipients.append(instance.created_by)
-                if instance.assigned_to:
-                    recipients.append(instance.assigned_to)
-                
-                for recipient in recipients:
-                    NotificationManager.create_notification(
-                        recipient=recipient,
-                        sender=None,  # System notification
-                        notification_type='task_status_changed',
-                        title=f'Task status updated: {instance.title}',
-                        message=f'Task "{instance.title}" status changed to {instance.get_status_display()}',
-                        content_object=instance,
-                        extra_data={
-                            'project_id': instance.project.id,
-                            'project_name': instance.project.name,
-                            'task_id': instance.id,
-                            'old_status': instance._old_status,
-                            'new_status': instance.status
-                        }
-                    )
-        except Task.DoesNotExist:
-            pass
-
-@receiver(pre_save, sender=Task)
-def store_old_task_status(sender, instance, **kwargs):
-    """Store old status before saving to detect changes"""
-    if instance.pk:
-        try:
-            old_instance = Task.objects.get(pk=instance.pk)
-            instance._old_status = old_instance.status
-        except Task.DoesNotExist:
-            pass
+        # Status as it was loaded, tracked on the instance (see Task.loaded_value)
+        old_status = instance.loaded_value('status')
+        if old_status is not None and old_status != instance.status:
+            # Notify task creator and assigned user about status change
+            NotificationManager.create_notifications(
+                task_status_notifications(instance, instance.project.name, old_status)
+            )
 
 @receiver(post_save, sender=Comment)
 def comment_notification_handler(sender, instance, created, **kwargs):
-    """Handle comment notifications"""
+    """Queue comment notifications; the fan-out runs in the notification worker"""
     
     if created:
-        # Notify task assignee and creator about new comment
-        recipients = set()
-        
-        if instance.task.assigned_to and instance.task.assigned_to != instance.commented_by:
-            recipients.add(instance.task.assigned_to)
-        
-        if instance.task.created_by and instance.task.created_by != instance.commented_by:
-            recipients.add(instance.task.created_by)
-        
-        # Also notify other commenters (excluding the current commenter)
-        other_commenters = Comment.objects.filter(
-            task=instance.task
-        ).exclude(
-            commented_by=instance.commented_by
-        ).values_list('commented_by', flat=True).distinct()
-        
-        for commenter_id in other_commenters:
-            try:
-                recipients.add(User.objects.get(id=commenter_id))
-            except User.DoesNotExist:
-                continue
-        
-        for recipient in recipients:
-            NotificationManager.create_notification(
-                recipient=recipient,
-                sender=instance.commented_by,
-                notification_type='task_comment',
-                title=f'New comment on: {instance.task.title}',
-                message=f'{instance.commented_by.full_name} commented on task "{instance.task.title}"',
-                content_object=instance.task,
-                extra_data={
-                    'project_id': instance.task.project.id,
-                    'project_name': instance.task.project.name,
-                    'task_id': instance.task.id,
-                    'comment_id': instance.id,
-                    'comment_preview': instance.comment_text[:100] + ('...' if len(instance.comment_text) > 100 else '')
-                }
-            )
+        enqueue('comment_created', comment_id=instance.id)
+
+@outbox_handler('comment_created')
+def notify_comment_participants(comment_id):
+    """Notify the task's assignee, creator and other commenters about a new comment"""
+    
+    try:
+        instance = Comment.objects.select_related('task__project', 'commented_by').get(id=comment_id)
+    except Comment.DoesNotExist:
+        return
+    
+    task = instance.task
+    
+    # Task assignee, creator and every other commenter, resolved in one query
+    recipient_ids = set(
+        Comment.objects.filter(task_id=task.id)
+        .exclude(commented_by_id=instance.commented_by_id)
+        .values_list('commented_by_id', flat=True)
+        .distinct()
+    )
+    recipient_ids.update(user_id for user_id in (task.assigned_to_id, task.created_by_id) if user_id)
+    recipient_ids.discard(instance.commented_by_id)
+    
+    extra_data = {
+        'project_id': task.project_id,
+        'project_name': task.project.name,
+        'task_id': task.id,
+        'comment_id': instance.id,
+        'comment_preview': instance.comment_text[:100] + ('...' if len(instance.comment_text) > 100 else '')
+    }
+    
+    # One INSERT for all rows and one delivery job for all recipients
+    NotificationManager.create_notifications([
+        NotificationManager.build_notification(
+            recipient_id=recipient_id,
+            sender=instance.commented_by,
+            notification_type='task_comment',
+            title=f'New comment on: {task.title}',
+            message=f'{instance.commented_by.full_name} commented on task "{task.title}"',
+            content_object=task,
+            extra_data=extra_data
+        )
+        for recipient_id in sorted(recipient_ids)
+    ])
 
 @receiver(post_save, sender=OrganizationInvite)
 def organization_invite_notification_handler(sender, instance, created, **kwargs):
@@ -1,3 +1,641 @@
-from django.test import TestCase
+import asyncio
+import gzip
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+from datetime import timedelta
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from channels.testing import WebsocketCommunicator
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.organizations.models import Organization
+from apps.projects.models import Project
+from apps.tasks.models import Task, Comment
+from apps.users.models import User
+from core.testing import explain
+from .middleware import JWTAuthMiddleware
+from .consumers import NotificationConsumer, collapse_frames
+from .counters import get_unread_count, reconcile_unread_counts
+from .models import Notification, NotificationArchive, NotificationOutbox, UnreadNotificationCounter
+from .outbox import enqueue, outbox_handler, process_batch
+from .payloads import dumps, notification_payload
+from . import outbox, partitions
+from .retention import TableArchiver, archive_expired_notifications, archive_partition
+from .serializers import NotificationSerializer
+from .utils import NotificationManager
+
+
+@override_settings(NOTIFICATION_ASYNC_DELIVERY=True)
+class NotificationOutboxTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user('owner@example.com', 'pass', 'Owner')
+        org = Organization.objects.create(name='Org', created_by=cls.owner)
+        project = Project.objects.create(name='Project', description='', organization=org, created_by=cls.owner)
+        cls.task = Task.objects.create(project=project, title='Task', created_by=cls.owner)
+        cls.participants = [
+            User.objects.create_user(f'user{i}@example.com', 'pass', f'User {i}')
+            for i in range(5)
+        ]
+        for user in cls.participants:
+            Comment.objects.create(task=cls.task, commented_by=user, comment_text='Earlier')
+        NotificationOutbox.objects.all().delete()
+
+    def test_comment_queues_one_entry_regardless_of_recipients(self):
+        Comment.objects.create(task=self.task, commented_by=self.owner, comment_text='New')
+
+        self.assertEqual(NotificationOutbox.objects.count(), 1)
+        self.assertFalse(Notification.objects.exists())
+
+    def test_worker_fans_out_and_delivers(self):
+        Comment.objects.create(task=self.task, commented_by=self.owner, comment_text='New')
+
+        with mock.patch('apps.notifications.utils.NotificationManager.broadcast_notifications') as broadcast:
+            while process_batch():
+                pass
+
+        self.assertEqual(Notification.objects.filter(notification_type='task_comment').count(), 5)
+        broadcast.assert_called_once()
+        self.assertEqual(len(broadcast.call_args.args[0]), 5)
+        self.assertFalse(NotificationOutbox.objects.exists())
+
+    def test_failed_entries_are_retried_then_parked(self):
+        calls = []
+
+        @outbox_handler('test_flaky')
+        def flaky(**payload):
+            calls.append(payload)
+            raise RuntimeError('channel layer full')
+
+        entry = enqueue('test_flaky', value=1)
+        process_batch(max_attempts=2)
+        entry.refresh_from_db()
+        self.assertEqual((entry.attempts, entry.failed), (1, False))
+        self.assertIn('channel layer full', entry.last_error)
+
+        NotificationOutbox.objects.filter(pk=entry.pk).update(available_at=entry.created_at)
+        process_batch(max_attempts=2)
+        entry.refresh_from_db()
+        self.assertEqual((entry.attempts, entry.failed), (2, True))
+
+        # Parked entries are not picked up again
+        self.assertEqual(process_batch(max_attempts=2), 0)
+        self.assertEqual(len(calls), 2)
+
+    @override_settings(NOTIFICATION_ASYNC_DELIVERY=False)
+    def test_without_the_worker_delivery_runs_after_commit(self):
+        with mock.patch('apps.notifications.utils.NotificationManager.broadcast_notifications') as broadcast:
+            with self.captureOnCommitCallbacks(execute=True):
+                Comment.objects.create(task=self.task, commented_by=self.owner, comment_text='New')
+
+        self.assertEqual(Notification.objects.filter(notification_type='task_comment').count(), 5)
+        broadcast.assert_called_once()
+        self.assertEqual(len(broadcast.call_args.args[0]), 5)
+        self.assertFalse(NotificationOutbox.objects.exists())
+
+    def test_delivery_sends_every_message_from_one_event_loop_hop(self):
+        Comment.objects.create(task=self.task, commented_by=self.owner, comment_text='New')
+        layer = mock.Mock(group_send=mock.AsyncMock())
+        with mock.patch('apps.notifications.utils.get_channel_layer', return_value=layer), \
+                mock.patch('apps.notifications.utils.async_to_sync', wraps=async_to_sync) as bridge:
+            while process_batch():
+                pass
+
+        bridge.assert_called_once()
+        self.assertEqual(
+            sorted(call.args[0] for call in layer.group_send.await_args_list),
+            sorted(f'user_{user.id}' for user in self.participants)
+        )
+
+    @override_settings(NOTIFICATION_ASYNC_DELIVERY=False)
+    def test_without_the_worker_failures_do_not_fail_the_commit(self):
+        @outbox_handler('test_broken')
+        def broken():
+            raise RuntimeError('channel full')
+        self.addCleanup(outbox._handlers.pop, 'test_broken')
+
+        with mock.patch.object(outbox, 'IN_PROCESS_RETRY_DELAY', 0), \
+                self.assertLogs('apps.notifications.outbox', 'ERROR'):
+            with self.captureOnCommitCallbacks(execute=True):
+                enqueue('test_broken')
+
+
+class InProcessDeliveryTests(SimpleTestCase):
+
+    def register(self, func):
+        outbox_handler('test_in_process')(func)
+        self.addCleanup(outbox._handlers.pop, 'test_in_process', None)
+
+    def test_handlers_run_on_the_delivery_pool(self):
+        ran = threading.Event()
+        threads = []
+
+        def handler(value):
+            threads.append((threading.current_thread().name, value))
+            ran.set()
+        self.register(handler)
+
+        outbox.run_in_background('test_in_process', {'value': 1})
+        self.assertTrue(ran.wait(5))
+        self.assertTrue(threads[0][0].startswith('notification-delivery'))
+        self.assertEqual(threads[0][1], 1)
+
+    @override_settings(NOTIFICATION_DELIVERY_THREADS=0)
+    def test_zero_threads_runs_on_the_calling_thread(self):
+        threads = []
+        self.register(lambda: threads.append(threading.current_thread()))
+        outbox.run_in_background('test_in_process', {})
+        self.assertEqual(threads, [threading.current_thread()])
+
+    def test_failures_are_retried_then_logged(self):
+        calls = []
+
+        def flaky():
+            calls.append(1)
+            if len(calls) < 2:
+                raise RuntimeError('channel full')
+        self.register(flaky)
+
+        with mock.patch.object(outbox, 'IN_PROCESS_RETRY_DELAY', 0):
+            self.assertTrue(outbox.run_handler('test_in_process', {}))
+            self.assertEqual(len(calls), 2)
+
+            self.register(mock.Mock(side_effect=RuntimeError('channel full')))
+            with self.assertLogs('apps.notifications.outbox', 'ERROR'):
+                self.assertFalse(outbox.run_handler('test_in_process', {}))
+        self.assertEqual(outbox._handlers['test_in_process'].call_count, outbox.IN_PROCESS_ATTEMPTS)
+
+
+@override_settings(NOTIFICATION_ASYNC_DELIVERY=True)
+class CommentFanOutTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user('owner@example.com', 'pass', 'Owner')
+        org = Organization.objects.create(name='Org', created_by=cls.owner)
+        project = Project.objects.create(name='Project', description='', organization=org, created_by=cls.owner)
+        cls.task = Task.objects.create(project=project, title='Task', created_by=cls.owner)
+
+    def add_participants(self, count):
+        users = User.objects.bulk_create([
+            User(email=f'user{count}-{i}@example.com', full_name=f'User {i}')
+            for i in range(count)
+        ])
+        Comment.objects.bulk_create([
+            Comment(
+                task=self.task, project_id=self.task.project_id, organization_id=self.task.organization_id,
+                commented_by=user, comment_text='Earlier'
+            )
+            for user in users
+        ])
+
+    def fan_out_queries(self):
+        from .signals import notify_comment_participants
+
+        comment = Comment.objects.create(task=self.task, commented_by=self.owner, comment_text='New')
+        NotificationOutbox.objects.all().delete()
+        ContentType.objects.get_for_model(Task)
+        # comment, commenters, notification insert, counter update, outbox insert
+        with self.assertNumQueries(5):
+            notify_comment_participants(comment.id)
+
+    def test_fan_out_query_count_is_constant(self):
+        self.add_participants(2)
+        self.fan_out_queries()
+        self.assertEqual(Notification.objects.count(), 2)
+
+        Notification.objects.all().delete()
+        self.add_participants(50)
+        self.fan_out_queries()
+        self.assertEqual(Notification.objects.count(), 52)
+        self.assertEqual(NotificationOutbox.objects.count(), 1)
+
+
+class UnreadCounterTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('reader@example.com', 'pass', 'Reader')
+        cls.other = User.objects.create_user('other@example.com', 'pass', 'Other')
+
+    def notify(self, *recipients):
+        return NotificationManager.create_notifications([
+            NotificationManager.build_notification(
+                recipient_id=recipient.id, notification_type='task_comment', title='T', message='M'
+            )
+            for recipient in recipients
+        ])
+
+    def assertCounter(self, user):
+        actual = Notification.objects.filter(recipient=user, is_read=False).count()
+        with self.assertNumQueries(1):
+            self.assertEqual(NotificationManager.get_unread_count(user), actual)
+
+    def test_counter_follows_create_read_and_delete(self):
+        self.notify(self.user, self.other)
+        # First read initialises the counter from the table
+        self.assertEqual(get_unread_count(self.user.id), 1)
+
+        created = self.notify(self.user, self.user, self.user, self.other)
+        self.assertCounter(self.user)
+
+        NotificationManager.mark_notification_as_read(created[0].id, self.user)
+        NotificationManager.mark_notification_as_read(created[0].id, self.user)
+        self.assertCounter(self.user)
+
+        NotificationManager.delete_notifications(self.user, id=created[1].id)
+        NotificationManager.delete_notifications(self.user, id=created[0].id)
+        self.assertCounter(self.user)
+
+        NotificationManager.mark_all_as_read(self.user)
+        self.assertCounter(self.user)
+
+        self.notify(self.user)
+        NotificationManager.delete_notifications(self.user)
+        self.assertCounter(self.user)
+        self.assertEqual(get_unread_count(self.other.id), 2)
+
+    def test_stale_instance_does_not_double_decrement(self):
+        notification, = self.notify(self.user)
+        self.notify(self.user)
+        get_unread_count(self.user.id)
+
+        stale = Notification.objects.get(pk=notification.pk)
+        self.assertTrue(notification.mark_as_read())
+        self.assertFalse(stale.mark_as_read())
+        self.assertCounter(self.user)
+
+    def test_reconcile_fixes_drift(self):
+        self.notify(self.user, self.user, self.other)
+        get_unread_count(self.user.id)
+        get_unread_count(self.other.id)
+        UnreadNotificationCounter.objects.filter(user=self.user).update(unread_count=40)
+
+        self.assertEqual(reconcile_unread_counts(batch_size=1), 1)
+        self.assertEqual(get_unread_count(self.user.id), 2)
+        self.assertEqual(get_unread_count(self.other.id), 1)
+
+
+class NotificationPayloadTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.sender = User.objects.create_user('sender@example.com', 'pass', 'Sender')
+        cls.recipient = User.objects.create_user('recipient@example.com', 'pass', 'Recipient')
+
+    def test_rest_and_websocket_share_one_payload(self):
+        NotificationManager.create_notifications([
+            NotificationManager.build_notification(
+                recipient_id=self.recipient.id, sender=sender, notification_type='task_comment',
+                title='T', message='M', extra_data={'task_id': 1}
+            )
+            for sender in (self.sender, None)
+        ])
+        notifications = list(Notification.objects.select_related('sender').order_by('id'))
+
+        rest = NotificationSerializer(notifications, many=True).data
+        for notification, item in zip(notifications, rest):
+            payload = notification_payload(notification)
+            self.assertEqual(item, {
+                'notification_type' if key == 'type' else key: value
+                for key, value in payload.items()
+            })
+            self.assertEqual(NotificationSerializer(notification).data, item)
+        self.assertEqual(rest[0]['sender']['name'], 'Sender')
+        self.assertEqual(rest[1]['sender'], {'id': None, 'name': 'System', 'email': None})
+        self.assertTrue(rest[0]['created_at'].endswith('Z'))
+        self.assertEqual(json.loads(dumps(rest)), rest)
+
+
+@override_settings(USER_CACHE_ENABLED=True)
+class WebSocketAuthCacheTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('socket@example.com', 'pass', 'Socket')
+        cls.admin = User.objects.create_superuser('root@example.com', 'pass', 'Root')
+
+    def setUp(self):
+        cache.clear()
+        self.middleware = JWTAuthMiddleware(None)
+        self.token = str(AccessToken.for_user(self.user))
+        # database_sync_to_async closes connections it considers obsolete,
+        # which includes the one holding this test's transaction on PostgreSQL
+        patcher = mock.patch('channels.db.close_old_connections')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def authenticate(self):
+        return async_to_sync(self.middleware.get_user_from_token)(self.token)
+
+    def test_reconnects_are_served_from_cache(self):
+        with self.assertNumQueries(1):
+            for _ in range(20):
+                user = self.authenticate()
+        self.assertEqual((user.pk, user.email), (self.user.pk, self.user.email))
+        self.assertEqual(user.get_deferred_fields(), {'password'})
+
+    def test_deactivation_invalidates_cache(self):
+        self.authenticate()
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.post(f'/api/v1/admin/users/{self.user.pk}/activate/')
+        self.assertEqual(response.data, {'status': 'inactive'})
+
+        self.assertIsNone(self.authenticate())
+
+    @override_settings(WEBSOCKET_AUTH_FROM_CLAIMS=True)
+    def test_user_from_claims_needs_no_query(self):
+        with self.assertNumQueries(0):
+            user = self.authenticate()
+        self.assertEqual(user.pk, self.user.pk)
+
+    def test_invalid_token_is_rejected(self):
+        self.token = self.token[:-2]
+        self.assertIsNone(self.authenticate())
+
+
+@override_settings(
+    NOTIFICATION_RETENTION_DAYS={'default': 30, 'task_due_soon': 7},
+    NOTIFICATION_UNREAD_RETENTION_DAYS=90,
+)
+class NotificationRetentionTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('reader@example.com', 'pass', 'Reader')
+
+    def notify(self, notification_type, age_days, is_read):
+        notification = NotificationManager.create_notification(
+            recipient=self.user, notification_type=notification_type, title=f'{notification_type} {age_days}', message='M'
+        )
+        Notification.objects.filter(pk=notification.pk).update(
+            created_at=timezone.now() - timedelta(days=age_days), is_read=is_read
+        )
+        return notification.pk
+
+    def test_archives_per_type_ttl_and_keeps_counter(self):
+        get_unread_count(self.user.id)
+        archived = {
+            self.notify('task_comment', 40, True),
+            self.notify('task_due_soon', 10, True),
+            self.notify('task_comment', 100, False),
+        }
+        kept = {
+            self.notify('task_comment', 20, True),
+            self.notify('task_due_soon', 3, True),
+            self.notify('task_comment', 40, False),
+        }
+        # The test flipped is_read behind the counter's back
+        reconcile_unread_counts()
+
+        self.assertEqual(archive_expired_notifications(TableArchiver(), batch_size=2), 3)
+
+        self.assertEqual(set(Notification.objects.values_list('id', flat=True)), kept)
+        self.assertEqual(
+            {row['id'] for archive in NotificationArchive.objects.all() for row in archive.rows()}, archived
+        )
+        self.assertEqual(NotificationArchive.objects.count(), 2)
+        self.assertEqual(get_unread_count(self.user.id), 1)
+        self.assertEqual(reconcile_unread_counts(), 0)
+
+    def test_ndjson_archive(self):
+        archived = self.notify('task_comment', 40, True)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'notifications.ndjson.gz')
+            call_command('archive_notifications', ndjson=path, stdout=io.StringIO())
+            with gzip.open(path, 'rt') as archive:
+                rows = [json.loads(line) for line in archive]
+
+        self.assertEqual([row['id'] for row in rows], [archived])
+        self.assertEqual(rows[0]['title'], 'task_comment 40')
+        self.assertFalse(Notification.objects.exists())
+        self.assertFalse(NotificationArchive.objects.exists())
+
+    def test_partitioning_needs_postgres(self):
+        with self.assertRaises(CommandError):
+            call_command('partition_notifications')
+
+
+
+@skipUnless(connection.vendor == 'postgresql', "table partitioning needs PostgreSQL")
+class NotificationPartitionTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('reader@example.com', 'pass', 'Reader')
+
+    def notify(self, created_at):
+        notification = Notification.objects.create(
+            recipient=self.user, notification_type='task_comment', title='T', message='M'
+        )
+        Notification.objects.filter(pk=notification.pk).update(created_at=created_at)
+        return notification.pk
+
+    def partition_of(self, pk):
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT tableoid::regclass::text FROM {partitions.TABLE} WHERE id = %s", [pk])
+            return cursor.fetchone()[0]
+
+    def test_convert_create_and_drop(self):
+        now = partitions.month_start(timezone.now())
+        old = self.notify(now - timedelta(days=70))
+        current = self.notify(now)
+        # Run the rebuild as if in its own transaction: ALTER TABLE refuses
+        # tables with deferred foreign key checks still pending
+        with connection.cursor() as cursor:
+            cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+
+        partitions.convert_to_partitioned(now, months_ahead=1)
+        self.assertTrue(partitions.is_partitioned())
+        names = [name for name, _, _ in partitions.list_partitions()]
+        self.assertEqual(len(names), 5)
+        self.assertEqual(self.partition_of(current), partitions.partition_name(now))
+        self.assertGreater(self.notify(now), current)
+
+        # Rows written after the cron lapsed land in the default partition...
+        later = partitions.next_month(partitions.next_month(partitions.next_month(now)))
+        late = self.notify(later)
+        self.assertEqual(self.partition_of(late), partitions.DEFAULT_PARTITION)
+        # ...and move into their month once it is created
+        self.assertIn(partitions.partition_name(later), partitions.create_upcoming_partitions(later, months_ahead=0))
+        self.assertEqual(self.partition_of(late), partitions.partition_name(later))
+
+        name, start, end = partitions.list_partitions()[0]
+        self.assertEqual(self.partition_of(old), name)
+        self.assertEqual(archive_partition(name, start, end, TableArchiver()), 1)
+        self.assertNotIn(name, [name for name, _, _ in partitions.list_partitions()])
+        self.assertFalse(Notification.objects.filter(pk=old).exists())
+        self.assertEqual(NotificationArchive.objects.get().first_id, old)
+
+
+class UnreadIndexTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        users = [User.objects.create_user(f'user{i}@example.com', 'pass', f'User {i}') for i in range(20)]
+        Notification.objects.bulk_create([
+            Notification(recipient=user, notification_type='task_comment', title='T', message='M', is_read=i % 10 != 0)
+            for user in users
+            for i in range(50)
+        ])
+        cls.user = users[0]
+
+    def test_unread_lookups_use_partial_index(self):
+        unread = Notification.objects.filter(recipient=self.user, is_read=False)
+        self.assertIn('notification_unread_idx', explain(unread))
+        self.assertEqual(unread.count(), 5)
+
+        self.assertNotIn('notification_unread_idx', explain(
+            Notification.objects.filter(recipient=self.user, is_read=True)
+        ))
+
+
+@override_settings(
+    CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}},
+    NOTIFICATION_PUSH_BATCH_WINDOW=0.05,
+)
+class PushBatchingTests(SimpleTestCase):
+
+    def connect(self, path):
+        async def connect():
+            communicator = WebsocketCommunicator(NotificationConsumer.as_asgi(), path)
+            communicator.scope['user'] = User(id=7, email='socket@example.com')
+            connected, _ = await communicator.connect()
+            self.assertTrue(connected)
+            self.assertEqual((await communicator.receive_json_from())['type'], 'initial_data')
+            return communicator
+        return connect
+
+    def burst(self, path):
+        async def run():
+            communicator = await self.connect(path)()
+            layer = get_channel_layer()
+            for i in range(3):
+                await layer.group_send('user_7', {'type': 'notification_message', 'notification': {'id': i}})
+            await layer.group_send('user_7', {'type': 'notification_read', 'notification_id': 0, 'unread_count': 2})
+            await layer.group_send('user_7', {'type': 'notifications_read', 'unread_count': 0})
+            frames = []
+            while not await communicator.receive_nothing(timeout=0.2):
+                frames.append(await communicator.receive_json_from())
+            await communicator.disconnect()
+            return frames
+
+        with mock.patch.object(NotificationConsumer, 'get_initial_data', return_value={'unread_count': 0, 'notifications': []}):
+            return async_to_sync(run)()
+
+    def test_events_are_sent_one_frame_each_by_default(self):
+        frames = self.burst('/ws/notifications/')
+        self.assertEqual(len(frames), 5)
+
+    def test_batched_connection_gets_one_collapsed_frame(self):
+        frames = self.burst('/ws/notifications/?batch=1')
+        self.assertEqual(len(frames), 1)
+        self.assertEqual(frames[0]['type'], 'batch')
+        self.assertEqual(
+            [event['type'] for event in frames[0]['events']],
+            ['new_notification'] * 3 + ['notification_read', 'notifications_read'],
+        )
+        self.assertNotIn('unread_count', frames[0]['events'][3])
+        self.assertEqual(frames[0]['events'][4]['unread_count'], 0)
+
+    def test_collapse_keeps_only_last_count_update(self):
+        frames = collapse_frames([
+            {'type': 'notification_read', 'notification_id': 1, 'unread_count': 4},
+            {'type': 'unread_count_update', 'unread_count': 4},
+            {'type': 'new_notification', 'notification': {}},
+            {'type': 'unread_count_update', 'unread_count': 5},
+        ])
+        self.assertEqual(frames, [
+            {'type': 'notification_read', 'notification_id': 1},
+            {'type': 'new_notification', 'notification': {}},
+            {'type': 'unread_count_update', 'unread_count': 5},
+        ])
+
+
+try:
+    import channels_redis  # noqa: F401
+    from fakeredis import TcpFakeServer
+except ImportError:
+    TcpFakeServer = None
+
+
+SEND_FROM_WORKER = """
+import sys
+import django
+django.setup()
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+async_to_sync(get_channel_layer().group_send)(
+    'user_1', {'type': 'notification_message', 'notification': {'worker': sys.argv[1]}}
+)
+"""
+
+
+@skipUnless(TcpFakeServer, "channels_redis and fakeredis are required")
+class SharedChannelLayerTests(SimpleTestCase):
+    """Messages sent by one worker process reach sockets held by another."""
+
+    def setUp(self):
+        self.server = TcpFakeServer(('127.0.0.1', 0))
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.url = 'redis://127.0.0.1:%d/0' % self.server.server_address[1]
+
+    def run_worker(self, name):
+        env = dict(
+            os.environ,
+            CHANNEL_REDIS_URL=self.url,
+            PYTHONPATH=os.pathsep.join(sys.path),
+        )
+        return subprocess.Popen(
+            [sys.executable, '-c', SEND_FROM_WORKER, name], env=env, cwd=settings.BASE_DIR
+        )
+
+    def test_group_send_reaches_consumer_in_other_process(self):
+        layer_settings = {
+            'default': {
+                'BACKEND': 'channels_redis.core.RedisChannelLayer',
+                'CONFIG': {'hosts': [self.url], 'prefix': 'pm'},
+            }
+        }
+        with override_settings(CHANNEL_LAYERS=layer_settings):
+            layer = get_channel_layer()
+
+            async def receive_from_workers():
+                channel = await layer.new_channel()
+                await layer.group_add('user_1', channel)
+                workers = [self.run_worker(name) for name in ('a', 'b')]
+                received = [
+                    await asyncio.wait_for(layer.receive(channel), timeout=20)
+                    for _ in workers
+                ]
+                for worker in workers:
+                    await asyncio.to_thread(worker.wait, 20)
+                    self.assertEqual(worker.returncode, 0)
+                return received
+
+            messages = async_to_sync(receive_from_workers)()
+
+        self.assertEqual(
+            sorted(message['notification']['worker'] for message in messages), ['a', 'b']
+        )
+        self.assertTrue(all(m['type'] == 'notification_message' for m in messages))
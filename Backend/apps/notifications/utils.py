@@ -1,9 +1,14 @@
 # utils.py - Create this new file in your app
 
+import asyncio
+
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
 from django.contrib.contenttypes.models import ContentType
 import json
+from .counters import decrement_unread, get_unread_count, increment_unread
+from .outbox import enqueue, outbox_handler
+from .payloads import notification_payload
 
 class NotificationManager:
     """Utility class to handle notification creation and WebSocket broadcasting"""
@@ -12,7 +17,7 @@ class NotificationManager:
     def create_notification(recipient, notification_type, title, message, 
                           sender=None, content_object=None, extra_data=None):
         """
-        Create a notification and broadcast it via WebSocket
+        Create a notification and queue its WebSocket broadcast
         """
         from .models import Notification
         
@@ -32,52 +37,77 @@ class NotificationManager:
         
         # Create notification in database
         notification = Notification.objects.create(**notification_data)
+        increment_unread([notification.recipient_id])
         
-        # Broadcast via WebSocket
-        NotificationManager.broadcast_notification(notification)
+        # Broadcast via WebSocket from the notification worker
+        enqueue('deliver_notifications', notification_ids=[notification.id])
         
         return notification
     
     @staticmethod
-    def broadcast_notification(notification):
+    def build_notification(recipient_id, notification_type, title, message,
+                           sender=None, content_object=None, extra_data=None):
         """
-        Broadcast notification to user via WebSocket
+        Build an unsaved notification for create_notifications
         """
-        channel_layer = get_channel_layer()
+        from .models import Notification
         
-        # Prepare notification data for WebSocket
-        notification_data = {
-            'type': 'notification_message',
-            'notification': {
-                'id': notification.id,
-                'type': notification.notification_type,
-                'title': notification.title,
-                'message': notification.message,
-                'sender': {
-                    'id': notification.sender.id if notification.sender else None,
-                    'name': notification.sender.full_name if notification.sender else 'System',
-                    'email': notification.sender.email if notification.sender else None
-                },
-                'is_read': notification.is_read,
-                'created_at': notification.created_at.isoformat(),
-                'time_since': notification.time_since,
-                'extra_data': notification.extra_data
-            }
-        }
+        notification = Notification(
+            recipient_id=recipient_id,
+            sender=sender,
+            notification_type=notification_type,
+            title=title,
+            message=message,
+            extra_data=extra_data or {}
+        )
+        if content_object:
+            notification.content_type = ContentType.objects.get_for_model(content_object)
+            notification.object_id = content_object.pk
+        return notification
+    
+    @staticmethod
+    def create_notifications(notifications):
+        """
+        Insert many notifications with a single query and queue one
+        WebSocket delivery job for all of them
+        """
+        from .models import Notification
         
-        # Send to user's personal channel
-        group_name = f"user_{notification.recipient.id}"
+        if not notifications:
+            return []
         
-        async_to_sync(channel_layer.group_send)(
-            group_name,
-            notification_data
-        )
+        created = Notification.objects.bulk_create(notifications)
+        increment_unread([notification.recipient_id for notification in created])
+        enqueue('deliver_notifications', notification_ids=[notification.id for notification in created])
+        return created
+    
+    @staticmethod
+    def broadcast_notification(notification):
+        """
+        Broadcast notification to user via WebSocket
+        """
+        NotificationManager.broadcast_notifications([notification])
+    
+    @staticmethod
+    def broadcast_notifications(notifications):
+        """
+        Broadcast notifications to their recipients via WebSocket, sending
+        every group message concurrently from a single event loop hop
+        """
+        messages = [
+            (f"user_{notification.recipient_id}", {
+                'type': 'notification_message',
+                'notification': notification_payload(notification)
+            })
+            for notification in notifications
+        ]
+        if messages:
+            async_to_sync(group_send_all)(get_channel_layer(), messages)
     
     @staticmethod
     def get_unread_count(user):
-        """Get unread notification count for a user"""
-        from .models import Notification
-        return Notification.objects.filter(recipient=user, is_read=False).count()
+        """Get unread notification count for a user from the counter cache"""
+        return get_unread_count(user.id)
     
     @staticmethod
     def mark_all_as_read(user):
@@ -86,7 +116,7 @@ class NotificationManager:
         from django.utils import timezone
         
         notifications = Notification.objects.filter(recipient=user, is_read=False)
-        notifications.update(is_read=True, read_at=timezone.now())
+        decrement_unread(user.id, notifications.update(is_read=True, read_at=timezone.now()))
         
         # Broadcast update to user
         channel_layer = get_channel_layer()
@@ -104,7 +134,6 @@ class NotificationManager:
     def mark_notification_as_read(notification_id, user):
         """Mark a specific notification as read"""
         from .models import Notification
-        from django.utils import timezone
         
         try:
             notification = Notification.objects.get(id=notification_id, recipient=user)
@@ -125,4 +154,90 @@ class NotificationManager:
             
             return True
         except Notification.DoesNotExist:
-            return False
\ No newline at end of file
+            return False
+    
+    @staticmethod
+    def delete_notifications(user, **filters):
+        """
+        Delete the user's notifications matching `filters` and adjust the
+        unread counter. Returns the number of notifications deleted.
+        """
+        from .models import Notification
+        
+        notifications = Notification.objects.filter(recipient=user, **filters)
+        # Unread rows are deleted on their own so the counter is decremented
+        # by exactly what was removed, even if they are read concurrently
+        unread_deleted, _ = notifications.filter(is_read=False).delete()
+        read_deleted, _ = notifications.delete()
+        decrement_unread(user.id, unread_deleted)
+        return unread_deleted + read_deleted
+
+
+async def group_send_all(channel_layer, messages):
+    """
+    group_send each (group, message) pair concurrently. Every send is
+    attempted; the first failure is raised once all have finished.
+    """
+    results = await asyncio.gather(
+        *(channel_layer.group_send(group, message) for group, message in messages),
+        return_exceptions=True
+    )
+    for result in results:
+        if isinstance(result, Exception):
+            raise result
+
+
+@outbox_handler('deliver_notifications')
+def deliver_notifications(notification_ids):
+    """Outbox handler: push stored notifications to their recipients' groups"""
+    from .models import Notification
+    
+    notifications = Notification.objects.filter(id__in=notification_ids).select_related('sender')
+    NotificationManager.broadcast_notifications(notifications)
+
+
+def task_assigned_notification(task, project_name, sender=None):
+    """Unsaved 'task_assigned' notification for the task's assignee"""
+    return NotificationManager.build_notification(
+        recipient_id=task.assigned_to_id,
+        sender=sender,
+        notification_type='task_assigned',
+        title=f'New task assigned: {task.title}',
+        message=f'You have been assigned a new task "{task.title}" in project {project_name}',
+        content_object=task,
+        extra_data={
+            'project_id': task.project_id,
+            'project_name': project_name,
+            'task_id': task.id,
+            'priority': task.priority,
+            'due_date': task.due_date.isoformat() if task.due_date else None
+        }
+    )
+
+
+def task_status_notifications(task, project_name, old_status):
+    """Unsaved 'task_status_changed' notifications for the task's creator and assignee"""
+    recipient_ids = []
+    if task.created_by_id and task.created_by_id != task.assigned_to_id:
+        recipient_ids.append(task.created_by_id)
+    if task.assigned_to_id:
+        recipient_ids.append(task.assigned_to_id)
+    
+    return [
+        NotificationManager.build_notification(
+            recipient_id=recipient_id,
+            sender=None,  # System notification
+            notification_type='task_status_changed',
+            title=f'Task status updated: {task.title}',
+            message=f'Task "{task.title}" status changed to {task.get_status_display()}',
+            content_object=task,
+            extra_data={
+                'project_id': task.project_id,
+                'project_name': project_name,
+                'task_id': task.id,
+                'old_status': old_status,
+                'new_status': task.status
+            }
+        )
+        for recipient_id in recipient_ids
+    ]
@@ -3,22 +3,33 @@
 from rest_framework import generics, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import BrowsableAPIRenderer, JSONRenderer
 from rest_framework.response import Response
-from rest_framework.pagination import PageNumberPagination
 
+from core.pagination import KeysetPagination
 from .models import Notification
+from .payloads import orjson
 from .serializers import NotificationSerializer
 from .utils import NotificationManager
 
-class NotificationPagination(PageNumberPagination):
+class NotificationPagination(KeysetPagination):
     page_size = 20
-    page_size_query_param = 'page_size'
     max_page_size = 100
+    ordering = ('-created_at', '-id')
+
+class NotificationJSONRenderer(JSONRenderer):
+    """Renders notification payloads (plain JSON types only) with orjson when installed"""
+    
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        return orjson.dumps(data)
 
 class NotificationListView(generics.ListAPIView):
     serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated]
     pagination_class = NotificationPagination
+    renderer_classes = [NotificationJSONRenderer, BrowsableAPIRenderer]
     
     def get_queryset(self):
         return Notification.objects.filter(
@@ -73,29 +84,23 @@ def notification_count(request):
 @permission_classes([IsAuthenticated])
 def delete_notification(request, notification_id):
     """Delete a specific notification"""
-    try:
-        notification = Notification.objects.get(
-            id=notification_id, 
-            recipient=request.user
-        )
-        notification.delete()
-        
-        return Response({
-            'success': True,
-            'message': 'Notification deleted',
-            'unread_count': NotificationManager.get_unread_count(request.user)
-        })
-    except Notification.DoesNotExist:
+    if not NotificationManager.delete_notifications(request.user, id=notification_id):
         return Response({
             'success': False,
             'message': 'Notification not found'
         }, status=status.HTTP_404_NOT_FOUND)
+    
+    return Response({
+        'success': True,
+        'message': 'Notification deleted',
+        'unread_count': NotificationManager.get_unread_count(request.user)
+    })
 
 @api_view(['DELETE'])
 @permission_classes([IsAuthenticated])
 def clear_all_notifications(request):
     """Delete all notifications for user"""
-    Notification.objects.filter(recipient=request.user).delete()
+    NotificationManager.delete_notifications(request.user)
     
     return Response({
         'success': True,
@@ -0,0 +1,169 @@
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import OrganizationMembership
+
+
+ADMIN_ROLES = ('admin', 'manager')
+
+ACCESS_CACHE_KEY = 'access:user:{}'
+
+
+class AccessCacheStats:
+    """Process-local hit/miss counters for the shared access cache."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.invalidations = 0
+
+    def record(self, field):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def as_dict(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'hit_rate': self.hits / total if total else 0.0,
+            }
+
+
+access_cache_stats = AccessCacheStats()
+
+
+def query_access_snapshot(user_id):
+    """Load {'org_roles': {org_id: role}, 'project_ids': [...]} with two queries"""
+    from apps.projects.models import ProjectMembership
+
+    return {
+        'org_roles': dict(
+            OrganizationMembership.objects.filter(user_id=user_id)
+            .values_list('organization_id', 'role')
+        ),
+        'project_ids': list(
+            ProjectMembership.objects.filter(user_id=user_id)
+            .values_list('project_id', flat=True)
+        ),
+    }
+
+
+def load_access_snapshot(user_id):
+    """
+    Return {'org_roles': {org_id: role}, 'project_ids': [...]} for a user.
+
+    With ACCESS_CACHE_ENABLED the snapshot is served from the shared cache
+    when possible; on a miss it is queried and stored for
+    ACCESS_CACHE_TIMEOUT seconds. Otherwise it is always queried.
+    """
+    if not getattr(settings, 'ACCESS_CACHE_ENABLED', False):
+        return query_access_snapshot(user_id)
+
+    key = ACCESS_CACHE_KEY.format(user_id)
+    snapshot = cache.get(key)
+    if snapshot is not None:
+        access_cache_stats.record('hits')
+        return snapshot
+
+    access_cache_stats.record('misses')
+    snapshot = query_access_snapshot(user_id)
+    cache.set(key, snapshot, getattr(settings, 'ACCESS_CACHE_TIMEOUT', 300))
+    return snapshot
+
+
+def invalidate_access_cache(*user_ids):
+    """
+    Drop cached access snapshots for the given users once the current
+    transaction commits, so concurrent readers cannot re-cache stale rows.
+    """
+    keys = [ACCESS_CACHE_KEY.format(user_id) for user_id in user_ids if user_id]
+    if not keys:
+        return
+
+    def _delete():
+        cache.delete_many(keys)
+        for _ in keys:
+            access_cache_stats.record('invalidations')
+
+    transaction.on_commit(_delete)
+
+
+class AccessContext:
+    """
+    Snapshot of a user's organization roles and project memberships.
+
+    Loaded lazily (from the shared access cache when enabled, otherwise with
+    two queries) and then shared by every permission class and view that handles
+    the same request, so repeated membership checks for the same user/org pair
+    do not hit the database or the cache again.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self._org_roles = None
+        self._project_ids = None
+
+    def _load(self):
+        if not self.user.is_authenticated:
+            self._org_roles = {}
+            self._project_ids = frozenset()
+            return
+        snapshot = load_access_snapshot(self.user.id)
+        self._org_roles = snapshot['org_roles']
+        self._project_ids = frozenset(snapshot['project_ids'])
+
+    @property
+    def org_roles(self):
+        """Mapping of organization id -> role for the user."""
+        if self._org_roles is None:
+            self._load()
+        return self._org_roles
+
+    @property
+    def project_ids(self):
+        """Set of project ids the user is a member of."""
+        if self._project_ids is None:
+            self._load()
+        return self._project_ids
+
+    def role_in(self, organization_id):
+        """Return the user's role in the organization, or None if not a member."""
+        return self.org_roles.get(organization_id)
+
+    def is_org_member(self, organization_id):
+        return organization_id in self.org_roles
+
+    def is_org_admin(self, organization_id):
+        return self.role_in(organization_id) == 'admin'
+
+    def is_org_admin_or_manager(self, organization_id):
+        return self.role_in(organization_id) in ADMIN_ROLES
+
+    def is_project_member(self, project_id):
+        return project_id in self.project_ids
+
+    def admin_org_ids(self):
+        """Organization ids where the user is an admin or manager."""
+        return [org_id for org_id, role in self.org_roles.items() if role in ADMIN_ROLES]
+
+
+def get_access_context(request):
+    """
+    Return the AccessContext attached to the request, creating it on first use.
+    """
+    context = getattr(request, '_access_context', None)
+    if context is None or context.user is not request.user:
+        context = AccessContext(request.user)
+        request._access_context = context
+    return context
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:33
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizations', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='organization',
+            name='changed_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AddField(
+            model_name='organization',
+            name='version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -1,7 +1,8 @@
 from django.db import models
 from apps.users.models import User  
+from core.models import VersionedModel
        
-class Organization(models.Model):
+class Organization(VersionedModel):
     name = models.CharField(max_length=255)
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='created_organizations')
     created_at = models.DateTimeField(auto_now_add=True)
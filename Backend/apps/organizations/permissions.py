@@ -1,18 +1,12 @@
 from rest_framework import permissions
-from .models import OrganizationMembership, Organization
+from .models import Organization
+from .access import get_access_context
 from django.shortcuts import get_object_or_404
 
 
 class IsOrganizationAdmin(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
-        try:
-            membership = OrganizationMembership.objects.get(
-                user=request.user,
-                organization=obj
-            )
-            return membership.role == 'admin'
-        except OrganizationMembership.DoesNotExist:
-            return False
+        return get_access_context(request).is_org_admin(obj.id)
 
 
 
@@ -23,12 +17,7 @@ class IsOrgAdminOrManagerForProject(permissions.BasePermission):
 
     def has_object_permission(self, request, view, obj):
         # Object here is a ProjectMembership
-        project = obj.project
-        try:
-            membership = OrganizationMembership.objects.get(user=request.user, organization=project.organization)
-            return membership.role in ['admin', 'manager']
-        except OrganizationMembership.DoesNotExist:
-            return False
+        return get_access_context(request).is_org_admin_or_manager(obj.project.organization_id)
 
 class IsOrganizationAdminOrManager(permissions.BasePermission):
     def has_permission(self, request, view):
@@ -38,8 +27,7 @@ class IsOrganizationAdminOrManager(permissions.BasePermission):
             if not org_pk:
                 return False  # Deny if organization identifier is missing
             org = get_object_or_404(Organization, pk=org_pk)
-            membership = org.memberships.filter(user=request.user).first()
-            return bool(membership and membership.role in ['admin', 'manager'])
+            return get_access_context(request).is_org_admin_or_manager(org.id)
         
         # For create, update or delete, we allow the request to proceed and
         # rely on object-level permissions for finer control.
@@ -47,20 +35,19 @@ class IsOrganizationAdminOrManager(permissions.BasePermission):
 
     def has_object_permission(self, request, view, obj):
         # Here, obj is an OrganizationMembership instance.
-        # Check the requester’s membership in the organization associated with the object.
-        membership = obj.organization.memberships.filter(user=request.user).first()
-        if not membership:
+        # Check the requester’s role in the organization associated with the object.
+        role = get_access_context(request).role_in(obj.organization_id)
+        if not role:
             return False
 
         # For retrieve action, both admin and manager can view the details.
         if view.action == 'retrieve':
-            return membership.role in ['admin', 'manager']
+            return role in ['admin', 'manager']
         
         # For update and delete actions, only the admin is allowed.
         if view.action in ['update', 'partial_update', 'destroy']:
-            return membership.role == 'admin'
+            return role == 'admin'
         
         # Deny for any other case.
         return False
 
-
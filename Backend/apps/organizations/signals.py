@@ -0,0 +1,38 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from apps.projects.models import Project, ProjectMembership
+from apps.users.models import User
+from .access import invalidate_access_cache
+from .models import Organization, OrganizationMembership
+
+
+@receiver(post_save, sender=OrganizationMembership)
+@receiver(post_delete, sender=OrganizationMembership)
+@receiver(post_save, sender=ProjectMembership)
+@receiver(post_delete, sender=ProjectMembership)
+def membership_changed_handler(sender, instance, **kwargs):
+    """
+    Drop the member's cached access snapshot whenever a membership changes,
+    and bump the version of the project/organization whose member list changed
+    """
+    invalidate_access_cache(instance.user_id)
+    if sender is ProjectMembership:
+        Project.bump_version(instance.project_id)
+    else:
+        Organization.bump_version(instance.organization_id)
+
+
+@receiver(post_save, sender=User)
+def member_details_changed_handler(sender, instance, created, update_fields, **kwargs):
+    """
+    Member lists show names and emails, so bump the version of every
+    organization and project the user belongs to when those change
+    """
+    if created or not instance.member_list_fields_changed(update_fields):
+        return
+    Organization.bump_version(*OrganizationMembership.objects.filter(
+        user_id=instance.pk
+    ).values_list('organization_id', flat=True))
+    Project.bump_version(*ProjectMembership.objects.filter(
+        user_id=instance.pk
+    ).values_list('project_id', flat=True))
@@ -1,3 +1,224 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from apps.projects.models import Project, ProjectMembership
+from apps.tasks.models import Comment, Task
+from apps.users.models import User
+from .access import ACCESS_CACHE_KEY, access_cache_stats, get_access_context, load_access_snapshot
+from .models import Organization, OrganizationMembership
+
+
+class TypeaheadTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin@example.com', 'pass', 'Zed Admin')
+        cls.employee = User.objects.create_user('employee@example.com', 'pass', 'Employee')
+        cls.org = Organization.objects.create(name='Org', created_by=cls.admin)
+        OrganizationMembership.objects.create(user=cls.admin, organization=cls.org, role='admin')
+        OrganizationMembership.objects.create(user=cls.employee, organization=cls.org, role='employee')
+
+        people = User.objects.bulk_create([
+            User(email=f'person{i}@example.com', full_name=name)
+            for i, name in enumerate(['Jo Smith', 'John Doe', 'Joan Jett', 'Bob Jones', 'Alice Major'])
+        ])
+        OrganizationMembership.objects.bulk_create([
+            OrganizationMembership(user=user, organization=cls.org, role='employee') for user in people
+        ])
+        other_org = Organization.objects.create(name='Other', created_by=cls.admin)
+        outsider = User.objects.create_user('jo.outsider@example.com', 'pass', 'Jo Outsider')
+        OrganizationMembership.objects.create(user=outsider, organization=other_org, role='employee')
+
+        cls.project = Project.objects.create(name='Visible', description='', organization=cls.org, created_by=cls.admin)
+        hidden = Project.objects.create(name='Hidden', description='', organization=cls.org, created_by=cls.admin)
+        ProjectMembership.objects.create(user=cls.employee, project=cls.project)
+        for title in ['Login page', 'Fix login bug', 'Logout']:
+            Task.objects.create(project=cls.project, title=title, created_by=cls.admin)
+        Task.objects.create(project=hidden, title='Login audit', created_by=cls.admin)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def get(self, path, **params):
+        return self.client.get(f'/api/v1/organizations/{self.org.id}/{path}/', params)
+
+    def test_members_prefix_matches_come_first(self):
+        response = self.get('members/typeahead', q='jo')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([member['full_name'] for member in response.data], ['Jo Smith', 'Joan Jett', 'John Doe'])
+
+        # From three characters, substring matches follow the prefix ones
+        response = self.get('members/typeahead', q='jon')
+        self.assertEqual([member['full_name'] for member in response.data], ['Bob Jones'])
+        response = self.get('members/typeahead', q='person1')
+        self.assertEqual([member['email'] for member in response.data], ['person1@example.com'])
+        self.assertEqual(set(response.data[0]), {'id', 'full_name', 'email', 'role'})
+
+    def test_limit_bounds_the_response(self):
+        self.assertEqual(len(self.get('members/typeahead', q='jo', limit=2).data), 2)
+        self.assertEqual(len(self.get('members/typeahead', q='person', limit=1000).data), 5)
+        self.assertEqual(self.get('members/typeahead').status_code, 400)
+
+    def test_employees_cannot_search_members(self):
+        self.client.force_authenticate(self.employee)
+        self.assertEqual(self.get('members/typeahead', q='jo').status_code, 403)
+
+    def test_tasks_are_scoped_to_visible_projects(self):
+        response = self.get('tasks/typeahead', q='log')
+        self.assertEqual(
+            [task['title'] for task in response.data],
+            ['Login audit', 'Login page', 'Logout', 'Fix login bug'],
+        )
+
+        self.client.force_authenticate(self.employee)
+        response = self.get('tasks/typeahead', q='log')
+        self.assertEqual([task['title'] for task in response.data], ['Login page', 'Logout', 'Fix login bug'])
+
+    @override_settings(ACCESS_CACHE_ENABLED=True)
+    def test_typeahead_takes_one_query_per_match_kind(self):
+        self.get('tasks/typeahead', q='log')  # warm the access cache
+        with self.assertNumQueries(2):
+            self.get('tasks/typeahead', q='log')
+        with self.assertNumQueries(1):
+            self.get('tasks/typeahead', q='lo')
+
+
+@override_settings(ACCESS_CACHE_ENABLED=False)
+class AccessContextTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin@example.com', 'pass', 'Admin')
+        cls.manager = User.objects.create_user('manager@example.com', 'pass', 'Manager')
+        cls.member = User.objects.create_user('member@example.com', 'pass', 'Member')
+        cls.employee = User.objects.create_user('employee@example.com', 'pass', 'Employee')
+        cls.outsider = User.objects.create_user('outsider@example.com', 'pass', 'Outsider')
+        cls.org = Organization.objects.create(name='Org', created_by=cls.admin)
+        other_org = Organization.objects.create(name='Other', created_by=cls.outsider)
+        for user, role in [(cls.admin, 'admin'), (cls.manager, 'manager'), (cls.member, 'employee'), (cls.employee, 'employee')]:
+            OrganizationMembership.objects.create(user=user, organization=cls.org, role=role)
+        OrganizationMembership.objects.create(user=cls.outsider, organization=other_org, role='admin')
+
+        cls.project = Project.objects.create(name='Project', description='', organization=cls.org, created_by=cls.admin)
+        ProjectMembership.objects.create(user=cls.member, project=cls.project)
+        cls.task = Task.objects.create(project=cls.project, title='Task', created_by=cls.admin)
+        cls.comment = Comment.objects.create(task=cls.task, commented_by=cls.admin, comment_text='Hi')
+
+    def client_for(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def test_checks_share_one_membership_load(self):
+        request = RequestFactory().get('/')
+        request.user = self.member
+        access = get_access_context(request)
+        with self.assertNumQueries(2):
+            self.assertEqual(access.role_in(self.org.id), 'employee')
+            self.assertTrue(access.is_org_member(self.org.id))
+            self.assertFalse(access.is_org_admin_or_manager(self.org.id))
+            self.assertTrue(access.is_project_member(self.project.id))
+            self.assertEqual(access.admin_org_ids(), [])
+            self.assertIs(get_access_context(request), access)
+
+        request.user = self.admin
+        self.assertIsNot(get_access_context(request), access)
+        self.assertTrue(get_access_context(request).is_org_admin(self.org.id))
+
+    def test_a_request_loads_memberships_once(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client_for(self.admin).patch(f'/api/v1/tasks/{self.task.id}/', {'title': 'Renamed'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        for table in ('organizations_organizationmembership', 'projects_projectmembership'):
+            self.assertEqual(len([q for q in queries if f'FROM "{table}"' in q['sql']]), 1, table)
+
+    def test_task_edits_need_an_admin_or_manager(self):
+        url = f'/api/v1/tasks/{self.task.id}/'
+        for user, status_code in [(self.admin, 200), (self.manager, 200), (self.member, 403), (self.outsider, 404)]:
+            response = self.client_for(user).patch(url, {'title': 'Renamed'}, format='json')
+            self.assertEqual(response.status_code, status_code, user.email)
+
+    def test_comments_need_project_membership(self):
+        for user, status_code in [(self.member, 201), (self.manager, 201), (self.employee, 403), (self.outsider, 403)]:
+            response = self.client_for(user).post('/api/v1/comments/', {'task': self.task.id, 'comment_text': 'Hello'}, format='json')
+            self.assertEqual(response.status_code, status_code, user.email)
+
+        # Employees may only edit their own comments
+        url = f'/api/v1/comments/{self.comment.id}/'
+        self.assertEqual(self.client_for(self.member).patch(url, {'comment_text': 'Edit'}, format='json').status_code, 403)
+        self.assertEqual(self.client_for(self.manager).patch(url, {'comment_text': 'Edit'}, format='json').status_code, 200)
+
+
+@override_settings(ACCESS_CACHE_ENABLED=True)
+class AccessCacheTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin@example.com', 'pass', 'Admin')
+        cls.employee = User.objects.create_user('employee@example.com', 'pass', 'Employee')
+        cls.org = Organization.objects.create(name='Org', created_by=cls.admin)
+        OrganizationMembership.objects.create(user=cls.admin, organization=cls.org, role='admin')
+        cls.membership = OrganizationMembership.objects.create(user=cls.employee, organization=cls.org, role='employee')
+        cls.project = Project.objects.create(name='Project', description='', organization=cls.org, created_by=cls.admin)
+        cls.other_project = Project.objects.create(name='Other', description='', organization=cls.org, created_by=cls.admin)
+        ProjectMembership.objects.create(user=cls.employee, project=cls.project)
+        Task.objects.create(project=cls.project, title='Task', created_by=cls.admin)
+
+    def setUp(self):
+        cache.clear()
+        access_cache_stats.reset()
+
+    def test_snapshot_is_served_from_the_cache(self):
+        with self.assertNumQueries(2):
+            snapshot = load_access_snapshot(self.employee.id)
+        with self.assertNumQueries(0):
+            self.assertEqual(load_access_snapshot(self.employee.id), snapshot)
+
+        self.assertEqual(snapshot, {'org_roles': {self.org.id: 'employee'}, 'project_ids': [self.project.id]})
+        self.assertEqual(
+            access_cache_stats.as_dict(),
+            {'hits': 1, 'misses': 1, 'invalidations': 0, 'hit_rate': 0.5},
+        )
+
+    def test_membership_changes_drop_the_snapshot(self):
+        load_access_snapshot(self.employee.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            added = ProjectMembership.objects.create(user=self.employee, project=self.other_project)
+        self.assertCountEqual(load_access_snapshot(self.employee.id)['project_ids'], [self.project.id, self.other_project.id])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.membership.role = 'manager'
+            self.membership.save()
+        self.assertEqual(load_access_snapshot(self.employee.id)['org_roles'], {self.org.id: 'manager'})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            added.delete()
+            self.membership.delete()
+        self.assertEqual(load_access_snapshot(self.employee.id), {'org_roles': {}, 'project_ids': [self.project.id]})
+
+        self.assertEqual(access_cache_stats.as_dict()['invalidations'], 4)
+        self.assertEqual(access_cache_stats.as_dict()['hits'], 0)
+
+    def test_removed_member_loses_access_on_the_next_request(self):
+        client = APIClient()
+        client.force_authenticate(self.employee)
+        url = f'/api/v1/tasks/?project={self.project.id}'
+        self.assertEqual(len(client.get(url).data['results']), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ProjectMembership.objects.filter(user=self.employee, project=self.project).delete()
+        self.assertEqual(client.get(url).data['results'], [])
+
+    @override_settings(ACCESS_CACHE_ENABLED=False)
+    def test_without_a_shared_cache_snapshots_are_not_kept(self):
+        with self.assertNumQueries(4):
+            load_access_snapshot(self.employee.id)
+            load_access_snapshot(self.employee.id)
+        self.assertIsNone(cache.get(ACCESS_CACHE_KEY.format(self.employee.id)))
+        self.assertEqual(access_cache_stats.as_dict()['misses'], 0)
@@ -5,15 +5,19 @@ from drf_yasg import openapi
 from rest_framework.decorators import action
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import status, permissions, viewsets, serializers
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from .models import Organization, OrganizationMembership, OrganizationInvite
-from apps.projects.models import ProjectMembership
+from apps.projects.models import Project, ProjectMembership
 from apps.tasks.models import Task
+from .access import get_access_context, invalidate_access_cache
 from .permissions import IsOrganizationAdmin , IsOrganizationAdminOrManager
 from .serializers import OrganizationSerializer , OrganizationInviteSerializer,OrganizationMembershipSerializer
 from django.db import transaction
+from core.conditional import conditional_response, make_etag
+from core.typeahead import TYPEAHEAD_PARAMETERS, parse_typeahead_params, typeahead
 
 
 class OrganizationViewSet(viewsets.ModelViewSet):
@@ -55,22 +59,84 @@ class OrganizationViewSet(viewsets.ModelViewSet):
         """
         organization = get_object_or_404(Organization, pk=pk)
         # Check if the requesting user is an admin or manager in the organization.
-        try:
-            membership = OrganizationMembership.objects.get(
-                organization=organization, user=request.user
-            )
-        except OrganizationMembership.DoesNotExist:
+        role = get_access_context(request).role_in(organization.id)
+        if not role:
             return Response({"detail": "You are not a member of this organization."},
                             status=status.HTTP_403_FORBIDDEN)
 
-        if membership.role not in ['admin', 'manager']:
+        if role not in ['admin', 'manager']:
             return Response({"detail": "Only admins or managers can list organization members."},
                             status=status.HTTP_403_FORBIDDEN)
 
-        members = OrganizationMembership.objects.filter(organization=organization)
-        serializer = OrganizationMembershipSerializer(members, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        def build_response():
+            members = OrganizationMembership.objects.filter(organization=organization)
+            serializer = OrganizationMembershipSerializer(members, many=True)
+            return Response(serializer.data, status=status.HTTP_200_OK)
+
+        return conditional_response(
+            request, make_etag(request, organization.pk, organization.version),
+            organization.changed_at, build_response
+        )
+
+
+    def parse_organization_id(self, pk):
+        """The URL's organization id, checked against the cached access snapshot instead of loaded"""
+        try:
+            return int(pk)
+        except ValueError:
+            raise Http404
+
+    @swagger_auto_schema(
+        operation_description="Members whose name or email starts with (or, from 3 characters, "
+                              "contains) `q`, for assignee pickers. Only organization admins or managers "
+                              "can access this endpoint.",
+        manual_parameters=TYPEAHEAD_PARAMETERS
+    )
+    @action(detail=True, methods=['get'], url_path='members/typeahead')
+    def members_typeahead(self, request, pk=None):
+        text, limit = parse_typeahead_params(request)
+        organization_id = self.parse_organization_id(pk)
+        role = get_access_context(request).role_in(organization_id)
+        if role not in ['admin', 'manager']:
+            return Response({"detail": "Only admins or managers can search organization members."},
+                            status=status.HTTP_403_FORBIDDEN)
+
+        members = OrganizationMembership.objects.filter(organization_id=organization_id).values(
+            'user_id', 'user__full_name', 'user__email', 'role'
+        )
+        matches = typeahead(
+            members, ['user__full_name', 'user__email'], text, limit, ['user__full_name', 'user_id']
+        )
+        return Response([
+            {'id': member['user_id'], 'full_name': member['user__full_name'],
+             'email': member['user__email'], 'role': member['role']}
+            for member in matches
+        ])
 
+    @swagger_auto_schema(
+        operation_description="Tasks whose title starts with (or, from 3 characters, contains) `q`, "
+                              "among the tasks the caller can see in the organization.",
+        manual_parameters=TYPEAHEAD_PARAMETERS
+    )
+    @action(detail=True, methods=['get'], url_path='tasks/typeahead')
+    def tasks_typeahead(self, request, pk=None):
+        text, limit = parse_typeahead_params(request)
+        organization_id = self.parse_organization_id(pk)
+        access = get_access_context(request)
+        if not access.role_in(organization_id):
+            return Response({"detail": "You are not a member of this organization."},
+                            status=status.HTTP_403_FORBIDDEN)
+
+        tasks = Task.objects.filter(organization_id=organization_id)
+        if not access.is_org_admin_or_manager(organization_id):
+            tasks = tasks.filter(project_id__in=access.project_ids)
+        matches = typeahead(
+            tasks.values('id', 'title', 'project_id', 'status'), ['title'], text, limit, ['title', 'id']
+        )
+        return Response([
+            {'id': task['id'], 'title': task['title'], 'project': task['project_id'], 'status': task['status']}
+            for task in matches
+        ])
 
 
 # Swagger parameter for organization
@@ -105,7 +171,7 @@ class OrganizationMemberViewSet(viewsets.ModelViewSet):
         org = get_object_or_404(Organization, pk=org_pk)
 
         # Ensure the requesting user has access
-        if not org.memberships.filter(user=self.request.user, role__in=['admin', 'manager']).exists():
+        if not get_access_context(self.request).is_org_admin_or_manager(org.id):
             return OrganizationMembership.objects.none()
 
         return OrganizationMembership.objects.filter(organization=org).select_related('user', 'organization')
@@ -158,12 +224,15 @@ class OrganizationMemberViewSet(viewsets.ModelViewSet):
             ).delete()
 
             # Clear task assignment for this user in org's projects
-            Task.objects.filter(
-                project__organization=instance.organization,
+            assigned = Task.objects.filter(
+                organization=instance.organization,
                 assigned_to=instance.user
-            ).update(assigned_to=None)
+            )
+            Project.bump_version(*assigned.values_list('project_id', flat=True).distinct())
+            assigned.update(assigned_to=None)
 
             instance.delete()
+            invalidate_access_cache(instance.user_id)
 
     def create(self, request, *args, **kwargs):
         raise serializers.ValidationError(
@@ -188,13 +257,7 @@ class InviteUserView(APIView):
             org = serializer.validated_data['organization']
 
             # Check that the requesting user is an admin of this organization.
-            is_admin = OrganizationMembership.objects.filter(
-                user=request.user,
-                organization=org,
-                role='admin'
-            ).exists()
-
-            if not is_admin:
+            if not get_access_context(request).is_org_admin(org.id):
                 return Response({"detail": "Only organization admins can invite users."},
                                 status=status.HTTP_403_FORBIDDEN)
             
@@ -1,17 +1,48 @@
 from django.db import models
 from apps.users.models import User  
-from apps.organizations.models import Organization
+from apps.organizations.models import Organization, OrganizationMembership
+from core.models import VersionedModel
 
-class Project(models.Model):
+class Project(VersionedModel):
     name = models.CharField(max_length=255)
     description = models.TextField()
     organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name='projects')
     created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_organization_id = instance.__dict__.get('organization_id')
+        return instance
+
+    def save(self, *args, **kwargs):
+        loaded_organization_id = getattr(self, '_loaded_organization_id', None)
+        super().save(*args, **kwargs)
+
+        if loaded_organization_id is not None and loaded_organization_id != self.organization_id:
+            # Tasks and comments carry a denormalized organization id
+            from apps.tasks.models import Comment
+
+            self.tasks.update(organization_id=self.organization_id)
+            Comment.objects.filter(project=self).update(organization_id=self.organization_id)
+        self._loaded_organization_id = self.organization_id
+
+class ProjectMembershipQuerySet(models.QuerySet):
+    def with_roles(self):
+        """Annotate `role`: the member's role in the project's organization (or None)"""
+        return self.annotate(role=models.Subquery(
+            OrganizationMembership.objects.filter(
+                user_id=models.OuterRef('user_id'),
+                organization_id=models.OuterRef('project__organization_id')
+            ).values('role')[:1]
+        ))
+
 class ProjectMembership(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='members')
 
+    objects = ProjectMembershipQuerySet.as_manager()
+
     class Meta:
         unique_together = ('user', 'project')
         
@@ -1,6 +1,5 @@
 from rest_framework import permissions
-from .models import  ProjectMembership
-from apps.organizations.models import OrganizationMembership
+from apps.organizations.access import get_access_context
 
 
 class IsOrgAdminOrManagerForProject(permissions.BasePermission):
@@ -10,22 +9,18 @@ class IsOrgAdminOrManagerForProject(permissions.BasePermission):
 
     def has_object_permission(self, request, view, obj):
         # Object here is a ProjectMembership
-        project = obj.project
-        try:
-            membership = OrganizationMembership.objects.get(user=request.user, organization=project.organization)
-            return membership.role in ['admin', 'manager']
-        except OrganizationMembership.DoesNotExist:
-            return False
+        return get_access_context(request).is_org_admin_or_manager(obj.project.organization_id)
 
 class IsProjectMemberOrOrgAdmin(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
-        # Admin or manager access to the organization
-        try:
-            membership = OrganizationMembership.objects.get(user=request.user, organization=obj.organization)
-            if membership.role in ['admin', 'manager']:
-                return True
-        except OrganizationMembership.DoesNotExist:
+        access = get_access_context(request)
+        role = access.role_in(obj.organization_id)
+        if not role:
             return False
 
+        # Admin or manager access to the organization
+        if role in ['admin', 'manager']:
+            return True
+
         # Employees must be members of the specific project
-        return ProjectMembership.objects.filter(user=request.user, project=obj).exists()
+        return access.is_project_member(obj.id)
@@ -1,10 +1,11 @@
 from rest_framework import serializers
 from .models import   Project, ProjectMembership
 from apps.organizations.models import OrganizationMembership
+from core.fieldsets import SparseFieldsetSerializerMixin
 
 
 
-class ProjectSerializer(serializers.ModelSerializer):
+class ProjectSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Project
         fields = ['id', 'name', 'description', 'organization', 'created_by']
@@ -32,11 +33,10 @@ class ProjectMembershipSerializerDisplay(serializers.ModelSerializer):
         read_only_fields = ['id', 'user', 'project', 'full_name', 'email', 'role']
 
     def get_role(self, obj):
-        try:
-            org_membership = OrganizationMembership.objects.get(
-                user=obj.user,
-                organization=obj.project.organization
-            )
-            return org_membership.role
-        except OrganizationMembership.DoesNotExist:
-            return None
\ No newline at end of file
+        # Annotated by ProjectMembership.objects.with_roles()
+        if hasattr(obj, 'role'):
+            return obj.role
+        return OrganizationMembership.objects.filter(
+            user_id=obj.user_id,
+            organization_id=obj.project.organization_id
+        ).values_list('role', flat=True).first()
\ No newline at end of file
@@ -1,3 +1,265 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from apps.organizations.models import Organization, OrganizationMembership
+from apps.tasks.models import Task, Comment
+from apps.users.models import User
+from .models import Project, ProjectMembership
+
+
+class ProjectBoardTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user('owner@example.com', 'pass', 'Owner')
+        cls.employee = User.objects.create_user('employee@example.com', 'pass', 'Employee')
+        cls.org = Organization.objects.create(name='Org', created_by=cls.owner)
+        OrganizationMembership.objects.create(user=cls.owner, organization=cls.org, role='admin')
+        OrganizationMembership.objects.create(user=cls.employee, organization=cls.org, role='employee')
+        cls.project = Project.objects.create(name='Board', description='', organization=cls.org, created_by=cls.owner)
+        ProjectMembership.objects.create(user=cls.owner, project=cls.project)
+        ProjectMembership.objects.create(user=cls.employee, project=cls.project)
+
+        statuses = [value for value, _ in Task.STATUS_CHOICES]
+        tasks = Task.objects.bulk_create([
+            Task(
+                project=cls.project, organization=cls.org, title=f'Task {i}', description='',
+                status=statuses[i % 3], assigned_to=cls.employee, created_by=cls.owner, order=i
+            )
+            for i in range(1000)
+        ])
+        Comment.objects.bulk_create([
+            Comment(
+                task=task, project=cls.project, organization=cls.org,
+                commented_by=cls.employee, comment_text='Hi'
+            )
+            for task in tasks[:10]
+            for _ in range(2)
+        ])
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.employee)
+
+    def get_board(self):
+        response = self.client.get(f'/api/v1/projects/{self.project.id}/board/')
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_board_contents(self):
+        board = self.get_board()
+
+        self.assertEqual(board['project']['name'], 'Board')
+        self.assertEqual(
+            {(member['email'], member['role']) for member in board['members']},
+            {('owner@example.com', 'admin'), ('employee@example.com', 'employee')},
+        )
+        self.assertEqual([len(board['tasks'][status]) for status in ('pending', 'in_progress', 'completed')], [334, 333, 333])
+        first = board['tasks']['pending'][0]
+        self.assertEqual(first['comment_count'], 2)
+        self.assertEqual(board['tasks']['pending'][-1]['comment_count'], 0)
+        self.assertNotIn('description', first)
+
+    @override_settings(ACCESS_CACHE_ENABLED=True)
+    def test_board_query_count_is_fixed(self):
+        self.get_board()  # warm the access cache
+        # project, members with roles, tasks with comment counts
+        with self.assertNumQueries(3):
+            self.get_board()
+
+    def test_board_requires_membership(self):
+        outsider = User.objects.create_user('outsider@example.com', 'pass', 'Outsider')
+        self.client.force_authenticate(outsider)
+        response = self.client.get(f'/api/v1/projects/{self.project.id}/board/')
+        self.assertEqual(response.status_code, 404)
+
+
+class ProjectMembershipListTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user('owner@example.com', 'pass', 'Owner')
+        cls.org = Organization.objects.create(name='Org', created_by=cls.owner)
+        OrganizationMembership.objects.create(user=cls.owner, organization=cls.org, role='admin')
+        cls.project = Project.objects.create(name='Project', description='', organization=cls.org, created_by=cls.owner)
+        ProjectMembership.objects.create(user=cls.owner, project=cls.project)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def add_members(self, count, role='employee'):
+        users = User.objects.bulk_create([
+            User(email=f'{role}{count}-{i}@example.com', full_name=f'{role} {i}')
+            for i in range(count)
+        ])
+        OrganizationMembership.objects.bulk_create([
+            OrganizationMembership(user=user, organization=self.org, role=role) for user in users
+        ])
+        ProjectMembership.objects.bulk_create([
+            ProjectMembership(user=user, project=self.project) for user in users
+        ])
+
+    def list_members(self):
+        url = f'/api/v1/project-memberships/?project_id={self.project.id}'
+        self.client.get(url)  # warm the access cache
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    @override_settings(ACCESS_CACHE_ENABLED=True)
+    def test_query_count_does_not_grow_with_members(self):
+        self.add_members(3)
+        self.assertEqual(len(self.list_members()), 4)
+
+        self.add_members(300, role='manager')
+        members = self.list_members()
+        self.assertEqual(len(members), 304)
+        self.assertEqual(
+            sorted({member['role'] for member in members}), ['admin', 'employee', 'manager']
+        )
+
+    def test_retrieve_includes_role(self):
+        response = self.client.get(
+            f'/api/v1/project-memberships/{self.owner.id}/?project_id={self.project.id}'
+        )
+        self.assertEqual(response.data['role'], 'admin')
+
+
+class ConditionalGetTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user('owner@example.com', 'pass', 'Owner')
+        cls.employee = User.objects.create_user('employee@example.com', 'pass', 'Employee')
+        cls.org = Organization.objects.create(name='Org', created_by=cls.owner)
+        OrganizationMembership.objects.create(user=cls.owner, organization=cls.org, role='admin')
+        cls.employee_membership = OrganizationMembership.objects.create(
+            user=cls.employee, organization=cls.org, role='employee'
+        )
+        cls.project = Project.objects.create(name='Project', description='', organization=cls.org, created_by=cls.owner)
+        ProjectMembership.objects.create(user=cls.owner, project=cls.project)
+        ProjectMembership.objects.create(user=cls.employee, project=cls.project)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def revalidate(self, url):
+        """Fetch `url`, then return the response to a conditional re-fetch"""
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.has_header('Last-Modified'))
+        return self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+    def test_project_retrieve(self):
+        url = f'/api/v1/projects/{self.project.id}/'
+        self.assertEqual(self.revalidate(url).status_code, 304)
+
+        etag = self.client.get(url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.description = 'Changed'
+            self.project.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['description'], 'Changed')
+
+    def test_stale_save_does_not_roll_back_version(self):
+        stale = Project.objects.get(pk=self.project.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            Task.objects.create(project=self.project, title='Task', created_by=self.owner)
+        version = Project.objects.get(pk=self.project.pk).version
+        with self.captureOnCommitCallbacks(execute=True):
+            stale.save()
+        self.assertEqual(Project.objects.get(pk=self.project.pk).version, version + 1)
+
+    def test_writes_in_one_transaction_bump_once_after_commit(self):
+        version = self.project.version
+        with CaptureQueriesContext(connection) as queries:
+            with self.captureOnCommitCallbacks(execute=True):
+                for i in range(3):
+                    Task.objects.create(project=self.project, title=f'Task {i}', created_by=self.owner)
+                ProjectMembership.objects.filter(user=self.employee).delete()
+                self.assertEqual(Project.objects.get(pk=self.project.pk).version, version)
+        bumps = [q for q in queries if q['sql'].startswith('UPDATE "projects_project"')]
+        self.assertEqual(len(bumps), 1)
+        self.assertEqual(Project.objects.get(pk=self.project.pk).version, version + 1)
+
+    def test_bump_survives_a_rolled_back_savepoint(self):
+        version = self.project.version
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(IntegrityError), transaction.atomic():
+                Task.objects.create(project=self.project, title='Dropped', created_by=self.owner)
+                Project.objects.create(name='Duplicate', pk=self.project.pk, organization=self.org, created_by=self.owner)
+            Task.objects.create(project=self.project, title='Kept', created_by=self.owner)
+        self.assertEqual(Project.objects.get(pk=self.project.pk).version, version + 1)
+
+    @override_settings(ACCESS_CACHE_ENABLED=True)
+    def test_project_members_list(self):
+        url = f'/api/v1/project-memberships/?project_id={self.project.id}'
+        self.client.get(url)  # warm the access cache
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        # Roles live on the organization membership
+        with self.captureOnCommitCallbacks(execute=True):
+            self.employee_membership.role = 'manager'
+            self.employee_membership.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('manager', {member['role'] for member in response.data})
+
+    def test_organization_members(self):
+        url = f'/api/v1/organizations/{self.org.id}/members/'
+        self.assertEqual(self.revalidate(url).status_code, 304)
+
+        etag = self.client.get(url)['ETag']
+        newcomer = User.objects.create_user('new@example.com', 'pass', 'New')
+        with self.captureOnCommitCallbacks(execute=True):
+            OrganizationMembership.objects.create(user=newcomer, organization=self.org, role='employee')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 3)
+
+    def test_member_profile_edits_change_member_list_etags(self):
+        urls = [
+            f'/api/v1/project-memberships/?project_id={self.project.id}',
+            f'/api/v1/organizations/{self.org.id}/members/',
+        ]
+        etags = [self.client.get(url)['ETag'] for url in urls]
+
+        employee = APIClient()
+        employee.force_authenticate(self.employee)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = employee.patch('/api/v1/user/me/', {'full_name': 'Renamed'}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        for url, etag in zip(urls, etags):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+            self.assertIn('Renamed', response.content.decode())
+
+    def test_unrelated_user_saves_keep_member_list_etags(self):
+        url = f'/api/v1/organizations/{self.org.id}/members/'
+        etag = self.client.get(url)['ETag']
+        employee = User.objects.get(pk=self.employee.pk)
+        employee.bio = 'Hello'
+        with self.captureOnCommitCallbacks(execute=True):
+            employee.save()
+            employee.save(update_fields=['last_login'])
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_etag_is_per_user(self):
+        url = f'/api/v1/projects/{self.project.id}/'
+        etag = self.client.get(url)['ETag']
+        self.client.force_authenticate(self.employee)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
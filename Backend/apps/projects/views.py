@@ -7,17 +7,31 @@ from rest_framework.response import Response
 from rest_framework.exceptions import PermissionDenied
 from .models import  Project, ProjectMembership,User
 from apps.tasks.models import Task
+from apps.tasks.serializers import TaskBoardSerializer
 
+from apps.organizations.access import get_access_context, invalidate_access_cache
 from apps.organizations.models import Organization, OrganizationMembership
 from .permissions import  IsProjectMemberOrOrgAdmin, IsOrgAdminOrManagerForProject
 from .serializers import ProjectSerializer,AddProjectMemberSerializer,ProjectMembershipSerializerDisplay
 from django.db import transaction
+from django.db.models import Count
 from django.core.exceptions import ValidationError
 from rest_framework.exceptions import NotFound, MethodNotAllowed
+from core.conditional import conditional_response, make_etag
+from core.fieldsets import SPARSE_FIELDSET_PARAMETERS, SparseFieldsetMixin
 
-class ProjectViewSet(viewsets.ModelViewSet):
+class ProjectViewSet(SparseFieldsetMixin, viewsets.ModelViewSet):
     serializer_class = ProjectSerializer
     permission_classes = [permissions.IsAuthenticated, IsProjectMemberOrOrgAdmin]
+    sparse_fieldset_actions = ('retrieve', 'filter_by_Organization')
+    sparse_required_fields = ('id', 'organization', 'version', 'changed_at')
+
+    def retrieve(self, request, *args, **kwargs):
+        project = self.get_object()
+        return conditional_response(
+            request, make_etag(request, project.pk, project.version), project.changed_at,
+            lambda: Response(self.get_serializer(project).data)
+        )
     
     @swagger_auto_schema(auto_schema=None)
     def list(self, request, *args, **kwargs):
@@ -35,7 +49,7 @@ class ProjectViewSet(viewsets.ModelViewSet):
     @swagger_auto_schema(
         manual_parameters=[
             openapi.Parameter('organization_id', openapi.IN_QUERY, description="ID of the organization", type=openapi.TYPE_INTEGER)
-        ]
+        ] + SPARSE_FIELDSET_PARAMETERS
     )
     def filter_by_Organization(self, request): 
         user = request.user
@@ -44,26 +58,23 @@ class ProjectViewSet(viewsets.ModelViewSet):
             return Response([], status=200)
 
         try:
-            membership = OrganizationMembership.objects.get(user=user, organization_id=org_id)
-        except OrganizationMembership.DoesNotExist:
+            role = get_access_context(request).role_in(int(org_id))
+        except (TypeError, ValueError):
+            role = None
+        if not role:
             return Response([], status=200)
-        if membership.role in ['admin', 'manager']:
+        if role in ['admin', 'manager']:
             projects = Project.objects.filter(organization_id=org_id)
         else:
             projects = Project.objects.filter(organization_id=org_id, members__user=user).distinct()
 
-        serializer = self.get_serializer(projects, many=True)
+        serializer = self.get_serializer(self.narrow_queryset(projects), many=True)
         return Response(serializer.data, status=200)
 
     def perform_create(self, serializer):
         org = serializer.validated_data['organization']
-        membership = OrganizationMembership.objects.filter(
-            user=self.request.user, 
-            organization=org, 
-            role__in=['admin', 'manager']
-        )
         
-        if not membership.exists():
+        if not get_access_context(self.request).is_org_admin_or_manager(org.id):
             raise PermissionDenied("Only admins/managers can create projects.")
             
         # Save the project first
@@ -84,8 +95,11 @@ class ProjectViewSet(viewsets.ModelViewSet):
             for member in admin_managers
         ]
         
-        # Bulk create the memberships
+        # Bulk create the memberships (bulk_create skips post_save, so drop
+        # the cached access snapshots and bump the version by hand)
         ProjectMembership.objects.bulk_create(project_memberships)
+        invalidate_access_cache(*[member.user_id for member in admin_managers])
+        Project.bump_version(project.id)
         
         # Also ensure the creator is added if they weren't already an admin/manager
         if not ProjectMembership.objects.filter(user=self.request.user, project=project).exists():
@@ -122,16 +136,57 @@ class ProjectViewSet(viewsets.ModelViewSet):
 
         if not project.organization.memberships.filter(user=target_user).exists():
             return Response({"detail": "The user is not a member of the project's organization."}, status=status.HTTP_400_BAD_REQUEST)
-        try:
-            requester_membership = OrganizationMembership.objects.get(user=request.user, organization=project.organization)
-        except OrganizationMembership.DoesNotExist:
+        requester_role = get_access_context(request).role_in(project.organization_id)
+        if not requester_role:
             return Response({"detail": "You are not a member of this organization."}, status=status.HTTP_403_FORBIDDEN)
 
-        if requester_membership.role not in ['admin', 'manager']:
+        if requester_role not in ['admin', 'manager']:
             return Response({"detail": "Only admins or managers can assign users to projects."}, status=status.HTTP_403_FORBIDDEN)
 
         ProjectMembership.objects.create(user=target_user, project=project)
         return Response({"detail": "User assigned to project successfully."}, status=status.HTTP_201_CREATED)
+
+    @swagger_auto_schema(
+        responses={200: "Project, members with roles and tasks grouped by status with comment counts"}
+    )
+    @action(detail=True, methods=['get'])
+    def board(self, request, pk=None):
+        """
+        Everything the project board needs in one response, built with a
+        fixed number of queries (project, members, tasks) whatever its size.
+        """
+        project = self.get_object()
+
+        members = (
+            ProjectMembership.objects.filter(project=project)
+            .with_roles()
+            .order_by('user__full_name', 'user_id')
+            .values('user_id', 'user__full_name', 'user__email', 'role')
+        )
+
+        tasks = {value: [] for value, _ in Task.STATUS_CHOICES}
+        cards = (
+            Task.objects.filter(project=project)
+            .order_by('order', 'id')
+            .values(*TaskBoardSerializer.Meta.fields)
+            .annotate(comment_count=Count('comments'))
+        )
+        for card in cards:
+            tasks.setdefault(card['status'], []).append(card)
+
+        return Response({
+            'project': ProjectSerializer(project).data,
+            'members': [
+                {
+                    'user': member['user_id'],
+                    'full_name': member['user__full_name'],
+                    'email': member['user__email'],
+                    'role': member['role']
+                }
+                for member in members
+            ],
+            'tasks': tasks
+        })
     
 
 # Define the Swagger query parameter globally
@@ -150,26 +205,37 @@ class ProjectMembershipViewSet(viewsets.ModelViewSet):
     lookup_field = 'user__id'
     lookup_url_kwarg = 'user_id'
 
+    def get_project(self):
+        """The `project_id` project with the organization's version columns (404 if missing)"""
+        if not hasattr(self, '_project'):
+            self._project = get_object_or_404(
+                Project.objects.select_related('organization').only(
+                    'id', 'organization_id', 'version', 'changed_at',
+                    'organization__version', 'organization__changed_at'
+                ),
+                pk=self.request.query_params.get('project_id')
+            )
+        return self._project
+
     def get_queryset(self):
         project_id = self.request.query_params.get('project_id')
         if not project_id:
             return ProjectMembership.objects.none()
 
-        project = get_object_or_404(Project, pk=project_id)
+        project = self.get_project()
 
-        try:
-            org_membership = OrganizationMembership.objects.get(
-                user=self.request.user,
-                organization=project.organization
-            )
-        except OrganizationMembership.DoesNotExist:
+        access = get_access_context(self.request)
+        role = access.role_in(project.organization_id)
+        if not role:
             return ProjectMembership.objects.none()
 
-        if org_membership.role in ['admin', 'manager']:
-            return ProjectMembership.objects.filter(project=project).select_related('user', 'project')
-
-        if ProjectMembership.objects.filter(user=self.request.user, project=project).exists():
-            return ProjectMembership.objects.filter(project=project).select_related('user', 'project')
+        if role in ['admin', 'manager'] or access.is_project_member(project.id):
+            # Roles come from a subquery instead of one lookup per member
+            return (
+                ProjectMembership.objects.filter(project=project)
+                .select_related('user')
+                .with_roles()
+            )
 
         return ProjectMembership.objects.none()
 
@@ -179,7 +245,18 @@ class ProjectMembershipViewSet(viewsets.ModelViewSet):
         List members of a project. Only project members can see this.
         Admins/Managers can see any project's members.
         """
-        return super().list(request, *args, **kwargs)
+        if not request.query_params.get('project_id'):
+            return super().list(request, *args, **kwargs)
+
+        # Member roles come from the organization, so both versions count
+        project = self.get_project()
+        organization = project.organization
+        return conditional_response(
+            request,
+            make_etag(request, project.version, organization.version),
+            max(project.changed_at, organization.changed_at),
+            lambda: super(ProjectMembershipViewSet, self).list(request, *args, **kwargs)
+        )
 
     @swagger_auto_schema(manual_parameters=[project_param])
     def retrieve(self, request, *args, **kwargs):
@@ -200,7 +277,7 @@ class ProjectMembershipViewSet(viewsets.ModelViewSet):
             raise ValidationError("Project ID is required.")
 
         try:
-            return ProjectMembership.objects.select_related('project', 'user').get(
+            return ProjectMembership.objects.select_related('project', 'user').with_roles().get(
                 user__id=user_id,
                 project__id=project_id
             )
@@ -227,6 +304,7 @@ class ProjectMembershipViewSet(viewsets.ModelViewSet):
                 assigned_to=instance.user
             ).update(assigned_to=None)
             instance.delete()
+            invalidate_access_cache(instance.user_id)
 
     def create(self, request, *args, **kwargs):
         raise serializers.ValidationError(
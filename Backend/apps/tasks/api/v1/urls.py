@@ -9,5 +9,5 @@ router.register(r'tasks', views.TaskViewSet, basename='task')
 router.register(r'comments', views.CommentViewSet, basename='comment')
 
 urlpatterns = [
-   
+    path('search/', views.SearchView.as_view(), name='search'),
 ] + router.urls
\ No newline at end of file
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from apps.tasks.models import Task
+from apps.tasks.ordering import rebalance_column
+
+
+class Command(BaseCommand):
+    help = "Renumber Kanban columns so every card has room for future moves."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--project', type=int, help="Only rebalance this project's columns")
+
+    def handle(self, *args, **options):
+        columns = Task.objects.order_by().values_list('project_id', 'status').distinct()
+        if options['project']:
+            columns = columns.filter(project_id=options['project'])
+        columns = list(columns)
+
+        rewritten = 0
+        for project_id, status in columns:
+            with transaction.atomic():
+                rewritten += rebalance_column(project_id, status)
+
+        self.stdout.write(self.style.SUCCESS(f"Rebalanced {len(columns)} columns, rewrote {rewritten} tasks."))
@@ -0,0 +1,33 @@
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_organization(apps, schema_editor):
+    Project = apps.get_model('projects', 'Project')
+    Task = apps.get_model('tasks', 'Task')
+    Comment = apps.get_model('tasks', 'Comment')
+
+    Task.objects.update(
+        organization_id=Subquery(
+            Project.objects.filter(pk=OuterRef('project_id')).values('organization_id')[:1]
+        )
+    )
+    task_row = Task.objects.filter(pk=OuterRef('task_id'))
+    Comment.objects.update(
+        project_id=Subquery(task_row.values('project_id')[:1]),
+        organization_id=Subquery(task_row.values('organization_id')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+    # A migration of its own: on PostgreSQL the new foreign keys are
+    # DEFERRABLE INITIALLY DEFERRED, so the updated rows leave pending trigger
+    # events that would make an ALTER TABLE in the same transaction fail
+
+    dependencies = [
+        ('tasks', '0003_denormalize_organization'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_organization, migrations.RunPython.noop),
+    ]
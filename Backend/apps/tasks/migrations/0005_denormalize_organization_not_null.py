@@ -0,0 +1,35 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0004_denormalize_organization_backfill'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='task',
+            name='organization',
+            field=models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='tasks', to='organizations.organization'),
+        ),
+        migrations.AlterField(
+            model_name='comment',
+            name='project',
+            field=models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='task_comments', to='projects.project'),
+        ),
+        migrations.AlterField(
+            model_name='comment',
+            name='organization',
+            field=models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='task_comments', to='organizations.organization'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['project', 'status', 'order'], name='tasks_task_project_c4aa74_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['organization', 'assigned_to'], name='tasks_task_organiz_eadc48_idx'),
+        ),
+    ]
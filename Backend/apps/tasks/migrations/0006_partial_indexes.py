@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:38
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizations', '0002_organization_version'),
+        ('projects', '0002_project_version'),
+        ('tasks', '0005_denormalize_organization_not_null'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('status', 'completed'), _negated=True), fields=['assigned_to', 'due_date'], name='task_open_assignee_due_idx'),
+        ),
+    ]
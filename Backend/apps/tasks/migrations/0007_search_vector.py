@@ -0,0 +1,101 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:41
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations
+
+
+# (table, trigger columns, tsvector expression over NEW)
+SEARCH_VECTORS = [
+    (
+        'tasks_task', 'title, description',
+        "setweight(to_tsvector('english', coalesce({row}title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce({row}description, '')), 'B')",
+    ),
+    (
+        'tasks_comment', 'comment_text',
+        "setweight(to_tsvector('english', coalesce({row}comment_text, '')), 'B')",
+    ),
+]
+GIN_INDEXES = [
+    ('task_search_vector_idx', 'tasks_task'),
+    ('comment_search_vector_idx', 'tasks_comment'),
+]
+
+
+def create_search_triggers(apps, schema_editor):
+    """
+    PostgreSQL only: keep search_vector in step with the text columns from a
+    trigger (so bulk writes and .update() are covered), backfill it and add
+    the GIN indexes. Other databases fall back to in-process search.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table, columns, expression in SEARCH_VECTORS:
+        schema_editor.execute(f"""
+            CREATE FUNCTION {table}_search_vector_update() RETURNS trigger LANGUAGE plpgsql AS $$
+            BEGIN
+                NEW.search_vector := {expression.format(row='NEW.')};
+                RETURN NEW;
+            END
+            $$
+        """)
+        schema_editor.execute(
+            f"CREATE TRIGGER {table}_search_vector_update "
+            f"BEFORE INSERT OR UPDATE OF {columns} ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION {table}_search_vector_update()"
+        )
+        schema_editor.execute(f"UPDATE {table} SET search_vector = {expression.format(row='')}")
+    for name, table in GIN_INDEXES:
+        schema_editor.execute(f"CREATE INDEX {name} ON {table} USING gin (search_vector)")
+
+
+def drop_search_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _ in GIN_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+    for table, _, _ in SEARCH_VECTORS:
+        schema_editor.execute(f"DROP TRIGGER IF EXISTS {table}_search_vector_update ON {table}")
+        schema_editor.execute(f"DROP FUNCTION IF EXISTS {table}_search_vector_update()")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizations', '0002_organization_version'),
+        ('projects', '0002_project_version'),
+        ('tasks', '0006_partial_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        # GIN indexes are PostgreSQL-only, so the database side is done by
+        # create_search_triggers
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='comment',
+                    index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='comment_search_vector_idx'),
+                ),
+                migrations.AddIndex(
+                    model_name='task',
+                    index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='task_search_vector_idx'),
+                ),
+            ],
+            database_operations=[
+                migrations.RunPython(create_search_triggers, drop_search_triggers),
+            ],
+        ),
+    ]
@@ -1,6 +1,27 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models.functions import Upper
 from apps.users.models import User
+from apps.organizations.models import Organization
 from apps.projects.models import Project
+
+
+class SearchVectorDeferringManager(models.Manager):
+    """
+    Leaves `search_vector` out of ordinary loads: only search reads it, and
+    on PostgreSQL it is about as large as the text it indexes.
+    """
+    def get_queryset(self):
+        return super().get_queryset().defer('search_vector')
+
+
+class TaskQuerySet(models.QuerySet):
+    def open(self):
+        """Tasks that are not completed (see the task_open_assignee_due_idx partial index and TaskViewSet.due)"""
+        return self.exclude(status='completed')
+
+
 class Task(models.Model):
     STATUS_CHOICES = (
         ('pending', 'Pending'),
@@ -15,6 +36,8 @@ class Task(models.Model):
     )
 
     project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='tasks')
+    # Denormalized from project.organization so org-scoped queries stay on one table
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name='tasks', editable=False)
     title = models.CharField(max_length=255)
     description = models.TextField(blank=True)
     assigned_to = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
@@ -32,12 +55,112 @@ class Task(models.Model):
     priority = models.CharField(max_length=20, choices=PRIORITY_CHOICES, default='medium')
     order = models.PositiveIntegerField(default=0)
 
+    # Title (weight A) and description (weight B) for full-text search.
+    # Maintained by a database trigger on PostgreSQL (see search.py); unused
+    # elsewhere.
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = SearchVectorDeferringManager.from_queryset(TaskQuerySet)()
+
+    # Field values remembered at load time so saves can detect changes
+    # without re-reading the row
+    TRACKED_FIELDS = ('project_id', 'status')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['project', 'order', 'id']),
+            models.Index(fields=['project', 'status', 'order']),
+            models.Index(fields=['organization', 'assigned_to']),
+            # Someone's open work by due date; completed tasks pile up and are
+            # never looked up this way
+            models.Index(
+                fields=['assigned_to', 'due_date'],
+                condition=~models.Q(status='completed'),
+                name='task_open_assignee_due_idx'
+            ),
+            GinIndex(fields=['search_vector'], name='task_search_vector_idx'),
+            # Title typeahead within an organization (PostgreSQL-only, see
+            # migration 0006)
+            models.Index(
+                'organization', OpClass(Upper('title'), name='text_pattern_ops'),
+                name='task_title_prefix_idx'
+            ),
+            GinIndex(OpClass(Upper('title'), name='gin_trgm_ops'), name='task_title_trgm_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_loaded_values()
+        return instance
+
+    def _remember_loaded_values(self):
+        self._loaded_values = {field: self.__dict__.get(field) for field in self.TRACKED_FIELDS}
+
+    def loaded_value(self, field):
+        """
+        Value of a tracked field when the task was loaded or last saved,
+        or None for unsaved tasks and fields deferred at load time.
+        """
+        return getattr(self, '_loaded_values', {}).get(field)
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        loaded_project_id = self.loaded_value('project_id')
+        moved = self.pk is not None and loaded_project_id is not None and loaded_project_id != self.project_id
+
+        if self.organization_id is None or moved:
+            self.organization_id = self.project.organization_id
+            if update_fields is not None and 'organization' not in update_fields:
+                kwargs['update_fields'] = {*update_fields, 'organization'}
+
+        super().save(*args, **kwargs)
+
+        if moved:
+            # Keep the comments' denormalized project/organization in step
+            self.comments.update(project_id=self.project_id, organization_id=self.organization_id)
+        # Invalidates conditional GETs (ETags) for the project's tasks
+        Project.bump_version(self.project_id, loaded_project_id)
+        self._remember_loaded_values()
+
+    def delete(self, *args, **kwargs):
+        project_id = self.project_id
+        result = super().delete(*args, **kwargs)
+        Project.bump_version(project_id)
+        return result
+
 
 
 
 class Comment(models.Model):
     task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='comments')
+    # Denormalized from task.project / task.organization, maintained by Task.save()
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='task_comments', editable=False)
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name='task_comments', editable=False)
     commented_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='comments')
     comment_text = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # comment_text for full-text search, maintained like Task.search_vector
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = SearchVectorDeferringManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['task', 'created_at', 'id']),
+            GinIndex(fields=['search_vector'], name='comment_search_vector_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.project_id is None or self.organization_id is None:
+            self.project_id = self.task.project_id
+            self.organization_id = self.task.organization_id
+        super().save(*args, **kwargs)
+        Project.bump_version(self.project_id)
+
+    def delete(self, *args, **kwargs):
+        project_id = self.project_id
+        result = super().delete(*args, **kwargs)
+        Project.bump_version(project_id)
+        return result
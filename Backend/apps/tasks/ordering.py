@@ -0,0 +1,107 @@
+from django.db.models import Q
+
+from apps.projects.models import Project
+from .models import Task
+
+
+# Distance between neighbouring cards after a rebalance. Moving a card takes
+# the midpoint of its new neighbours, so a column absorbs about log2(ORDER_GAP)
+# moves into the same slot before it has to be renumbered.
+ORDER_GAP = 1024
+
+# Task.order is a PositiveIntegerField, a 32-bit integer column on PostgreSQL
+MAX_ORDER = 2 ** 31 - 1
+
+
+def column_queryset(project_id, status):
+    return Task.objects.filter(project_id=project_id, status=status)
+
+
+def rebalance_column(project_id, status, insert=None, position=None):
+    """
+    Renumber a Kanban column as ORDER_GAP, 2 * ORDER_GAP, ...
+
+    If `insert` is given it is placed at index `position` of the column
+    (excluding itself); its new order is set on the instance but it is not
+    saved so the caller can save it along with its other changes.
+    Returns the number of other rows that were rewritten.
+    """
+    tasks = list(
+        column_queryset(project_id, status)
+        .exclude(pk=getattr(insert, 'pk', None))
+        .select_for_update()
+        .order_by('order', 'id')
+        .only('id', 'order')
+    )
+    if insert is not None:
+        tasks.insert(len(tasks) if position is None else position, insert)
+
+    changed = []
+    for index, task in enumerate(tasks, start=1):
+        new_order = index * ORDER_GAP
+        if task.order != new_order:
+            task.order = new_order
+            if task is not insert:
+                changed.append(task)
+
+    if changed:
+        Task.objects.bulk_update(changed, ['order'], batch_size=500)
+        Project.bump_version(project_id)
+    return len(changed)
+
+
+def _neighbour(queryset, task, after):
+    """The card directly after (or before) `task` in (order, id) order."""
+    if after:
+        queryset = queryset.filter(
+            Q(order__gt=task.order) | Q(order=task.order, id__gt=task.id)
+        ).order_by('order', 'id')
+    else:
+        queryset = queryset.filter(
+            Q(order__lt=task.order) | Q(order=task.order, id__lt=task.id)
+        ).order_by('-order', '-id')
+    return queryset.only('id', 'order').first()
+
+
+def place_task(task, status, before=None, after=None):
+    """
+    Give `task` an order key that puts it in column `status` between `after`
+    (the card above) and `before` (the card below). With neither it goes to
+    the bottom of the column.
+
+    Normally only `task` changes; when there is no integer gap left between
+    the neighbours, or appending would pass MAX_ORDER, the column is
+    rebalanced first. The instance is updated
+    but not saved.
+    """
+    column = column_queryset(task.project_id, status).exclude(pk=task.pk)
+
+    if after is not None and before is None:
+        before = _neighbour(column, after, after=True)
+    elif before is not None and after is None:
+        after = _neighbour(column, before, after=False)
+    elif before is None and after is None:
+        after = column.order_by('-order', '-id').only('id', 'order').first()
+
+    low = after.order if after is not None else None
+    high = before.order if before is not None else None
+
+    task.status = status
+    if low is None and high is None:
+        task.order = ORDER_GAP
+    elif high is None and low + ORDER_GAP <= MAX_ORDER:
+        task.order = low + ORDER_GAP
+    elif low is None and high > 0:
+        task.order = high // 2
+    elif low is not None and high is not None and high - low >= 2:
+        task.order = (low + high) // 2
+    else:
+        # Out of gaps, or of room below `after`: renumber the column and drop
+        # the task in after `after`
+        position = 0
+        if after is not None:
+            position = column.filter(
+                Q(order__lt=after.order) | Q(order=after.order, id__lte=after.id)
+            ).count()
+        rebalance_column(task.project_id, status, insert=task, position=position)
+    return task
@@ -1,5 +1,5 @@
 from rest_framework import permissions
-from apps.organizations.models import OrganizationMembership
+from apps.organizations.access import get_access_context
 from apps.projects.models import ProjectMembership
 from django.core.exceptions import PermissionDenied
 from .models import Project
@@ -32,41 +32,22 @@ class CanCommentOnTask(permissions.BasePermission):
                 return False
 
             try:
-                task = Task.objects.select_related('project__organization').get(id=task_id)
+                task = Task.objects.only('project_id', 'organization_id').get(id=task_id)
             except Task.DoesNotExist:
                 return False
 
-            organization = task.project.organization
+            access = get_access_context(request)
+            role = access.role_in(task.organization_id)
 
-            # Check if user is org admin/manager - can comment on any task in their org
-            is_org_admin_manager = OrganizationMembership.objects.filter(
-                organization=organization,
-                user=user,
-                role__in=['admin', 'manager']
-            ).exists()
-            
-            if is_org_admin_manager:
+            # Org admin/manager can comment on any task in their org
+            if role in ['admin', 'manager']:
                 return True
 
-            # Check if user is org employee AND project member
-            try:
-                org_membership = OrganizationMembership.objects.get(
-                    organization=organization,
-                    user=user
-                )
-                
-                # Must be an employee (not admin/manager for this path)
-                if org_membership.role == 'employee':
-                    # Check if user is a member of this specific project
-                    is_project_member = ProjectMembership.objects.filter(
-                        project=task.project,
-                        user=user
-                    ).exists()
-                    
-                    return is_project_member
-                    
-            except OrganizationMembership.DoesNotExist:
-                return False
+            # Org employee must also be a member of this specific project
+            if role == 'employee':
+                return access.is_project_member(task.project_id)
+
+            return False
 
         # For PUT, PATCH, DELETE - will be handled by has_object_permission
         return True
@@ -77,62 +58,28 @@ class CanCommentOnTask(permissions.BasePermission):
         if not user.is_authenticated:
             return False
 
-        organization = obj.task.project.organization
+        access = get_access_context(request)
+        role = access.role_in(obj.organization_id)
 
-        # Check if user is org admin/manager - full permissions
-        is_org_admin_manager = OrganizationMembership.objects.filter(
-            organization=organization,
-            user=user,
-            role__in=['admin', 'manager']
-        ).exists()
-        
-        if is_org_admin_manager:
+        # Not an org member - no permissions
+        if not role:
+            return False
+
+        # Org admin/manager - full permissions
+        if role in ['admin', 'manager']:
             return True
 
+        # Remaining org members must belong to the task's project
+        is_project_member = access.is_project_member(obj.project_id)
+
         # For safe methods (GET, HEAD, OPTIONS)
         if request.method in permissions.SAFE_METHODS:
-            # Check if user is org member AND project member
-            try:
-                org_membership = OrganizationMembership.objects.get(
-                    organization=organization,
-                    user=user
-                )
-                
-                is_project_member = ProjectMembership.objects.filter(
-                    project=obj.task.project,
-                    user=user
-                ).exists()
-                
-                return is_project_member
-                
-            except OrganizationMembership.DoesNotExist:
-                return False
+            return is_project_member
 
-        # For modification methods (PUT, PATCH, DELETE)
+        # For modification methods (PUT, PATCH, DELETE) employees may only
+        # touch their own comments
         if request.method in ['PUT', 'PATCH', 'DELETE']:
-            # Only org employees can modify comments, and only their own
-            try:
-                org_membership = OrganizationMembership.objects.get(
-                    organization=organization,
-                    user=user
-                )
-                
-                # Must be project member
-                is_project_member = ProjectMembership.objects.filter(
-                    project=obj.task.project,
-                    user=user
-                ).exists()
-                
-                # Must be the comment owner (for employees)
-                if org_membership.role == 'employee':
-                    is_comment_owner = obj.commented_by == user
-                    return is_project_member and is_comment_owner
-                
-                # This shouldn't happen as admins/managers are handled above
-                return False
-                
-            except OrganizationMembership.DoesNotExist:
-                return False
+            return is_project_member and obj.commented_by_id == user.id
 
         return False
 
@@ -145,8 +92,8 @@ class IsTaskEditable(permissions.BasePermission):
     """
 
     def has_permission(self, request, view):
-        # Special case for the custom status update endpoint
-        if view.action == 'update_status':
+        # Special case for the custom status update and move endpoints
+        if view.action in ['update_status', 'move']:
             return True
             
         if request.method in permissions.SAFE_METHODS:
@@ -157,37 +104,27 @@ class IsTaskEditable(permissions.BasePermission):
             if not project_id:
                 return False
             try:
-                project = Project.objects.get(id=project_id)
+                organization_id = Project.objects.values_list(
+                    'organization_id', flat=True
+                ).get(id=project_id)
             except Project.DoesNotExist:
                 return False
-            try:
-                membership = OrganizationMembership.objects.get(
-                    user=request.user,
-                    organization=project.organization
-                )
-            except OrganizationMembership.DoesNotExist:
-                return False
-            return membership.role in ['admin', 'manager']
+            return get_access_context(request).is_org_admin_or_manager(organization_id)
 
         return True
 
     def has_object_permission(self, request, view, obj):
-        # Special case for the custom status update endpoint
-        if view.action == 'update_status':
+        # Special case for the custom status update and move endpoints
+        if view.action in ['update_status', 'move']:
             return True
             
         if request.method in permissions.SAFE_METHODS:
             return True
 
         # For regular updates and deletes, only admins/managers can do it
-        try:
-            membership = OrganizationMembership.objects.get(
-                user=request.user,
-                organization=obj.project.organization
-            )
-            is_admin_or_manager = membership.role in ['admin', 'manager']
-        except OrganizationMembership.DoesNotExist:
-            is_admin_or_manager = False
+        is_admin_or_manager = get_access_context(request).is_org_admin_or_manager(
+            obj.organization_id
+        )
 
         # If updating, check the assigned_to validation for admins/managers
         if request.method in ['PUT', 'PATCH'] and is_admin_or_manager:
@@ -199,7 +136,7 @@ class IsTaskEditable(permissions.BasePermission):
                 except (ValueError, TypeError):
                     raise PermissionDenied("Invalid assigned user id.")
                 # Check that the new assigned user is a member of this project.
-                if not ProjectMembership.objects.filter(user_id=new_assigned_id, project=obj.project).exists():
+                if not ProjectMembership.objects.filter(user_id=new_assigned_id, project_id=obj.project_id).exists():
                     raise PermissionDenied("The assigned user is not a member of the project.")
 
         return is_admin_or_manager
@@ -0,0 +1,168 @@
+"""
+Full-text search over task titles/descriptions and comments.
+
+On PostgreSQL both tables carry a `search_vector` column that a trigger keeps
+in step with the text (migration 0005) and a GIN index; matches come from
+`search_vector @@ websearch_to_tsquery(...)` ranked with ts_rank. Other
+databases (SQLite test runs) fall back to an in-process inverted index over
+the caller's visible rows, ranked by weighted term counts.
+
+Results from both tables are merged in (-rank, type, id) order and paged
+with a keyset cursor over those three values.
+"""
+import re
+from collections import defaultdict
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import F, FloatField, Q
+from django.db.models.functions import Cast
+
+from core.pagination import decode_cursor_values, encode_cursor
+
+
+SEARCH_CONFIG = 'english'
+SNIPPET_LENGTH = 200
+
+# ts_rank's default weights for the A/B labels used by the triggers
+TITLE_WEIGHT = 1.0
+TEXT_WEIGHT = 0.4
+
+TASK = 'task'
+COMMENT = 'comment'
+RESULT_TYPES = (COMMENT, TASK)
+
+TOKEN = re.compile(r'\w+')
+
+
+def tokenize(text):
+    return TOKEN.findall(text.lower())
+
+
+def decode_search_cursor(token):
+    """(rank, type, id) from a cursor; raises ValueError if malformed"""
+    raw = decode_cursor_values(token)
+    if len(raw) != 3:
+        raise ValueError('Invalid cursor')
+    rank, result_type, pk = raw
+    if (
+        not isinstance(rank, (int, float)) or isinstance(rank, bool)
+        or result_type not in RESULT_TYPES
+        or not isinstance(pk, int) or isinstance(pk, bool)
+    ):
+        raise ValueError('Invalid cursor')
+    return float(rank), result_type, pk
+
+
+def _after(position, result_type):
+    """Q for rows of `result_type` after `position` in (-rank, type, id) order"""
+    rank, position_type, pk = position
+    if result_type > position_type:
+        return Q(rank__lte=rank)
+    if result_type < position_type:
+        return Q(rank__lt=rank)
+    return Q(rank__lt=rank) | Q(rank=rank, id__gt=pk)
+
+
+def _is_after(hit, position):
+    rank, result_type, pk = position
+    return (-hit['rank'], hit['type'], hit['id']) > (-rank, result_type, pk)
+
+
+def _task_hit(row, rank):
+    return {
+        'type': TASK, 'id': row['id'], 'task': row['id'], 'project': row['project_id'],
+        'title': row['title'], 'text': row['description'][:SNIPPET_LENGTH], 'rank': rank,
+    }
+
+
+def _comment_hit(row, rank):
+    return {
+        'type': COMMENT, 'id': row['id'], 'task': row['task_id'], 'project': row['project_id'],
+        'title': row['task__title'], 'text': row['comment_text'][:SNIPPET_LENGTH], 'rank': rank,
+    }
+
+
+TASK_COLUMNS = ('id', 'project_id', 'title', 'description')
+COMMENT_COLUMNS = ('id', 'task_id', 'project_id', 'task__title', 'comment_text')
+
+
+def _postgres_hits(text, tasks, comments, position, limit):
+    query = SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+    hits = []
+    for result_type, queryset, columns, build in (
+        (TASK, tasks, TASK_COLUMNS, _task_hit),
+        (COMMENT, comments, COMMENT_COLUMNS, _comment_hit),
+    ):
+        if queryset is None:
+            continue
+        # ts_rank is a float4; as a double it round-trips exactly through the cursor
+        queryset = queryset.filter(search_vector=query).annotate(
+            rank=Cast(SearchRank(F('search_vector'), query), FloatField())
+        )
+        if position is not None:
+            queryset = queryset.filter(_after(position, result_type))
+        rows = queryset.order_by('-rank', 'id').values(*columns, 'rank')[:limit]
+        hits.extend(build(row, row['rank']) for row in rows)
+    return hits
+
+
+class InvertedIndex:
+    """Term -> {document key: weighted count} postings built in memory"""
+
+    def __init__(self):
+        self.postings = defaultdict(lambda: defaultdict(float))
+
+    def add(self, key, *weighted_texts):
+        for text, weight in weighted_texts:
+            for term in tokenize(text):
+                self.postings[term][key] += weight
+
+    def search(self, terms):
+        """{key: score} for the documents containing every term"""
+        if not terms:
+            return {}
+        postings = [self.postings.get(term, {}) for term in set(terms)]
+        matches = set.intersection(*(set(posting) for posting in postings))
+        return {key: sum(posting[key] for posting in postings) for key in matches}
+
+
+def _fallback_hits(text, tasks, comments, position, limit):
+    index = InvertedIndex()
+    rows = {}
+    if tasks is not None:
+        for row in tasks.values(*TASK_COLUMNS):
+            rows[TASK, row['id']] = row
+            index.add((TASK, row['id']), (row['title'], TITLE_WEIGHT), (row['description'], TEXT_WEIGHT))
+    if comments is not None:
+        for row in comments.values(*COMMENT_COLUMNS):
+            rows[COMMENT, row['id']] = row
+            index.add((COMMENT, row['id']), (row['comment_text'], TEXT_WEIGHT))
+
+    hits = [
+        (_task_hit if key[0] == TASK else _comment_hit)(rows[key], score)
+        for key, score in index.search(tokenize(text)).items()
+    ]
+    if position is not None:
+        hits = [hit for hit in hits if _is_after(hit, position)]
+    return hits
+
+
+def search(text, tasks, comments, page_size, cursor=None):
+    """
+    Return (hits, next_cursor) for one page of matches for `text` among the
+    `tasks` and `comments` querysets (None skips that type). Each hit is a
+    dict with type, id, task, project, title, text and rank.
+    Raises ValueError for a malformed cursor.
+    """
+    position = decode_search_cursor(cursor) if cursor else None
+    find = _postgres_hits if connection.vendor == 'postgresql' else _fallback_hits
+    hits = find(text, tasks, comments, position, page_size + 1)
+    hits.sort(key=lambda hit: (-hit['rank'], hit['type'], hit['id']))
+
+    next_cursor = None
+    if len(hits) > page_size:
+        hits = hits[:page_size]
+        last = hits[-1]
+        next_cursor = encode_cursor([last['rank'], last['type'], last['id']])
+    return hits, next_cursor
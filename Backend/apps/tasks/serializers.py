@@ -1,8 +1,9 @@
 from rest_framework import serializers
+from core.fieldsets import SparseFieldsetSerializerMixin
 from .models import Task, Comment
 
 
-class TaskSerializer(serializers.ModelSerializer):
+class TaskSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Task
         # List all fields you want to expose via the API.
@@ -22,9 +23,86 @@ class TaskSerializer(serializers.ModelSerializer):
         ]
         # These fields will be read-only (set automatically)
         read_only_fields = ['created_at', 'updated_at', 'created_by']
+
+
+class TaskBoardSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
+    """Compact read-only task card for Kanban boards"""
+    class Meta:
+        model = Task
+        fields = [
+            'id',
+            'title',
+            'status',
+            'priority',
+            'assigned_to',
+            'due_date',
+            'order'
+        ]
+        read_only_fields = fields
+
+
+class TaskMoveSerializer(serializers.Serializer):
+    target_status = serializers.ChoiceField(choices=Task.STATUS_CHOICES)
+    before_id = serializers.IntegerField(required=False, allow_null=True,
+                                         help_text="Card that should end up directly below the moved task")
+    after_id = serializers.IntegerField(required=False, allow_null=True,
+                                        help_text="Card that should end up directly above the moved task")
+
+
+class BulkTaskItemSerializer(serializers.ModelSerializer):
+    """
+    One task in a bulk request. Foreign keys are plain ids so a batch can be
+    validated without a query per row; the view checks them in bulk.
+    """
+    project = serializers.IntegerField(source='project_id')
+    assigned_to = serializers.IntegerField(source='assigned_to_id', required=False, allow_null=True)
+
+    class Meta:
+        model = Task
+        fields = [
+            'project',
+            'title',
+            'description',
+            'assigned_to',
+            'status',
+            'due_date',
+            'priority',
+            'order'
+        ]
+
+
+class BulkTaskUpdateItemSerializer(BulkTaskItemSerializer):
+    id = serializers.IntegerField()
+    project = serializers.IntegerField(source='project_id', required=False)
+
+    class Meta(BulkTaskItemSerializer.Meta):
+        fields = ['id'] + BulkTaskItemSerializer.Meta.fields
+        extra_kwargs = {'title': {'required': False}}
+
+
+class BulkTaskSerializer(serializers.Serializer):
+    MAX_OPERATIONS = 2000
+
+    create = BulkTaskItemSerializer(many=True, required=False)
+    update = BulkTaskUpdateItemSerializer(many=True, required=False)
+    delete = serializers.ListField(child=serializers.IntegerField(), required=False)
+
+    def validate(self, attrs):
+        total = sum(len(attrs.get(key, [])) for key in ('create', 'update', 'delete'))
+        if total == 0:
+            raise serializers.ValidationError("At least one operation is required.")
+        if total > self.MAX_OPERATIONS:
+            raise serializers.ValidationError(
+                f"A bulk request may contain at most {self.MAX_OPERATIONS} operations."
+            )
+
+        touched_ids = [item['id'] for item in attrs.get('update', [])] + attrs.get('delete', [])
+        if len(touched_ids) != len(set(touched_ids)):
+            raise serializers.ValidationError("Each task may appear only once per bulk request.")
+        return attrs
     
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
    
     commented_by = serializers.PrimaryKeyRelatedField(read_only=True)
 
@@ -1,3 +1,653 @@
-from django.test import TestCase
+import csv
+import gzip
+import io
+import json
+from datetime import date, timedelta
 
-# Create your tests here.
+from django.core.cache import cache
+from django.db import connection
+from django.test import AsyncClient, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.organizations.models import Organization, OrganizationMembership
+from apps.projects.models import Project, ProjectMembership
+from apps.users.models import User
+from core.testing import explain
+from .models import Task, Comment
+from .ordering import MAX_ORDER
+
+
+class CommentVisibilityQueryTests(TestCase):
+    """CommentViewSet listing cost must not grow with the user's project count."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user('owner@example.com', 'pass', 'Owner')
+        cls.org = Organization.objects.create(name='Org', created_by=cls.owner)
+        OrganizationMembership.objects.create(user=cls.owner, organization=cls.org, role='admin')
+
+        cls.projects = Project.objects.bulk_create([
+            Project(name=f'Project {i}', description='', organization=cls.org, created_by=cls.owner)
+            for i in range(500)
+        ])
+        tasks = Task.objects.bulk_create([
+            Task(project=project, organization=cls.org, title='Task', created_by=cls.owner)
+            for project in cls.projects
+        ])
+        Comment.objects.bulk_create([
+            Comment(
+                task=task, project_id=task.project_id, organization=cls.org,
+                commented_by=cls.owner, comment_text='Hello'
+            )
+            for task in tasks
+        ])
+
+        cls.single = cls.make_employee('single@example.com', cls.projects[:1])
+        cls.many = cls.make_employee('many@example.com', cls.projects)
+
+    @classmethod
+    def make_employee(cls, email, projects):
+        user = User.objects.create_user(email, 'pass', 'Employee')
+        OrganizationMembership.objects.create(user=user, organization=cls.org, role='employee')
+        ProjectMembership.objects.bulk_create([
+            ProjectMembership(user=user, project=project) for project in projects
+        ])
+        return user
+
+    def list_comments(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get('/api/v1/comments/')
+        self.assertEqual(response.status_code, 200)
+        return response, len(queries)
+
+    def test_query_count_is_independent_of_project_memberships(self):
+        single_response, single_queries = self.list_comments(self.single)
+        many_response, many_queries = self.list_comments(self.many)
+
+        self.assertEqual(len(single_response.data['results']), 1)
+        self.assertEqual(len(many_response.data['results']), 50)
+        self.assertIsNotNone(many_response.data['next'])
+        self.assertEqual(single_queries, many_queries)
+        self.assertLessEqual(many_queries, 2)
+
+    def test_project_membership_requires_org_membership(self):
+        OrganizationMembership.objects.filter(user=self.single).delete()
+        response, _ = self.list_comments(self.single)
+        self.assertEqual(response.data['results'], [])
+
+
+class KeysetPaginationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user('owner@example.com', 'pass', 'Owner')
+        org = Organization.objects.create(name='Org', created_by=cls.owner)
+        OrganizationMembership.objects.create(user=cls.owner, organization=org, role='admin')
+        cls.project = Project.objects.create(name='Project', description='', organization=org, created_by=cls.owner)
+        # Every task shares order=0 so the id tiebreaker does the work.
+        Task.objects.bulk_create([
+            Task(project=cls.project, organization=org, title=f'Task {i}', created_by=cls.owner)
+            for i in range(25)
+        ])
+
+    def test_walks_every_task_exactly_once(self):
+        client = APIClient()
+        client.force_authenticate(self.owner)
+        url = f'/api/v1/tasks/?project={self.project.id}&page_size=10'
+        seen = []
+        while url:
+            response = client.get(url)
+            self.assertEqual(response.status_code, 200)
+            seen.extend(task['id'] for task in response.data['results'])
+            url = response.data['next']
+
+        expected = list(Task.objects.order_by('order', 'id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_invalid_cursor_is_rejected(self):
+        client = APIClient()
+        client.force_authenticate(self.owner)
+        response = client.get(f'/api/v1/tasks/?project={self.project.id}&cursor=garbage')
+        self.assertEqual(response.status_code, 404)
+
+
+class DenormalizedOrganizationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user('owner@example.com', 'pass', 'Owner')
+        cls.org = Organization.objects.create(name='Org', created_by=cls.owner)
+        cls.other_org = Organization.objects.create(name='Other', created_by=cls.owner)
+        cls.project = Project.objects.create(name='A', description='', organization=cls.org, created_by=cls.owner)
+        cls.other_project = Project.objects.create(name='B', description='', organization=cls.other_org, created_by=cls.owner)
+
+    def test_ids_are_filled_on_create(self):
+        task = Task.objects.create(project=self.project, title='Task', created_by=self.owner)
+        comment = Comment.objects.create(task=task, commented_by=self.owner, comment_text='Hi')
+        self.assertEqual(task.organization_id, self.org.id)
+        self.assertEqual((comment.project_id, comment.organization_id), (self.project.id, self.org.id))
+
+    def test_moving_a_task_updates_its_comments(self):
+        task = Task.objects.create(project=self.project, title='Task', created_by=self.owner)
+        comment = Comment.objects.create(task=task, commented_by=self.owner, comment_text='Hi')
+
+        task = Task.objects.get(pk=task.pk)
+        task.project = self.other_project
+        task.save()
+
+        comment.refresh_from_db()
+        self.assertEqual(Task.objects.get(pk=task.pk).organization_id, self.other_org.id)
+        self.assertEqual((comment.project_id, comment.organization_id), (self.other_project.id, self.other_org.id))
+
+    def test_moving_a_project_updates_tasks_and_comments(self):
+        task = Task.objects.create(project=self.project, title='Task', created_by=self.owner)
+        comment = Comment.objects.create(task=task, commented_by=self.owner, comment_text='Hi')
+
+        project = Project.objects.get(pk=self.project.pk)
+        project.organization = self.other_org
+        project.save()
+
+        task.refresh_from_db()
+        comment.refresh_from_db()
+        self.assertEqual(task.organization_id, self.other_org.id)
+        self.assertEqual(comment.organization_id, self.other_org.id)
+
+
+class BulkTaskTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin@example.com', 'pass', 'Admin')
+        cls.employee = User.objects.create_user('employee@example.com', 'pass', 'Employee')
+        cls.org = Organization.objects.create(name='Org', created_by=cls.admin)
+        OrganizationMembership.objects.create(user=cls.admin, organization=cls.org, role='admin')
+        OrganizationMembership.objects.create(user=cls.employee, organization=cls.org, role='employee')
+        cls.project = Project.objects.create(name='Project', description='', organization=cls.org, created_by=cls.admin)
+        ProjectMembership.objects.create(user=cls.admin, project=cls.project)
+        ProjectMembership.objects.create(user=cls.employee, project=cls.project)
+
+    def post(self, user, payload):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client.post('/api/v1/tasks/bulk/', payload, format='json')
+
+    def test_create_update_and_delete_in_one_request(self):
+        from apps.notifications.models import Notification
+
+        to_update = Task.objects.create(project=self.project, title='Old', assigned_to=self.employee, created_by=self.admin)
+        to_delete = Task.objects.create(project=self.project, title='Gone', created_by=self.admin)
+        Notification.objects.all().delete()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.post(self.admin, {
+                'create': [
+                    {'project': self.project.id, 'title': f'New {i}', 'assigned_to': self.employee.id}
+                    for i in range(3)
+                ],
+                'update': [{'id': to_update.id, 'title': 'Renamed', 'status': 'completed'}],
+                'delete': [to_delete.id],
+            })
+
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(len(response.data['created']), 3)
+        self.assertEqual(Task.objects.filter(organization=self.org, title__startswith='New').count(), 3)
+        to_update.refresh_from_db()
+        self.assertEqual((to_update.title, to_update.status), ('Renamed', 'completed'))
+        self.assertFalse(Task.objects.filter(pk=to_delete.pk).exists())
+        self.assertEqual(Notification.objects.filter(notification_type='task_assigned').count(), 3)
+        self.assertEqual(Notification.objects.filter(notification_type='task_status_changed').count(), 2)
+
+    def test_employee_cannot_bulk_edit(self):
+        response = self.post(self.employee, {'create': [{'project': self.project.id, 'title': 'Nope'}]})
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(Task.objects.exists())
+
+    def test_unknown_task_rolls_back_nothing_written(self):
+        response = self.post(self.admin, {
+            'create': [{'project': self.project.id, 'title': 'Nope'}],
+            'delete': [999999],
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Task.objects.exists())
+
+    def test_assignee_must_be_project_member(self):
+        outsider = User.objects.create_user('outsider@example.com', 'pass', 'Outsider')
+        response = self.post(self.admin, {
+            'create': [{'project': self.project.id, 'title': 'Nope', 'assigned_to': outsider.id}],
+        })
+        self.assertEqual(response.status_code, 403)
+
+
+class TaskMoveTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin@example.com', 'pass', 'Admin')
+        cls.org = Organization.objects.create(name='Org', created_by=cls.admin)
+        OrganizationMembership.objects.create(user=cls.admin, organization=cls.org, role='admin')
+        cls.project = Project.objects.create(name='Project', description='', organization=cls.org, created_by=cls.admin)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        self.tasks = [
+            Task.objects.create(project=self.project, title=f'Task {i}', created_by=self.admin, order=(i + 1) * 1024)
+            for i in range(4)
+        ]
+
+    def column(self, status='pending'):
+        return list(Task.objects.filter(status=status).order_by('order', 'id').values_list('id', flat=True))
+
+    def move(self, task, **payload):
+        return self.client.post(f'/api/v1/tasks/{task.id}/move/', payload, format='json')
+
+    def test_move_between_neighbours_writes_one_row(self):
+        first, second, third, fourth = self.tasks
+        with CaptureQueriesContext(connection) as queries:
+            response = self.move(fourth, target_status='pending', after_id=first.id)
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(self.column(), [first.id, fourth.id, second.id, third.id])
+        writes = [q['sql'] for q in queries if q['sql'].startswith('UPDATE "tasks_task"')]
+        self.assertEqual(len(writes), 1)
+
+    def test_move_to_another_column(self):
+        first, second, third, fourth = self.tasks
+        self.move(first, target_status='in_progress')
+        response = self.move(third, target_status='in_progress', before_id=first.id)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.column('in_progress'), [third.id, first.id])
+        self.assertEqual(self.column(), [second.id, fourth.id])
+
+    def test_rebalances_when_gap_runs_out(self):
+        Task.objects.update(order=0)
+        first, second, third, fourth = self.tasks
+        response = self.move(fourth, target_status='pending', after_id=first.id)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.column(), [first.id, fourth.id, second.id, third.id])
+        orders = list(Task.objects.order_by('order').values_list('order', flat=True))
+        self.assertEqual(len(set(orders)), 4)
+
+    def test_rebalances_instead_of_passing_max_order(self):
+        first, second, third, fourth = self.tasks
+        Task.objects.filter(pk=third.pk).update(order=MAX_ORDER - 1)
+        response = self.move(first, target_status='pending', after_id=third.id)
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(self.column(), [second.id, fourth.id, third.id, first.id])
+        self.assertLessEqual(Task.objects.order_by('-order').values_list('order', flat=True)[0], MAX_ORDER)
+
+    def test_neighbour_must_be_in_target_column(self):
+        first, second = self.tasks[:2]
+        response = self.move(first, target_status='completed', before_id=second.id)
+        self.assertEqual(response.status_code, 400)
+
+
+class TaskStatusTrackingTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin@example.com', 'pass', 'Admin')
+        cls.employee = User.objects.create_user('employee@example.com', 'pass', 'Employee')
+        org = Organization.objects.create(name='Org', created_by=cls.admin)
+        OrganizationMembership.objects.create(user=cls.admin, organization=org, role='admin')
+        OrganizationMembership.objects.create(user=cls.employee, organization=org, role='employee')
+        project = Project.objects.create(name='Project', description='', organization=org, created_by=cls.admin)
+        ProjectMembership.objects.create(user=cls.employee, project=project)
+        cls.task = Task.objects.create(project=project, title='Task', assigned_to=cls.employee, created_by=cls.admin)
+
+    def test_status_change_is_detected_without_rereading_the_task(self):
+        from apps.notifications.models import Notification
+
+        client = APIClient()
+        client.force_authenticate(self.employee)
+        # Warm the membership cache so only the task queries remain
+        client.get(f'/api/v1/tasks/?project={self.task.project_id}')
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.post(f'/api/v1/tasks/{self.task.id}/update-status/', {'status': 'completed'}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        task_selects = [q for q in queries if q['sql'].startswith('SELECT') and '"tasks_task"' in q['sql']]
+        self.assertEqual(len(task_selects), 1)
+        self.assertEqual(
+            Notification.objects.filter(notification_type='task_status_changed').count(), 2
+        )
+
+    def test_saving_without_status_change_sends_nothing(self):
+        from apps.notifications.models import Notification
+
+        task = Task.objects.get(pk=self.task.pk)
+        task.title = 'Renamed'
+        task.save()
+        self.assertFalse(Notification.objects.filter(notification_type='task_status_changed').exists())
+
+
+class SparseFieldsetTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user('owner@example.com', 'pass', 'Owner')
+        org = Organization.objects.create(name='Org', created_by=cls.owner)
+        OrganizationMembership.objects.create(user=cls.owner, organization=org, role='admin')
+        cls.project = Project.objects.create(name='Project', description='', organization=org, created_by=cls.owner)
+        Task.objects.bulk_create([
+            Task(project=cls.project, organization=org, title=f'Task {i}', description='x' * 2000,
+                 created_by=cls.owner, order=i)
+            for i in range(50)
+        ])
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def get_tasks(self, query):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(f'/api/v1/tasks/?project={self.project.id}&{query}')
+        self.assertEqual(response.status_code, 200)
+        return response, context.captured_queries[-1]['sql']
+
+    def test_fields_narrow_response_and_sql(self):
+        response, sql = self.get_tasks('fields=id,title')
+        self.assertEqual(set(response.data['results'][0]), {'id', 'title'})
+        self.assertNotIn('description', sql)
+
+        response, sql = self.get_tasks('omit=description,created_by')
+        self.assertNotIn('description', response.data['results'][0])
+        self.assertIn('status', response.data['results'][0])
+        self.assertNotIn('description', sql)
+
+    def test_board_view_is_compact(self):
+        full, _ = self.get_tasks('')
+        board, sql = self.get_tasks('view=board')
+        self.assertEqual(
+            list(board.data['results'][0]),
+            ['id', 'title', 'status', 'priority', 'assigned_to', 'due_date', 'order'],
+        )
+        self.assertNotIn('description', sql)
+        self.assertLess(len(board.content) * 10, len(full.content))
+
+    def test_unknown_field_is_rejected(self):
+        response = self.client.get(f'/api/v1/tasks/?project={self.project.id}&fields=id,secret')
+        self.assertEqual(response.status_code, 400)
+
+    def test_narrowed_comments_check_permissions_without_joins(self):
+        employee = User.objects.create_user('employee@example.com', 'pass', 'Employee')
+        OrganizationMembership.objects.create(user=employee, organization=self.project.organization, role='employee')
+        ProjectMembership.objects.create(user=employee, project=self.project)
+        task = Task.objects.filter(project=self.project).first()
+        comment = Comment.objects.create(task=task, commented_by=employee, comment_text='Hi')
+
+        self.client.force_authenticate(employee)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(f'/api/v1/comments/{comment.id}/?fields=id')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {'id': comment.id})
+        tables = ('"tasks_task"', '"projects_project"')
+        self.assertFalse([q for q in context.captured_queries if q['sql'].startswith('SELECT') and any(
+            f'FROM {table}' in q['sql'] for table in tables
+        )])
+
+    def test_writes_ignore_fields(self):
+        task = Task.objects.filter(project=self.project).first()
+        response = self.client.patch(f'/api/v1/tasks/{task.id}/?fields=id', {'title': 'Renamed'}, format='json')
+        self.assertEqual(response.data['title'], 'Renamed')
+        self.assertIn('description', response.data)
+
+
+class ConditionalTaskListTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin@example.com', 'pass', 'Admin')
+        cls.employee = User.objects.create_user('employee@example.com', 'pass', 'Employee')
+        cls.org = Organization.objects.create(name='Org', created_by=cls.admin)
+        OrganizationMembership.objects.create(user=cls.admin, organization=cls.org, role='admin')
+        OrganizationMembership.objects.create(user=cls.employee, organization=cls.org, role='employee')
+        cls.project = Project.objects.create(name='Project', description='', organization=cls.org, created_by=cls.admin)
+        cls.task = Task.objects.create(project=cls.project, title='Task', created_by=cls.admin)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        self.url = f'/api/v1/tasks/?project={self.project.id}'
+
+    def test_unchanged_list_is_not_modified(self):
+        etag = self.client.get(self.url)['ETag']
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse([q for q in queries if 'tasks_task' in q['sql']])
+
+    def test_task_and_comment_writes_change_the_etag(self):
+        etags = [self.client.get(self.url)['ETag']]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.task.title = 'Renamed'
+            self.task.save()
+        etags.append(self.client.get(self.url)['ETag'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Comment.objects.create(task=self.task, commented_by=self.admin, comment_text='Hi')
+        etags.append(self.client.get(self.url)['ETag'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/api/v1/tasks/bulk/', {'delete': [self.task.id]}, format='json')
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etags[-1])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'], [])
+        etags.append(response['ETag'])
+
+        self.assertEqual(len(set(etags)), 4)
+
+    def test_etag_depends_on_access(self):
+        etag = self.client.get('/api/v1/tasks/')['ETag']
+        self.client.force_authenticate(self.employee)
+        response = self.client.get('/api/v1/tasks/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+        etag = response['ETag']
+        ProjectMembership.objects.create(user=self.employee, project=self.project)
+        response = self.client.get('/api/v1/tasks/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 1)
+
+
+class OpenTaskIndexTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin@example.com', 'pass', 'Admin')
+        cls.org = Organization.objects.create(name='Org', created_by=cls.admin)
+        OrganizationMembership.objects.create(user=cls.admin, organization=cls.org, role='admin')
+        cls.project = Project.objects.create(name='Project', description='', organization=cls.org, created_by=cls.admin)
+        statuses = [value for value, _ in Task.STATUS_CHOICES]
+        Task.objects.bulk_create([
+            Task(
+                project=cls.project, organization=cls.org, title=f'Task {i}', status=statuses[i % 3],
+                assigned_to=cls.admin, due_date=date(2026, 1, 1) + timedelta(days=i % 60)
+            )
+            for i in range(600)
+        ])
+
+    def test_open_tasks_by_due_date_use_partial_index(self):
+        due = Task.objects.open().filter(assigned_to=self.admin, due_date__lte=date(2026, 1, 10))
+        self.assertIn('task_open_assignee_due_idx', explain(due))
+        self.assertEqual(due.count(), 70)
+
+    def test_due_lists_open_assigned_tasks_soonest_first(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        url = '/api/v1/tasks/due/?due_before=2026-01-10&page_size=50'
+        seen = []
+        while url:
+            response = client.get(url)
+            self.assertEqual(response.status_code, 200)
+            seen.extend(response.data['results'])
+            url = response.data['next']
+
+        self.assertEqual(len(seen), 70)
+        self.assertNotIn('completed', {task['status'] for task in seen})
+        self.assertEqual([task['due_date'] for task in seen], sorted(task['due_date'] for task in seen))
+        self.assertEqual(client.get('/api/v1/tasks/due/?due_before=soon').status_code, 400)
+
+    def test_board_column_uses_project_status_order_index(self):
+        index = next(index for index in Task._meta.indexes if index.fields == ['project', 'status', 'order'])
+        column = Task.objects.filter(project=self.project, status='pending').order_by('order')
+        self.assertIn(index.name, explain(column))
+
+
+class SearchTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin@example.com', 'pass', 'Admin')
+        cls.employee = User.objects.create_user('employee@example.com', 'pass', 'Employee')
+        cls.org = Organization.objects.create(name='Org', created_by=cls.admin)
+        OrganizationMembership.objects.create(user=cls.admin, organization=cls.org, role='admin')
+        OrganizationMembership.objects.create(user=cls.employee, organization=cls.org, role='employee')
+        cls.project = Project.objects.create(name='Visible', description='', organization=cls.org, created_by=cls.admin)
+        cls.hidden = Project.objects.create(name='Hidden', description='', organization=cls.org, created_by=cls.admin)
+        ProjectMembership.objects.create(user=cls.employee, project=cls.project)
+
+        cls.title_hit = Task.objects.create(project=cls.project, title='Deploy the API', description='', created_by=cls.admin)
+        cls.description_hit = Task.objects.create(
+            project=cls.project, title='Release', description='Deploy after review', created_by=cls.admin
+        )
+        cls.comment_hit = Comment.objects.create(
+            task=cls.description_hit, commented_by=cls.admin, comment_text='Who will deploy this?'
+        )
+        Task.objects.create(project=cls.hidden, title='Deploy secrets', description='', created_by=cls.admin)
+        Task.objects.create(project=cls.project, title='Unrelated', description='Nothing here', created_by=cls.admin)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.employee)
+
+    def search(self, query):
+        response = self.client.get(f'/api/v1/search/?{query}')
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data
+
+    def test_ranked_results_within_visible_projects(self):
+        results = self.search('q=deploy')['results']
+        self.assertEqual(
+            [(hit['type'], hit['id']) for hit in results],
+            [('task', self.title_hit.id), ('comment', self.comment_hit.id), ('task', self.description_hit.id)],
+        )
+        self.assertEqual(results[1]['task'], self.description_hit.id)
+        self.assertEqual(results[1]['title'], 'Release')
+
+    def test_admin_sees_every_project_in_the_org(self):
+        self.client.force_authenticate(self.admin)
+        self.assertEqual(len(self.search('q=deploy')['results']), 4)
+        self.assertEqual(len(self.search(f'q=deploy&project={self.hidden.id}')['results']), 1)
+
+    def test_all_terms_must_match(self):
+        results = self.search('q=deploy+review')['results']
+        self.assertEqual([hit['id'] for hit in results], [self.description_hit.id])
+
+    def test_keyset_pages_cover_every_result_once(self):
+        self.client.force_authenticate(self.admin)
+        expected = [(hit['type'], hit['id']) for hit in self.search('q=deploy')['results']]
+
+        seen = []
+        url = '/api/v1/search/?q=deploy&page_size=1'
+        while url:
+            data = self.client.get(url).data
+            seen.extend((hit['type'], hit['id']) for hit in data['results'])
+            url = data['next']
+        self.assertEqual(seen, expected)
+
+    def test_type_filter_and_validation(self):
+        results = self.search('q=deploy&type=comment')['results']
+        self.assertEqual([hit['type'] for hit in results], ['comment'])
+
+        self.assertEqual(self.client.get('/api/v1/search/?q=').status_code, 400)
+        self.assertEqual(self.client.get('/api/v1/search/?q=deploy&type=user').status_code, 400)
+        self.assertEqual(self.client.get('/api/v1/search/?q=deploy&cursor=bogus').status_code, 404)
+
+    def test_search_vector_is_not_loaded_by_default(self):
+        self.assertEqual(Task.objects.get(pk=self.title_hit.pk).get_deferred_fields(), {'search_vector'})
+
+
+class ExportTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin@example.com', 'pass', 'Admin')
+        cls.employee = User.objects.create_user('employee@example.com', 'pass', 'Employee')
+        cls.org = Organization.objects.create(name='Org', created_by=cls.admin)
+        OrganizationMembership.objects.create(user=cls.admin, organization=cls.org, role='admin')
+        OrganizationMembership.objects.create(user=cls.employee, organization=cls.org, role='employee')
+        cls.project = Project.objects.create(name='Visible', description='', organization=cls.org, created_by=cls.admin)
+        cls.hidden = Project.objects.create(name='Hidden', description='', organization=cls.org, created_by=cls.admin)
+        ProjectMembership.objects.create(user=cls.employee, project=cls.project)
+
+        Task.objects.bulk_create([
+            Task(project=cls.project, organization=cls.org, title=f'Task {i}', description='Line 1\nLine, 2',
+                 assigned_to=cls.employee, created_by=cls.admin)
+            for i in range(2500)
+        ])
+        cls.formula = Task.objects.create(project=cls.project, title='=HYPERLINK("x")', created_by=cls.admin)
+        Task.objects.create(project=cls.hidden, title='Hidden task', created_by=cls.admin)
+        Comment.objects.create(task=cls.formula, commented_by=cls.admin, comment_text='Looks odd')
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def download(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content)
+
+    @override_settings(ACCESS_CACHE_ENABLED=True)
+    def test_csv_streams_every_task_in_one_query(self):
+        url = f'/api/v1/tasks/export/?project={self.project.id}'
+        self.client.get(url)  # warm the access cache
+        with self.assertNumQueries(2):
+            response, content = self.download(url)
+
+        self.assertEqual(response['Content-Disposition'], f'attachment; filename="tasks-project-{self.project.id}.csv"')
+        rows = list(csv.DictReader(io.StringIO(content.decode())))
+        self.assertEqual(len(rows), 2501)
+        self.assertEqual(rows[0]['description'], 'Line 1\nLine, 2')
+        self.assertEqual(rows[0]['assigned_to__email'], 'employee@example.com')
+        # Spreadsheet formulas are neutralised
+        self.assertEqual(rows[-1]['title'], '\'=HYPERLINK("x")')
+
+    def test_gzipped_ndjson_for_an_organization_respects_visibility(self):
+        self.client.force_authenticate(self.employee)
+        response, content = self.download(f'/api/v1/tasks/export/?organization={self.org.id}&output=ndjson&gzip=1')
+
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        rows = [json.loads(line) for line in gzip.decompress(content).splitlines()]
+        self.assertEqual(len(rows), 2501)
+        self.assertEqual({row['project_id'] for row in rows}, {self.project.id})
+
+    def test_comment_export(self):
+        _, content = self.download(f'/api/v1/comments/export/?organization={self.org.id}&output=ndjson')
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual([(row['task_id'], row['comment_text']) for row in rows], [(self.formula.id, 'Looks odd')])
+
+    def test_scope_is_required_and_checked(self):
+        self.assertEqual(self.client.get('/api/v1/tasks/export/').status_code, 400)
+        self.assertEqual(self.client.get(f'/api/v1/tasks/export/?project={self.project.id}&output=xml').status_code, 400)
+        self.client.force_authenticate(self.employee)
+        self.assertEqual(self.client.get(f'/api/v1/tasks/export/?project={self.hidden.id}').status_code, 404)
+
+    async def test_asgi_streams_without_buffering(self):
+        response = await AsyncClient().get(
+            f'/api/v1/tasks/export/?project={self.project.id}&output=ndjson',
+            headers={'Authorization': f'Bearer {AccessToken.for_user(self.admin)}'},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_async)
+        chunks = [chunk async for chunk in response.streaming_content]
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(b''.join(chunks).count(b'\n'), 2501)
@@ -3,19 +3,107 @@ from drf_yasg import openapi
 from rest_framework.decorators import action
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import status, permissions, viewsets
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from .models import Task , Comment
-from apps.organizations.models import Organization, OrganizationMembership
+from apps.organizations.access import get_access_context
+from apps.organizations.models import OrganizationMembership
 from apps.projects.models import Project, ProjectMembership
 from .permissions import  IsTaskEditable,CanCommentOnTask
-from .serializers import TaskSerializer,CommentSerializer
+from .serializers import TaskSerializer,TaskBoardSerializer,CommentSerializer,BulkTaskSerializer,TaskMoveSerializer
+from .ordering import place_task
+from .search import COMMENT, RESULT_TYPES, TASK, search
+from apps.notifications.utils import NotificationManager, task_assigned_notification, task_status_notifications
+from collections import defaultdict
+from datetime import date
+from django.db import transaction
 from django.db.models import Q
+from django.utils import timezone
+from core.conditional import conditional_response, make_etag
+from core.export import EXPORT_PARAMETERS, export_response
+from core.fieldsets import SPARSE_FIELDSET_PARAMETERS, SparseFieldsetMixin
+from core.pagination import KeysetPagination
 
 
+class TaskPagination(KeysetPagination):
+    page_size = 100
+    max_page_size = 500
+    ordering = ('order', 'id')
+
+
+class DueTaskPagination(KeysetPagination):
+    page_size = 100
+    max_page_size = 500
+    ordering = ('due_date', 'id')
+
+
+class CommentPagination(KeysetPagination):
+    page_size = 50
+    max_page_size = 200
+    ordering = ('-created_at', '-id')
+
      
-class TaskViewSet(viewsets.ModelViewSet):
+class SearchPagination(KeysetPagination):
+    page_size = 20
+    max_page_size = 100
+
+
+TASK_EXPORT_COLUMNS = (
+    'id', 'project_id', 'project__name', 'title', 'description', 'status', 'priority',
+    'assigned_to_id', 'assigned_to__email', 'due_date', 'order', 'created_by_id',
+    'created_at', 'updated_at',
+)
+COMMENT_EXPORT_COLUMNS = (
+    'id', 'task_id', 'task__title', 'project_id', 'commented_by_id', 'commented_by__email',
+    'comment_text', 'created_at', 'updated_at',
+)
+
+# Swagger parameters for the export endpoints
+EXPORT_SCOPE_PARAMETERS = [
+    openapi.Parameter('project', openapi.IN_QUERY, description="Export this project", type=openapi.TYPE_INTEGER),
+    openapi.Parameter('organization', openapi.IN_QUERY, description="Export everything you can see in this organization", type=openapi.TYPE_INTEGER),
+]
+
+
+def export_scope(request):
+    """
+    (filter, file name suffix) for an export of `?project=` or
+    `?organization=`, limited to what the caller can see. Tasks and comments
+    both carry project/organization ids, so the filter fits either.
+    """
+    access = get_access_context(request)
+    project_id = request.query_params.get('project')
+    organization_id = request.query_params.get('organization')
+    try:
+        project_id = int(project_id) if project_id else None
+        organization_id = int(organization_id) if organization_id else None
+    except ValueError:
+        raise ValidationError({'detail': 'project and organization must be integers.'})
+
+    if project_id is not None:
+        organization_id = Project.objects.filter(pk=project_id).values_list('organization_id', flat=True).first()
+        if organization_id is None or not (
+            access.is_org_admin_or_manager(organization_id) or access.is_project_member(project_id)
+        ):
+            raise NotFound('Project not found.')
+        return Q(project_id=project_id), f'project-{project_id}'
+
+    if organization_id is not None:
+        if access.is_org_admin_or_manager(organization_id):
+            return Q(organization_id=organization_id), f'organization-{organization_id}'
+        if access.is_org_member(organization_id):
+            return Q(organization_id=organization_id, project_id__in=access.project_ids), f'organization-{organization_id}'
+        raise NotFound('Organization not found.')
+
+    raise ValidationError({'detail': 'Pass project or organization.'})
+
+
+class TaskViewSet(SparseFieldsetMixin, viewsets.ModelViewSet):
     serializer_class = TaskSerializer
     permission_classes = [permissions.IsAuthenticated, IsTaskEditable]
+    pagination_class = TaskPagination
+    sparse_required_fields = ('id', 'project', 'organization', 'assigned_to')
 
     @swagger_auto_schema(
         manual_parameters=[
@@ -24,17 +112,82 @@ class TaskViewSet(viewsets.ModelViewSet):
                 openapi.IN_QUERY,
                 description="Filter tasks by project ID",
                 type=openapi.TYPE_INTEGER
+            ),
+            openapi.Parameter(
+                'cursor',
+                openapi.IN_QUERY,
+                description="Opaque cursor from the previous page's `next` link",
+                type=openapi.TYPE_STRING
+            ),
+            openapi.Parameter(
+                'page_size',
+                openapi.IN_QUERY,
+                description="Number of tasks per page (max 500)",
+                type=openapi.TYPE_INTEGER
+            ),
+            openapi.Parameter(
+                'view',
+                openapi.IN_QUERY,
+                description="`board` for compact Kanban cards (id, title, status, priority, assigned_to, due_date, order)",
+                type=openapi.TYPE_STRING
             )
-        ]
+        ] + SPARSE_FIELDSET_PARAMETERS
     )
     def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+        validators = self.get_list_validators()
+        if validators is None:
+            return super().list(request, *args, **kwargs)
+        return conditional_response(
+            request, *validators, lambda: super(TaskViewSet, self).list(request, *args, **kwargs)
+        )
+
+    def get_list_validators(self):
+        """
+        (ETag, Last-Modified) for the task list, built from the versions of
+        the projects it can contain so an unchanged list is answered with 304
+        before any task is loaded. None if `project` is not a valid id.
+        """
+        access = get_access_context(self.request)
+        project_id = self.request.query_params.get('project')
+        if project_id:
+            try:
+                projects = Project.objects.filter(id=int(project_id))
+            except ValueError:
+                return None
+        else:
+            projects = Project.objects.filter(
+                Q(organization_id__in=access.admin_org_ids()) |
+                Q(id__in=access.project_ids)
+            )
+
+        rows = list(projects.order_by('id').values_list('id', 'organization_id', 'version', 'changed_at'))
+        versions = tuple(
+            (pk, version) for pk, organization_id, version, _ in rows
+            if access.is_org_admin_or_manager(organization_id) or access.is_project_member(pk)
+        )
+        last_modified = max((changed_at for *_, changed_at in rows), default=None)
+        return make_etag(self.request, versions), last_modified
+
+    def is_board_view(self):
+        return self.action == 'list' and self.request.query_params.get('view') == 'board'
+
+    def get_serializer_class(self):
+        if self.is_board_view():
+            return TaskBoardSerializer
+        return super().get_serializer_class()
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.is_board_view() and self.get_sparse_fields() is None:
+            # Board cards never need the other columns
+            queryset = self.narrow_queryset(queryset, TaskBoardSerializer.Meta.fields)
+        return queryset
 
     def get_queryset(self):
         if getattr(self, 'swagger_fake_view', False):
             return Task.objects.none()
 
-        user = self.request.user
+        access = get_access_context(self.request)
         queryset = Task.objects.none() 
         
         project_id = self.request.query_params.get('project', None)
@@ -43,16 +196,8 @@ class TaskViewSet(viewsets.ModelViewSet):
             try:
                 project = Project.objects.get(id=project_id)
                 
-                is_org_admin = OrganizationMembership.objects.filter(
-                    user=user,
-                    organization=project.organization,
-                    role__in=['admin', 'manager']
-                ).exists()
-                
-                is_project_member = ProjectMembership.objects.filter(
-                    user=user,
-                    project=project
-                ).exists()
+                is_org_admin = access.is_org_admin_or_manager(project.organization_id)
+                is_project_member = access.is_project_member(project.id)
                 
                 if is_org_admin or is_project_member:
                     queryset = Task.objects.filter(project=project)
@@ -63,20 +208,14 @@ class TaskViewSet(viewsets.ModelViewSet):
                 queryset = Task.objects.none()
         else:
      
-            admin_orgs = Organization.objects.filter(
-                memberships__user=user,
-                memberships__role__in=['admin', 'manager']
-            )
-            
-            # Get all projects where the user is a member
-            member_projects = Project.objects.filter(
-                members__user=user
-            )
-            
             queryset = Task.objects.filter(
-                Q(project__organization__in=admin_orgs) | 
-                Q(project__in=member_projects)
-            ).distinct()
+                Q(organization_id__in=access.admin_org_ids()) | 
+                Q(project_id__in=access.project_ids)
+            )
+
+        if self.action in ['update', 'partial_update', 'update_status', 'move']:
+            # Status-change notifications need the project name
+            queryset = queryset.select_related('project')
         
         return queryset
 
@@ -107,13 +246,11 @@ class TaskViewSet(viewsets.ModelViewSet):
         """
         task = self.get_object()
         
-        is_admin_or_manager = OrganizationMembership.objects.filter(
-        user=request.user,
-        organization=task.project.organization,
-        role__in=['admin', 'manager']
-         ).exists()
+        is_admin_or_manager = get_access_context(request).is_org_admin_or_manager(
+            task.organization_id
+        )
         # Check if user is assigned to this task
-        if task.assigned_to != request.user and not is_admin_or_manager:
+        if task.assigned_to_id != request.user.id and not is_admin_or_manager:
             return Response(
                 {"detail": "Only the assigned employee can update the task status."},
                 status=status.HTTP_403_FORBIDDEN
@@ -140,8 +277,244 @@ class TaskViewSet(viewsets.ModelViewSet):
         # Return the updated task
         serializer = self.get_serializer(task)
         return Response(serializer.data)
-    
-    
+
+    @swagger_auto_schema(
+        request_body=TaskMoveSerializer,
+        responses={
+            200: TaskSerializer,
+            400: "Bad Request - Invalid status or neighbour tasks",
+            403: "Forbidden - User not assigned to task"
+        }
+    )
+    @action(detail=True, methods=['post'], url_path='move')
+    def move(self, request, pk=None):
+        """
+        Move a task within or between Kanban columns.
+        The task gets an order key between its new neighbours, so normally
+        only this one row is written.
+        """
+        serializer = TaskMoveSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        target_status = serializer.validated_data['target_status']
+        neighbour_ids = {
+            key: serializer.validated_data.get(key)
+            for key in ('before_id', 'after_id')
+        }
+
+        with transaction.atomic():
+            task = self.get_object()
+            task = Task.objects.select_for_update(of=('self',)).select_related('project').get(pk=task.pk)
+
+            is_admin_or_manager = get_access_context(request).is_org_admin_or_manager(
+                task.organization_id
+            )
+            # Same rule as update-status: assignee or admin/manager
+            if task.assigned_to_id != request.user.id and not is_admin_or_manager:
+                return Response(
+                    {"detail": "Only the assigned employee can move the task."},
+                    status=status.HTTP_403_FORBIDDEN
+                )
+
+            ids = [value for value in neighbour_ids.values() if value is not None]
+            if task.pk in ids:
+                return Response(
+                    {"detail": "A task cannot be positioned relative to itself."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            neighbours = Task.objects.filter(
+                project_id=task.project_id,
+                status=target_status
+            ).only('id', 'order').in_bulk(ids)
+            if len(neighbours) != len(ids):
+                return Response(
+                    {"detail": "Neighbour tasks must be in the target column of the same project."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            place_task(
+                task,
+                target_status,
+                before=neighbours.get(neighbour_ids['before_id']),
+                after=neighbours.get(neighbour_ids['after_id'])
+            )
+            task.save(update_fields=['status', 'order', 'updated_at'])
+
+        return Response(self.get_serializer(task).data)
+
+    @swagger_auto_schema(
+        request_body=BulkTaskSerializer,
+        responses={
+            200: "Created and updated tasks plus the ids of deleted tasks",
+            400: "Bad Request - Invalid operations or unknown tasks/projects",
+            403: "Forbidden - Not an admin/manager for every affected project"
+        }
+    )
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk(self, request):
+        """
+        Create, update and delete many tasks in one transaction.
+        Permissions are checked once per affected project: only organization
+        admins/managers may change tasks, and assignees must be project members.
+        """
+        serializer = BulkTaskSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        creates = serializer.validated_data.get('create', [])
+        updates = serializer.validated_data.get('update', [])
+        delete_ids = serializer.validated_data.get('delete', [])
+
+        with transaction.atomic():
+            existing = Task.objects.select_for_update().in_bulk(
+                [item['id'] for item in updates] + delete_ids
+            )
+            missing_tasks = sorted(
+                {item['id'] for item in updates}.union(delete_ids) - existing.keys()
+            )
+            if missing_tasks:
+                return Response(
+                    {"detail": "Tasks not found.", "ids": missing_tasks},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            project_ids = {item['project_id'] for item in creates}
+            project_ids.update(item['project_id'] for item in updates if 'project_id' in item)
+            project_ids.update(task.project_id for task in existing.values())
+            projects = Project.objects.only('id', 'name', 'organization_id').in_bulk(project_ids)
+            missing_projects = sorted(project_ids - projects.keys())
+            if missing_projects:
+                return Response(
+                    {"detail": "Projects not found.", "ids": missing_projects},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            # Only admins/managers can create, edit, or delete tasks
+            access = get_access_context(request)
+            forbidden = sorted(
+                project.id for project in projects.values()
+                if not access.is_org_admin_or_manager(project.organization_id)
+            )
+            if forbidden:
+                return Response(
+                    {"detail": "Only admins or managers can change tasks in these projects.", "ids": forbidden},
+                    status=status.HTTP_403_FORBIDDEN
+                )
+
+            # Assigned users must be members of the task's project
+            assignments = {
+                (item['assigned_to_id'], item['project_id'])
+                for item in creates if item.get('assigned_to_id')
+            }
+            assignments.update(
+                (item['assigned_to_id'], item.get('project_id', existing[item['id']].project_id))
+                for item in updates if item.get('assigned_to_id')
+            )
+            if assignments:
+                members = set(ProjectMembership.objects.filter(
+                    user_id__in={user_id for user_id, _ in assignments},
+                    project_id__in={project_id for _, project_id in assignments}
+                ).values_list('user_id', 'project_id'))
+                if not assignments <= members:
+                    return Response(
+                        {"detail": "The assigned user is not a member of the project."},
+                        status=status.HTTP_403_FORBIDDEN
+                    )
+
+            created = Task.objects.bulk_create([
+                Task(
+                    **item,
+                    organization_id=projects[item['project_id']].organization_id,
+                    created_by=request.user
+                )
+                for item in creates
+            ])
+
+            updated = []
+            update_fields = {'updated_at'}
+            status_changes = []
+            moved = defaultdict(list)
+            now = timezone.now()
+            for item in updates:
+                task = existing[item['id']]
+                old_status = task.status
+                old_project_id = task.project_id
+                for field, value in item.items():
+                    if field != 'id':
+                        setattr(task, field, value)
+                        update_fields.add(Task._meta.get_field(field).name)
+                if task.project_id != old_project_id:
+                    task.organization_id = projects[task.project_id].organization_id
+                    update_fields.add('organization')
+                    moved[task.project_id].append(task.id)
+                if task.status != old_status:
+                    status_changes.append((task, old_status))
+                task.updated_at = now
+                updated.append(task)
+
+            if updated:
+                Task.objects.bulk_update(updated, sorted(update_fields), batch_size=500)
+            # Keep the comments' denormalized project/organization in step
+            for project_id, task_ids in moved.items():
+                Comment.objects.filter(task_id__in=task_ids).update(
+                    project_id=project_id,
+                    organization_id=projects[project_id].organization_id
+                )
+            if delete_ids:
+                Task.objects.filter(id__in=delete_ids).delete()
+            Project.bump_version(*project_ids)
+
+            # bulk_create/bulk_update skip the post_save handlers, so build the
+            # same notifications here and insert them in one go
+            notifications = [
+                task_assigned_notification(task, projects[task.project_id].name, sender=request.user)
+                for task in created
+                if task.assigned_to_id and task.assigned_to_id != request.user.id
+            ]
+            for task, old_status in status_changes:
+                notifications.extend(
+                    task_status_notifications(task, projects[task.project_id].name, old_status)
+                )
+            NotificationManager.create_notifications(notifications)
+
+        return Response({
+            'created': TaskSerializer(created, many=True).data,
+            'updated': TaskSerializer(updated, many=True).data,
+            'deleted': delete_ids
+        }, status=status.HTTP_200_OK)
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter('due_before', openapi.IN_QUERY, description="Only tasks due on or before this date (YYYY-MM-DD)", type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE),
+            openapi.Parameter('cursor', openapi.IN_QUERY, description="Opaque cursor from the previous page's `next` link", type=openapi.TYPE_STRING),
+            openapi.Parameter('page_size', openapi.IN_QUERY, description="Number of tasks per page (max 500)", type=openapi.TYPE_INTEGER),
+        ] + SPARSE_FIELDSET_PARAMETERS
+    )
+    @action(detail=False, methods=['get'], url_path='due', pagination_class=DueTaskPagination)
+    def due(self, request):
+        """
+        The caller's open tasks that have a due date, soonest first. Served by
+        the task_open_assignee_due_idx partial index.
+        """
+        queryset = self.get_queryset().open().filter(assigned_to=request.user, due_date__isnull=False)
+        due_before = request.query_params.get('due_before')
+        if due_before:
+            try:
+                queryset = queryset.filter(due_date__lte=date.fromisoformat(due_before))
+            except ValueError:
+                raise ValidationError({'due_before': 'Use the YYYY-MM-DD format.'})
+
+        page = self.paginate_queryset(self.filter_queryset(queryset))
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @swagger_auto_schema(manual_parameters=EXPORT_SCOPE_PARAMETERS + EXPORT_PARAMETERS)
+    @action(detail=False, methods=['get'], url_path='export')
+    def export(self, request):
+        """Download a project's or organization's tasks as CSV or NDJSON, streamed row by row"""
+        scope, name = export_scope(request)
+        return export_response(
+            request, Task.objects.filter(scope).order_by('id'), TASK_EXPORT_COLUMNS, f'tasks-{name}'
+        )
+
+
 # Define the query parameter for Swagger documentation.
 task_param = openapi.Parameter(
     'task', openapi.IN_QUERY, 
@@ -153,9 +526,11 @@ task_param = openapi.Parameter(
 
 
 # Updated ViewSet
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(SparseFieldsetMixin, viewsets.ModelViewSet):
     serializer_class = CommentSerializer
     permission_classes = [permissions.IsAuthenticated, CanCommentOnTask]
+    pagination_class = CommentPagination
+    sparse_required_fields = ('id', 'project', 'organization', 'commented_by')
     queryset = Comment.objects.all()
 
     def get_queryset(self):
@@ -169,38 +544,32 @@ class CommentViewSet(viewsets.ModelViewSet):
         if not user.is_authenticated:
             return Comment.objects.none()
 
-        # Get all organizations where user is admin/manager
+        # Organizations where user is admin/manager
         admin_org_ids = OrganizationMembership.objects.filter(
             user=user,
             role__in=['admin', 'manager']
-        ).values_list('organization_id', flat=True)
+        ).values('organization_id')
 
-        # Get all projects where user is a member AND is also an org member
-        user_project_memberships = ProjectMembership.objects.filter(user=user)
-        project_ids = []
-        
-        for membership in user_project_memberships:
-            # Check if user is also an org member for this project
-            if OrganizationMembership.objects.filter(
-                user=user,
-                organization=membership.project.organization
-            ).exists():
-                project_ids.append(membership.project.id)
-
-        # Build queryset: comments from tasks in projects where user is admin/manager of org
-        # OR comments from tasks in projects where user is a member
-        queryset = Comment.objects.select_related(
-            'task__project__organization',
-            'commented_by'
-        ).filter(
-            Q(task__project__organization_id__in=admin_org_ids) |
-            Q(task__project__id__in=project_ids)
-        ).distinct()
+        # Projects where user is a member AND is also a member of the project's org
+        member_project_ids = ProjectMembership.objects.filter(
+            user=user,
+            project__organization__memberships__user=user
+        ).values('project_id')
+
+        # Build queryset: comments in orgs where user is admin/manager
+        # OR comments in projects where user is a member.
+        # Comments carry denormalized organization/project ids, so this is a
+        # single-table query with two subqueries regardless of how many
+        # projects the user belongs to.
+        queryset = Comment.objects.filter(
+            Q(organization_id__in=admin_org_ids) |
+            Q(project_id__in=member_project_ids)
+        )
 
         # Filter by task if specified
         task_id = self.request.query_params.get('task')
         if task_id:
-            queryset = queryset.filter(task__id=task_id)
+            queryset = queryset.filter(task_id=task_id)
 
         return queryset.order_by('-created_at')
 
@@ -214,8 +583,20 @@ class CommentViewSet(viewsets.ModelViewSet):
                 openapi.IN_QUERY,
                 description="Filter comments by task ID",
                 type=openapi.TYPE_INTEGER
+            ),
+            openapi.Parameter(
+                'cursor',
+                openapi.IN_QUERY,
+                description="Opaque cursor from the previous page's `next` link",
+                type=openapi.TYPE_STRING
+            ),
+            openapi.Parameter(
+                'page_size',
+                openapi.IN_QUERY,
+                description="Number of comments per page (max 200)",
+                type=openapi.TYPE_INTEGER
             )
-        ]
+        ] + SPARSE_FIELDSET_PARAMETERS
     )
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
@@ -235,7 +616,7 @@ class CommentViewSet(viewsets.ModelViewSet):
             request.data._mutable = True
         
         # Ensure task field matches the existing instance (prevent changing task)
-        request.data['task'] = instance.task.id
+        request.data['task'] = instance.task_id
         
         return super().update(request, *args, **kwargs)
 
@@ -249,6 +630,63 @@ class CommentViewSet(viewsets.ModelViewSet):
         
         # If task is provided, ensure it matches the existing instance
         if 'task' in request.data:
-            request.data['task'] = instance.task.id
+            request.data['task'] = instance.task_id
         
-        return super().partial_update(request, *args, **kwargs)
\ No newline at end of file
+        return super().partial_update(request, *args, **kwargs)
+
+    @swagger_auto_schema(manual_parameters=EXPORT_SCOPE_PARAMETERS + EXPORT_PARAMETERS)
+    @action(detail=False, methods=['get'], url_path='export')
+    def export(self, request):
+        """Download a project's or organization's comments as CSV or NDJSON, streamed row by row"""
+        scope, name = export_scope(request)
+        return export_response(
+            request, Comment.objects.filter(scope).order_by('id'), COMMENT_EXPORT_COLUMNS, f'comments-{name}'
+        )
+
+
+class SearchView(APIView):
+    """
+    Full-text search over task titles, descriptions and comments in the
+    projects the caller can see, best matches first (see search.py).
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter('q', openapi.IN_QUERY, description="Search text; supports \"quoted phrases\", OR and -exclusions", type=openapi.TYPE_STRING, required=True),
+            openapi.Parameter('project', openapi.IN_QUERY, description="Only search this project", type=openapi.TYPE_INTEGER),
+            openapi.Parameter('type', openapi.IN_QUERY, description="`task` or `comment` to search only one kind", type=openapi.TYPE_STRING),
+            openapi.Parameter('cursor', openapi.IN_QUERY, description="Opaque cursor from the previous page's `next` link", type=openapi.TYPE_STRING),
+            openapi.Parameter('page_size', openapi.IN_QUERY, description="Results per page (max 100)", type=openapi.TYPE_INTEGER),
+        ]
+    )
+    def get(self, request):
+        text = request.query_params.get('q', '').strip()
+        if not text:
+            raise ValidationError({'q': 'This parameter is required.'})
+        result_type = request.query_params.get('type')
+        if result_type and result_type not in RESULT_TYPES:
+            raise ValidationError({'type': f"Must be one of: {', '.join(RESULT_TYPES)}."})
+
+        access = get_access_context(request)
+        visible = Q(organization_id__in=access.admin_org_ids()) | Q(project_id__in=access.project_ids)
+        project_id = request.query_params.get('project')
+        if project_id:
+            try:
+                visible &= Q(project_id=int(project_id))
+            except ValueError:
+                raise ValidationError({'project': 'Must be an integer.'})
+
+        tasks = Task.objects.filter(visible) if result_type in (None, '', TASK) else None
+        comments = Comment.objects.filter(visible) if result_type in (None, '', COMMENT) else None
+
+        paginator = SearchPagination()
+        paginator.request = request
+        try:
+            hits, paginator.next_cursor = search(
+                text, tasks, comments, paginator.get_page_size(request),
+                request.query_params.get(paginator.cursor_query_param)
+            )
+        except ValueError:
+            raise NotFound('Invalid cursor.')
+        return paginator.get_paginated_response(hits)
@@ -0,0 +1,69 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from .models import User
+
+
+USER_CACHE_KEY = 'auth:user:{}'
+
+# Never copied into the shared cache; loaded lazily if something reads it.
+UNCACHED_FIELDS = ('password',)
+
+
+def snapshot_fields():
+    return [
+        field.attname for field in User._meta.concrete_fields
+        if field.attname not in UNCACHED_FIELDS
+    ]
+
+
+def get_cached_user(user_id):
+    """
+    Return the user with `user_id`, or None if it does not exist.
+
+    With USER_CACHE_ENABLED, column values are kept in the shared cache for
+    USER_CACHE_TIMEOUT seconds so repeated authentications (e.g. a WebSocket
+    reconnect storm) do not query the users table; otherwise they are always
+    queried. The instance behaves like one loaded with `.defer('password')`:
+    saving it only writes the loaded columns.
+    """
+    if not getattr(settings, 'USER_CACHE_ENABLED', False):
+        snapshot = query_user_snapshot(user_id)
+    else:
+        key = USER_CACHE_KEY.format(user_id)
+        snapshot = cache.get(key)
+        if snapshot is None:
+            snapshot = query_user_snapshot(user_id)
+            if snapshot is not None:
+                cache.set(key, snapshot, getattr(settings, 'USER_CACHE_TIMEOUT', 60))
+    if snapshot is None:
+        return None
+    return User.from_db(DEFAULT_DB_ALIAS, list(snapshot), list(snapshot.values()))
+
+
+def query_user_snapshot(user_id):
+    """{attname: value} for the user's columns, or None if it does not exist"""
+    fields = snapshot_fields()
+    values = User.objects.filter(pk=user_id).values_list(*fields).first()
+    return None if values is None else dict(zip(fields, values))
+
+
+def user_from_claims(token):
+    """
+    Build an unsaved, query-free user from a validated access token.
+
+    Only the id is known and the user is assumed active until the token
+    expires, so deactivation is not noticed; use only where that is acceptable.
+    """
+    user_id = User._meta.pk.to_python(token[settings.SIMPLE_JWT.get('USER_ID_CLAIM', 'user_id')])
+    user = User(id=user_id, is_active=True)
+    user._state.adding = False
+    return user
+
+
+def invalidate_user_cache(*user_ids):
+    """Drop cached user snapshots once the current transaction commits"""
+    keys = [USER_CACHE_KEY.format(user_id) for user_id in user_ids if user_id]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
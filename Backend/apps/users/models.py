@@ -1,5 +1,7 @@
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
 from django.contrib.auth.models import BaseUserManager
 
 class CustomUserManager(BaseUserManager):
@@ -46,11 +48,49 @@ class User(AbstractUser):
     
     objects = CustomUserManager()
 
+    # Shown in organization and project member lists, whose versions are
+    # bumped when these change (see apps/organizations/signals.py)
+    MEMBER_LIST_FIELDS = ('full_name', 'email')
+
     def __str__(self):
         return self.email
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_loaded_values()
+        return instance
+
+    def _remember_loaded_values(self):
+        self._loaded_values = {field: self.__dict__.get(field) for field in self.MEMBER_LIST_FIELDS}
+
+    def member_list_fields_changed(self, update_fields=None):
+        """
+        Whether a save writing `update_fields` (all fields if None) changes
+        a MEMBER_LIST_FIELDS value from when the user was loaded or last saved.
+        Values that were never loaded count as changed.
+        """
+        loaded = getattr(self, '_loaded_values', {})
+        return any(
+            loaded.get(field) is None or loaded[field] != getattr(self, field)
+            for field in self.MEMBER_LIST_FIELDS
+            if update_fields is None or field in update_fields
+        )
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._remember_loaded_values()
     
     class Meta:
         ordering = ['full_name']
+        # Typeahead (core/typeahead.py): case-insensitive prefix and substring
+        # matching. PostgreSQL-only, created by migration 0002.
+        indexes = [
+            models.Index(OpClass(Upper('full_name'), name='text_pattern_ops'), name='user_full_name_prefix_idx'),
+            models.Index(OpClass(Upper('email'), name='text_pattern_ops'), name='user_email_prefix_idx'),
+            GinIndex(OpClass(Upper('full_name'), name='gin_trgm_ops'), name='user_full_name_trgm_idx'),
+            GinIndex(OpClass(Upper('email'), name='gin_trgm_ops'), name='user_email_trgm_idx'),
+        ]
         
         
         
\ No newline at end of file
@@ -0,0 +1,16 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .auth_cache import invalidate_user_cache
+from .models import User
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed_handler(sender, instance, **kwargs):
+    """
+    Drop the cached snapshot on every save or delete, wherever it comes from
+    (API views, the Django admin, the shell), so nobody keeps authenticating
+    with stale columns
+    """
+    invalidate_user_cache(instance.pk)
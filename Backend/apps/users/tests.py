@@ -1,3 +1,70 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
 
-# Create your tests here.
+from .models import User
+
+
+@override_settings(USER_CACHE_ENABLED=True)
+class CachedJWTAuthenticationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('member@example.com', 'pass', 'Member')
+        cls.admin = User.objects.create_superuser('root@example.com', 'pass', 'Root')
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+
+    def test_user_is_not_loaded_per_request(self):
+        self.client.get('/api/v1/user/me/')
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/v1/user/me/')
+        self.assertEqual(response.data['email'], 'member@example.com')
+
+    def test_profile_update_refreshes_cached_user(self):
+        self.client.get('/api/v1/user/me/')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch('/api/v1/user/me/', {'full_name': 'Renamed'}, format='json')
+
+        self.assertEqual(self.client.get('/api/v1/user/me/').data['full_name'], 'Renamed')
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password('pass'))
+
+    def test_deactivated_user_is_rejected(self):
+        self.client.get('/api/v1/user/me/')
+        admin = APIClient()
+        admin.force_authenticate(self.admin)
+        with self.captureOnCommitCallbacks(execute=True):
+            admin.post(f'/api/v1/admin/users/{self.user.pk}/activate/')
+
+        self.assertEqual(self.client.get('/api/v1/user/me/').status_code, 401)
+
+    def test_profile_update_does_not_write_back_cached_columns(self):
+        self.client.get('/api/v1/user/me/')
+        User.objects.filter(pk=self.user.pk).update(is_active=False, is_staff=True)
+
+        response = self.client.patch('/api/v1/user/me/', {'full_name': 'Renamed'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.user.refresh_from_db()
+        self.assertEqual((self.user.full_name, self.user.is_active, self.user.is_staff), ('Renamed', False, True))
+
+    def test_saves_outside_the_api_drop_the_cached_user(self):
+        self.client.get('/api/v1/user/me/')
+        user = User.objects.get(pk=self.user.pk)
+        user.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            user.save()
+
+        self.assertEqual(self.client.get('/api/v1/user/me/').status_code, 401)
+
+    @override_settings(USER_CACHE_ENABLED=False)
+    def test_without_a_shared_cache_users_are_loaded_per_request(self):
+        self.client.get('/api/v1/user/me/')
+        # No signal fires, so only a database read notices the change
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+
+        self.assertEqual(self.client.get('/api/v1/user/me/').status_code, 401)
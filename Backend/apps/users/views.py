@@ -131,7 +131,11 @@ class UserProfileViewSet(viewsets.GenericViewSet):
         return UserProfileSerializer  
     
     def get_object(self):
-        return self.request.user
+        if self.request.method in permissions.SAFE_METHODS:
+            return self.request.user
+        # request.user is a cached snapshot; saving it would write stale
+        # columns (is_active, is_staff, ...) back over the current row
+        return User.objects.get(pk=self.request.user.pk)
     
     @action(detail=False, methods=['get', 'patch'], url_path='me')
     def me(self, request):
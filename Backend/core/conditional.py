@@ -0,0 +1,34 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+
+def make_etag(request, *parts):
+    """
+    Strong ETag for `parts` (e.g. versions) combined with everything else that
+    shapes the response for this request: the user, the query string and the
+    negotiated renderer.
+    """
+    renderer = getattr(request, 'accepted_renderer', None)
+    key = (request.user.pk, request.get_full_path(), getattr(renderer, 'format', None)) + parts
+    return '"%s"' % hashlib.sha1(repr(key).encode()).hexdigest()
+
+
+def conditional_response(request, etag, last_modified, build_response):
+    """
+    Return 304 Not Modified when the client's If-None-Match/If-Modified-Since
+    still match, without calling `build_response` (so nothing is queried or
+    serialized); otherwise call it and attach ETag/Last-Modified.
+    """
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(
+        getattr(request, '_request', request), etag=etag, last_modified=timestamp
+    )
+    if response is None:
+        response = build_response()
+    if response.status_code in (200, 304):
+        response['ETag'] = etag
+        if timestamp is not None:
+            response['Last-Modified'] = http_date(timestamp)
+    return response
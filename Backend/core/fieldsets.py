@@ -0,0 +1,119 @@
+from django.core.exceptions import FieldDoesNotExist
+from drf_yasg import openapi
+from rest_framework import permissions
+from rest_framework.exceptions import ValidationError
+
+
+FIELDS_QUERY_PARAM = 'fields'
+OMIT_QUERY_PARAM = 'omit'
+
+# Swagger parameters for views using SparseFieldsetMixin
+SPARSE_FIELDSET_PARAMETERS = [
+    openapi.Parameter(
+        FIELDS_QUERY_PARAM,
+        openapi.IN_QUERY,
+        description="Comma-separated fields to return, e.g. `id,title,status`",
+        type=openapi.TYPE_STRING
+    ),
+    openapi.Parameter(
+        OMIT_QUERY_PARAM,
+        openapi.IN_QUERY,
+        description="Comma-separated fields to leave out, e.g. `description`",
+        type=openapi.TYPE_STRING
+    ),
+]
+
+
+def parse_field_list(value):
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+class SparseFieldsetSerializerMixin:
+    """
+    Serializer mixin that keeps only the fields listed in
+    context['sparse_fields'] (set by SparseFieldsetMixin on the view).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        selected = self.context.get('sparse_fields')
+        if selected is not None:
+            for name in list(self.fields):
+                if name not in selected:
+                    self.fields.pop(name)
+
+
+class SparseFieldsetMixin:
+    """
+    ViewSet mixin adding `?fields=a,b` / `?omit=c` to read actions.
+
+    The serializer drops the other fields and the queryset is narrowed with
+    `.only()` to the matching columns plus `sparse_required_fields` (what
+    permissions and pagination read), so unrequested columns such as long
+    descriptions are never fetched.
+    """
+    sparse_fieldset_actions = ('list', 'retrieve')
+    sparse_required_fields = ('id',)
+
+    def get_sparse_fields(self):
+        """Selected serializer field names, or None when the response is not narrowed"""
+        if hasattr(self, '_sparse_fields'):
+            return self._sparse_fields
+
+        self._sparse_fields = None
+        request = getattr(self, 'request', None)
+        if (
+            request is None
+            or request.method not in permissions.SAFE_METHODS
+            or self.action not in self.sparse_fieldset_actions
+        ):
+            return None
+
+        fields = request.query_params.get(FIELDS_QUERY_PARAM)
+        omit = request.query_params.get(OMIT_QUERY_PARAM)
+        if not fields and not omit:
+            return None
+
+        available = list(self.get_serializer_class()().fields)
+        selected = parse_field_list(fields) if fields else available
+        omitted = parse_field_list(omit) if omit else []
+        unknown = [name for name in selected + omitted if name not in available]
+        if unknown:
+            raise ValidationError({
+                'fields': f"Unknown field(s): {', '.join(unknown)}. Available: {', '.join(available)}."
+            })
+
+        self._sparse_fields = [name for name in available if name in selected and name not in omitted]
+        return self._sparse_fields
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['sparse_fields'] = self.get_sparse_fields()
+        return context
+
+    def filter_queryset(self, queryset):
+        return self.narrow_queryset(super().filter_queryset(queryset))
+
+    def narrow_queryset(self, queryset, selected=None):
+        """
+        Apply `.only()` for the selected fields (default: those from the query
+        string); unchanged if any of them is not a plain column.
+        """
+        selected = selected or self.get_sparse_fields()
+        if selected is None:
+            return queryset
+
+        opts = queryset.model._meta
+        serializer_fields = self.get_serializer_class()().fields
+        columns = set(self.sparse_required_fields)
+        columns.update(name.lstrip('-') for name in getattr(self.paginator, 'ordering', ()))
+        for name in selected:
+            source = serializer_fields[name].source
+            try:
+                field = opts.get_field(source)
+            except FieldDoesNotExist:
+                return queryset
+            if not field.concrete or field.many_to_many:
+                return queryset
+            columns.add(field.name)
+        return queryset.only(*columns)
@@ -0,0 +1,76 @@
+from asgiref.local import Local
+from django.db import models, transaction
+from django.db.models import F
+from django.utils import timezone
+
+
+# {model: {pk, ...}} of version bumps waiting for the current transaction to
+# commit, per thread like Django's database connections.
+_pending_bumps = Local()
+
+
+def flush_version_bumps():
+    """Apply the version bumps queued by VersionedModel.bump_version()"""
+    pending, _pending_bumps.by_model = getattr(_pending_bumps, 'by_model', {}), {}
+    for model, pks in pending.items():
+        model._increment_versions(pks)
+
+
+class VersionedModel(models.Model):
+    """
+    Adds a change counter for conditional GETs (see core/conditional.py).
+
+    `version` is only moved by bump_version(), which increments it in the
+    database, so saving a stale instance can never set it back. Saving an
+    existing instance bumps it; writes to dependent rows (tasks, comments,
+    memberships) call bump_version() for their parent.
+    """
+    VERSION_FIELDS = ('version', 'changed_at')
+
+    version = models.PositiveIntegerField(default=0, editable=False)
+    changed_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def bump_version(cls, *pks):
+        """
+        Increment `version` for `pks` once the current transaction commits
+        (immediately outside one). Bumps queued during a transaction are
+        merged into a single UPDATE per model by whichever of their commit
+        callbacks runs first, and running it after commit keeps writers from
+        holding the parent row's lock until then. Bumps from a rolled back
+        block may still be applied, which only costs clients a refetch.
+        """
+        pks = {pk for pk in pks if pk is not None}
+        if not pks:
+            return
+        if not transaction.get_connection().in_atomic_block:
+            cls._increment_versions(pks)
+            return
+
+        if not hasattr(_pending_bumps, 'by_model'):
+            _pending_bumps.by_model = {}
+        _pending_bumps.by_model.setdefault(cls, set()).update(pks)
+        # One callback per bump so a rolled back savepoint can't take the
+        # only one with it; after the first, the rest find nothing queued.
+        transaction.on_commit(flush_version_bumps)
+
+    @classmethod
+    def _increment_versions(cls, pks):
+        cls.objects.filter(pk__in=pks).update(version=F('version') + 1, changed_at=timezone.now())
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        if not adding and kwargs.get('update_fields') is None:
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.VERSION_FIELDS
+                and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+        if not adding:
+            type(self).bump_version(self.pk)
@@ -0,0 +1,154 @@
+import base64
+import json
+from collections import OrderedDict
+from functools import reduce
+from operator import or_
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def encode_cursor(position):
+    """Encode a list of ordering values as an opaque URL-safe token."""
+    payload = json.dumps(position, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor_values(token):
+    """Decode a token produced by encode_cursor; raises ValueError if malformed."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        raw = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (TypeError, ValueError, UnicodeDecodeError) as exc:
+        raise ValueError('Invalid cursor') from exc
+    if not isinstance(raw, list):
+        raise ValueError('Invalid cursor')
+    return raw
+
+
+def decode_cursor(token, model, ordering):
+    """
+    Decode a token produced by encode_cursor back into typed ordering values.
+
+    Raises ValueError if the token is malformed or does not match `ordering`.
+    """
+    raw = decode_cursor_values(token)
+    if len(raw) != len(ordering):
+        raise ValueError('Invalid cursor')
+
+    position = []
+    for field_name, value in zip(ordering, raw):
+        field = model._meta.get_field(field_name.lstrip('-'))
+        try:
+            position.append(field.to_python(value))
+        except Exception as exc:
+            raise ValueError('Invalid cursor') from exc
+    return position
+
+
+def position_of(obj, ordering):
+    """Return the JSON-friendly ordering values for an instance."""
+    position = []
+    for field_name in ordering:
+        value = getattr(obj, field_name.lstrip('-'))
+        if hasattr(value, 'isoformat'):
+            value = value.isoformat()
+        position.append(value)
+    return position
+
+
+def keyset_filter(ordering, position):
+    """
+    Build the row-value comparison "(a, b, c) > (x, y, z)" for `ordering` as
+    an OR of prefix equalities so it can use a composite index on the same
+    columns.
+    """
+    clauses = []
+    for index, field_name in enumerate(ordering):
+        equal = {
+            name.lstrip('-'): value
+            for name, value in zip(ordering[:index], position[:index])
+        }
+        name = field_name.lstrip('-')
+        lookup = 'lt' if field_name.startswith('-') else 'gt'
+        equal[f'{name}__{lookup}'] = position[index]
+        clauses.append(Q(**equal))
+    return reduce(or_, clauses)
+
+
+def paginate_keyset(queryset, ordering, page_size, cursor=None):
+    """
+    Return (rows, next_cursor) for one page of `queryset` after `cursor`.
+
+    The last field in `ordering` must be unique so the position is total.
+    """
+    queryset = queryset.order_by(*ordering)
+    if cursor:
+        position = decode_cursor(cursor, queryset.model, ordering)
+        queryset = queryset.filter(keyset_filter(ordering, position))
+
+    rows = list(queryset[:page_size + 1])
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor(position_of(rows[-1], ordering))
+    return rows, next_cursor
+
+
+class KeysetPagination(BasePagination):
+    """
+    Forward-only keyset (seek) pagination.
+
+    Unlike OFFSET paging each page is a single indexed range scan starting
+    after the last row of the previous page, so deep pages cost the same as
+    the first one.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    cursor_query_param = 'cursor'
+    ordering = ('-created_at', '-id')
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        cursor = request.query_params.get(self.cursor_query_param)
+        try:
+            rows, self.next_cursor = paginate_keyset(
+                queryset, self.ordering, self.get_page_size(request), cursor
+            )
+        except ValueError:
+            raise NotFound('Invalid cursor.')
+        return rows
+
+    def get_next_link(self):
+        if not self.next_cursor:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
@@ -68,6 +68,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'channels',
     'corsheaders',
 ]
@@ -111,7 +112,7 @@ WSGI_APPLICATION = 'core.wsgi.application'
 # Authentication settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'apps.users.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -147,11 +148,108 @@ SWAGGER_SETTINGS = {
         }
     },
 }
+# Shared cache. Local memory per process by default (LRU-culled at
+# MAX_ENTRIES); set REDIS_URL to share it between workers.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'project-management',
+        'TIMEOUT': 300,
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    }
+}
+if os.environ.get('REDIS_URL'):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('REDIS_URL'),
+        'TIMEOUT': 300,
+    }
+
+# Keep users' organization roles / project memberships in the cache between
+# requests. Membership changes can only drop entries from a cache every worker
+# shares, so this is on by default only with REDIS_URL; otherwise memberships
+# are loaded once per request.
+ACCESS_CACHE_ENABLED = os.environ.get('ACCESS_CACHE_ENABLED', str(bool(os.environ.get('REDIS_URL')))) == 'True'
+
+# Seconds a user's cached organization roles / project memberships stay valid.
+# Entries are also dropped whenever a membership changes.
+ACCESS_CACHE_TIMEOUT = int(os.environ.get('ACCESS_CACHE_TIMEOUT', 300))
+
+# Cache users' rows between requests for token authentication (REST requests
+# and WebSocket connects). Like ACCESS_CACHE_ENABLED this is on by default only
+# with REDIS_URL, since a save can only drop the entry from a shared cache;
+# otherwise every authentication reads the users table.
+USER_CACHE_ENABLED = os.environ.get('USER_CACHE_ENABLED', str(bool(os.environ.get('REDIS_URL')))) == 'True'
+
+# Seconds a user's row stays cached with USER_CACHE_ENABLED. Dropped early
+# whenever the user is saved or deleted.
+USER_CACHE_TIMEOUT = int(os.environ.get('USER_CACHE_TIMEOUT', 60))
+
+# Build the WebSocket user from the JWT claims alone, with no cache or
+# database lookup. Deactivation then only takes effect when the token expires.
+WEBSOCKET_AUTH_FROM_CLAIMS = os.environ.get('WEBSOCKET_AUTH_FROM_CLAIMS', 'False') == 'True'
+
+# Channel layer. The in-memory layer only reaches sockets served by the same
+# process; set CHANNEL_REDIS_URL (any Redis-protocol server, e.g. the one
+# started by `manage.py run_fake_redis` for local multi-worker runs) so every
+# Daphne/Uvicorn worker shares the same groups.
 CHANNEL_LAYERS = {
     'default': {
         'BACKEND': 'channels.layers.InMemoryChannelLayer'
     }
 }
+if os.environ.get('CHANNEL_REDIS_URL'):
+    CHANNEL_LAYERS['default'] = {
+        'BACKEND': 'channels_redis.core.RedisChannelLayer',
+        'CONFIG': {
+            'hosts': [os.environ.get('CHANNEL_REDIS_URL')],
+            'prefix': os.environ.get('CHANNEL_LAYER_PREFIX', 'pm'),
+            # Groups are per user (`user_<id>`) with one channel per open tab.
+            # A bulk task update can push hundreds of messages to one user at
+            # once, so give each channel room for a burst...
+            'capacity': int(os.environ.get('CHANNEL_LAYER_CAPACITY', 1000)),
+            # ...but drop undelivered messages quickly: a reconnecting client
+            # reloads its notifications on connect anyway.
+            'expiry': int(os.environ.get('CHANNEL_LAYER_EXPIRY', 30)),
+            # Sockets re-join their group on every connect; this only needs to
+            # outlive the longest-lived connection.
+            'group_expiry': int(os.environ.get('CHANNEL_LAYER_GROUP_EXPIRY', 86400)),
+        },
+    }
+
+# Notification fan-out and WebSocket delivery run in-process after commit by
+# default (see NOTIFICATION_DELIVERY_THREADS). Set to True to queue them in the
+# outbox instead; then `python manage.py run_notification_worker` must be
+# running (one or more processes), or nothing is delivered.
+NOTIFICATION_ASYNC_DELIVERY = os.environ.get('NOTIFICATION_ASYNC_DELIVERY', 'False') == 'True'
+
+# Without the outbox, fan-out and delivery are handed to a pool of this many
+# threads in each web process after commit, with up to
+# NOTIFICATION_DELIVERY_QUEUE_SIZE jobs waiting (beyond that they run on the
+# request thread). 0 runs them on the request thread. Queued jobs are lost if
+# the process exits; use NOTIFICATION_ASYNC_DELIVERY when that matters.
+NOTIFICATION_DELIVERY_THREADS = int(os.environ.get('NOTIFICATION_DELIVERY_THREADS', 4))
+NOTIFICATION_DELIVERY_QUEUE_SIZE = int(os.environ.get('NOTIFICATION_DELIVERY_QUEUE_SIZE', 1000))
+
+# WebSocket clients connecting with `?batch=1` get events pushed within this
+# many seconds coalesced into one `batch` frame (flushed early at
+# NOTIFICATION_PUSH_BATCH_SIZE events).
+NOTIFICATION_PUSH_BATCH_WINDOW = float(os.environ.get('NOTIFICATION_PUSH_BATCH_WINDOW', 0.05))
+NOTIFICATION_PUSH_BATCH_SIZE = 200
+
+# Notification retention, applied by the `archive_notifications` management
+# command (run daily). Read notifications are archived once older than their
+# type's TTL in days ('default' for unlisted types); unread ones only after
+# NOTIFICATION_UNREAD_RETENTION_DAYS (None keeps them until read).
+NOTIFICATION_RETENTION_DAYS = {
+    'default': 90,
+    'task_status_changed': 30,
+    'task_due_soon': 14,
+    'task_overdue': 30,
+}
+NOTIFICATION_UNREAD_RETENTION_DAYS = 365
 
 DATABASES = {
     'default': {
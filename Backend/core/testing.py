@@ -0,0 +1,15 @@
+from django.db import connection, transaction
+
+
+def explain(queryset):
+    """
+    The query plan for `queryset` after ANALYZE, for tests that check an
+    index is used. Sequential scans are disabled on PostgreSQL because seeded
+    test tables are small enough for one to win anyway.
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        # Planner statistics, as production tables have them
+        cursor.execute(f'ANALYZE {queryset.model._meta.db_table}')
+        if connection.vendor == 'postgresql':
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        return queryset.explain()
@@ -0,0 +1,54 @@
+from functools import reduce
+from operator import or_
+
+from django.db.models import Q
+from drf_yasg import openapi
+from rest_framework.exceptions import ValidationError
+
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 25
+MAX_QUERY_LENGTH = 100
+# Shorter text has too few trigrams for the substring indexes to help, so
+# it only matches prefixes
+MIN_SUBSTRING_LENGTH = 3
+
+# Swagger parameters for typeahead endpoints
+TYPEAHEAD_PARAMETERS = [
+    openapi.Parameter('q', openapi.IN_QUERY, description="Text typed so far", type=openapi.TYPE_STRING, required=True),
+    openapi.Parameter(
+        'limit', openapi.IN_QUERY,
+        description=f"Maximum matches (default {DEFAULT_LIMIT}, max {MAX_LIMIT})", type=openapi.TYPE_INTEGER
+    ),
+]
+
+
+def parse_typeahead_params(request):
+    """(text, limit) from the query string; 400 if `q` is missing"""
+    text = request.query_params.get('q', '').strip()[:MAX_QUERY_LENGTH]
+    if not text:
+        raise ValidationError({'q': 'This parameter is required.'})
+    try:
+        limit = int(request.query_params.get('limit', DEFAULT_LIMIT))
+    except ValueError:
+        limit = DEFAULT_LIMIT
+    return text, max(1, min(limit, MAX_LIMIT))
+
+
+def typeahead(queryset, fields, text, limit, ordering):
+    """
+    Up to `limit` rows of a values() `queryset` whose `fields` match `text`
+    case-insensitively: prefix matches first (the text_pattern_ops indexes),
+    then, for text of MIN_SUBSTRING_LENGTH or more, other rows containing
+    it (the trigram indexes). Each group is sorted by `ordering`, whose
+    last entry must be unique.
+    """
+    def matching(lookup):
+        return reduce(or_, (Q(**{f'{field}__{lookup}': text}) for field in fields))
+
+    rows = list(queryset.filter(matching('istartswith')).order_by(*ordering)[:limit])
+    if len(rows) < limit and len(text) >= MIN_SUBSTRING_LENGTH:
+        key = ordering[-1]
+        seen = [row[key] for row in rows]
+        rows += queryset.filter(matching('icontains')).exclude(**{f'{key}__in': seen}).order_by(*ordering)[:limit - len(rows)]
+    return rows